@@ -0,0 +1,142 @@
+"""
+Benchmark: efeito manada na reconstrução do catálogo
+
+Simula vários workers (processos) recebendo, ao mesmo tempo, uma rajada de
+requisições logo depois de o cache do catálogo ser invalidado. Cada
+reconstrução carrega produto_repo.obter_todos() e a foto principal de
+cada produto. Compara:
+
+- sem_protecao: cada requisição reconstrói por conta própria;
+- por_worker: CargaUnica sem lease (uma reconstrução por worker, todas
+  ao mesmo tempo);
+- com_lease: CargaUnica com a lease do banco (uma reconstrução por worker,
+  uma de cada vez).
+
+Uso:
+    python -m benchmarks.bench_carga_unica [--produtos 5000] [--workers 4] [--concorrencia 32] [--rodadas 5]
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.categoria_model import Categoria
+from repo import categoria_repo, produto_repo
+from util import db_util
+from util.carga_unica_util import CargaUnica
+from util.foto_util import obter_fotos_principais
+from util.migracao_util import aplicar_migracoes
+
+
+MODOS = ("sem_protecao", "por_worker", "com_lease")
+
+
+def preparar_banco(quantidade: int) -> str:
+    caminho = os.path.join(tempfile.mkdtemp(), "bench.db")
+    db_util.configurar_banco(caminho)
+    aplicar_migracoes()
+    categoria_repo.inserir(Categoria(0, "Geral"))
+    with db_util.get_connection() as conn:
+        conn.executemany(
+            "INSERT INTO produto (nome, descricao, preco, quantidade, categoria_id) VALUES (?, ?, ?, ?, 1)",
+            [(f"Produto {i:06d}", "Descrição de teste " * 10, 10.0 + i, i % 50) for i in range(quantidade)])
+    db_util.fechar_pool()
+    return caminho
+
+
+def reconstruir_catalogo() -> int:
+    produtos = produto_repo.obter_todos()
+    fotos = obter_fotos_principais([produto.id for produto in produtos])
+    for produto in produtos:
+        produto.foto_principal = fotos[produto.id]
+    return len(produtos)
+
+
+async def rajada(modo: str, carga: CargaUnica, rodada: int, concorrencia: int,
+                 cargas: list[tuple[float, float]], latencias: list[float]) -> None:
+    async def carregar():
+        inicio = time.time()
+        resultado = await db_util.executar_async("leitura", reconstruir_catalogo)
+        cargas.append((inicio, time.time()))
+        return resultado
+
+    async def requisicao():
+        inicio = time.perf_counter()
+        if modo == "sem_protecao":
+            await carregar()
+        else:
+            await carga.executar(f"rodada-{rodada}", carregar)
+        latencias.append(time.perf_counter() - inicio)
+
+    await asyncio.gather(*(requisicao() for _ in range(concorrencia)))
+
+
+def executar_worker(caminho: str, modo: str, concorrencia: int, rodadas: int, barreira, resultados) -> None:
+    db_util.configurar_banco(caminho)
+    carga = CargaUnica(f"bench-{modo}", usar_lease=(modo == "com_lease"))
+    cargas: list[tuple[float, float]] = []
+    latencias: list[float] = []
+    for rodada in range(rodadas):
+        barreira.wait()
+        asyncio.run(rajada(modo, carga, rodada, concorrencia, cargas, latencias))
+    db_util.encerrar_executores()
+    db_util.fechar_pool()
+    resultados.put((cargas, latencias))
+
+
+def maximo_simultaneo(intervalos: list[tuple[float, float]]) -> int:
+    eventos = sorted([(inicio, 1) for inicio, _ in intervalos] + [(fim, -1) for _, fim in intervalos])
+    atual = maximo = 0
+    for _, delta in eventos:
+        atual += delta
+        maximo = max(maximo, atual)
+    return maximo
+
+
+def percentil(valores: list[float], p: float) -> float:
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p))] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--produtos", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--concorrencia", type=int, default=32)
+    parser.add_argument("--rodadas", type=int, default=5)
+    args = parser.parse_args()
+
+    caminho = preparar_banco(args.produtos)
+    contexto = multiprocessing.get_context("spawn")
+    requisicoes = args.workers * args.concorrencia * args.rodadas
+    print(f"{args.workers} workers x {args.concorrencia} requisições simultâneas x {args.rodadas} rodadas")
+    print(f"{'modo':<14} {'reconstruções':>14} {'simultâneas':>12} {'p50 ms':>9} {'p99 ms':>9}")
+    for modo in MODOS:
+        barreira = contexto.Barrier(args.workers)
+        resultados = contexto.Queue()
+        processos = [
+            contexto.Process(target=executar_worker,
+                             args=(caminho, modo, args.concorrencia, args.rodadas, barreira, resultados))
+            for _ in range(args.workers)]
+        for processo in processos:
+            processo.start()
+        cargas: list[tuple[float, float]] = []
+        latencias: list[float] = []
+        for _ in processos:
+            cargas_worker, latencias_worker = resultados.get()
+            cargas.extend(cargas_worker)
+            latencias.extend(latencias_worker)
+        for processo in processos:
+            processo.join()
+        assert len(latencias) == requisicoes
+        print(f"{modo:<14} {len(cargas):>14} {maximo_simultaneo(cargas):>12} "
+              f"{percentil(latencias, 0.50):>9.1f} {percentil(latencias, 0.99):>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
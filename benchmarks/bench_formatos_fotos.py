@@ -0,0 +1,108 @@
+"""
+Relatório: bytes servidos por formato nas fotos reais do catálogo
+
+Recodifica cada foto de static/img/products (os JPEGs principais, sem as
+versões já geradas) com o mesmo pipeline do upload (foto_util.gerar_versoes)
+em todas as larguras e formatos, sem gravar nada, e mostra:
+
+- o total de bytes por largura em cada formato e a proporção sobre o JPEG;
+- os bytes que cada perfil de navegador receberia, com a mesma regra de
+  FotosNegociadas (o menor arquivo entre os formatos aceitos);
+- o tempo médio de codificação por foto em cada formato.
+
+Uso:
+    python -m benchmarks.bench_formatos_fotos [--diretorio static/img/products] [--limite 0]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from util.foto_util import FORMATOS_FOTO, LARGURAS_FOTO, codificar
+from util.negociacao_fotos_util import TIPOS_ALTERNATIVOS, tipos_aceitos
+
+
+# Accept enviado por cada perfil de navegador ao carregar uma <img>
+PERFIS = {
+    "avif+webp (Chrome, Firefox)": "image/avif,image/webp,image/apng,image/*,*/*;q=0.8",
+    "webp (Safari 14-15)": "image/webp,image/png,image/*;q=0.8,*/*;q=0.5",
+    "só jpeg": "image/*,*/*;q=0.8",
+}
+
+# Versões já geradas (<arquivo>-<largura>w.jpg) não entram como originais
+PADRAO_VERSAO = re.compile(r"-\d+w\.jpg$")
+
+
+def listar_fotos(diretorio: str, limite: int) -> list[str]:
+    fotos = sorted(
+        os.path.join(raiz, nome)
+        for raiz, _, nomes in os.walk(diretorio)
+        for nome in nomes if nome.endswith(".jpg") and not PADRAO_VERSAO.search(nome))
+    return fotos[:limite] if limite else fotos
+
+
+def medir_foto(caminho: str, extensoes: tuple[str, ...],
+               tempos: dict[str, float]) -> dict[int, dict[str, int]]:
+    """{largura: {extensão: bytes}} da foto em cada largura e formato"""
+    with Image.open(caminho) as img:
+        img = img.convert("RGB")
+    tamanho = min(img.size)
+    tamanhos = {}
+    for largura in sorted((l for l in LARGURAS_FOTO if l <= tamanho), reverse=True):
+        if img.width != largura:
+            img = img.resize((largura, largura), Image.Resampling.LANCZOS)
+        tamanhos[largura] = {}
+        for extensao in extensoes:
+            inicio = time.perf_counter()
+            tamanhos[largura][extensao] = len(codificar(img, extensao))
+            tempos[extensao] += time.perf_counter() - inicio
+    return tamanhos
+
+
+def servido(tamanhos: dict[str, int], accept: str) -> int:
+    aceitos = tipos_aceitos(accept)
+    return min(tamanho for extensao, tamanho in tamanhos.items()
+               if extensao == "jpg" or TIPOS_ALTERNATIVOS[extensao] in aceitos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--diretorio", default="static/img/products")
+    parser.add_argument("--limite", type=int, default=0, help="máximo de fotos (0 = todas)")
+    args = parser.parse_args()
+
+    fotos = listar_fotos(args.diretorio, args.limite)
+    if not fotos:
+        print(f"Nenhuma foto em {args.diretorio}")
+        return
+    extensoes = ("jpg",) + FORMATOS_FOTO
+    tempos = {extensao: 0.0 for extensao in extensoes}
+    medidas = [medir_foto(caminho, extensoes, tempos) for caminho in fotos]
+    print(f"{len(fotos)} fotos; formatos: {', '.join(extensoes)}\n")
+
+    print(f"{'largura':>8} " + " ".join(f"{extensao + ' KiB':>12} {'%':>5}" for extensao in extensoes))
+    for largura in sorted(LARGURAS_FOTO):
+        totais = {extensao: sum(m[largura][extensao] for m in medidas if largura in m) for extensao in extensoes}
+        if not totais["jpg"]:
+            continue
+        print(f"{largura:>8} " + " ".join(
+            f"{totais[extensao] / 1024:>12.1f} {100 * totais[extensao] / totais['jpg']:>5.0f}"
+            for extensao in extensoes))
+
+    print(f"\n{'perfil':<30} " + " ".join(f"{str(largura) + 'w KiB':>10}" for largura in sorted(LARGURAS_FOTO)))
+    for perfil, accept in PERFIS.items():
+        print(f"{perfil:<30} " + " ".join(
+            f"{sum(servido(m[largura], accept) for m in medidas if largura in m) / 1024:>10.1f}"
+            for largura in sorted(LARGURAS_FOTO)))
+
+    print("\ncodificação média por foto (todas as larguras): " + ", ".join(
+        f"{extensao} {tempos[extensao] / len(fotos) * 1000:.0f} ms" for extensao in extensoes))
+
+
+if __name__ == "__main__":
+    main()
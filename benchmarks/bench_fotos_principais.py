@@ -0,0 +1,125 @@
+"""
+Benchmark: resolução da foto principal nas listagens
+
+Mede o tempo para montar a listagem completa do catálogo, com a URL da
+foto principal de cada produto, conforme o tamanho do catálogo. Metade dos
+produtos tem foto. Compara:
+
+- stat_por_produto: caminho anterior ao manifesto, um os.path.exists por
+  produto no diretório das fotos;
+- consulta_por_produto: uma consulta ao manifesto por produto
+  (obter_foto_principal em laço);
+- lote: uma consulta ao manifesto para todos os ids
+  (obter_fotos_principais);
+- join: a foto principal vem na própria consulta da listagem
+  (produto_repo.obter_catalogo).
+
+Uso:
+    python -m benchmarks.bench_fotos_principais [--tamanhos 1000,5000,10000,20000] [--repeticoes 5]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.categoria_model import Categoria
+from repo import categoria_repo, produto_repo
+from util import db_util
+from util.foto_util import obter_foto_principal, obter_fotos_principais
+from util.migracao_util import aplicar_migracoes
+
+
+def preparar(quantidade: int) -> str:
+    """Cria banco e diretório de fotos; devolve o diretório base das fotos"""
+    base = tempfile.mkdtemp()
+    db_util.configurar_banco(os.path.join(base, "bench.db"))
+    aplicar_migracoes()
+    categoria_repo.inserir(Categoria(0, "Geral"))
+    with db_util.get_connection() as conn:
+        conn.executemany(
+            "INSERT INTO produto (nome, descricao, preco, quantidade, categoria_id) VALUES (?, ?, ?, ?, 1)",
+            [(f"Produto {i:06d}", "Descrição de teste", 10.0 + i, i % 50) for i in range(quantidade)])
+        ids = [row[0] for row in conn.execute("SELECT id FROM produto")]
+        com_foto = ids[::2]
+        conn.executemany(
+            "INSERT INTO produto_foto (produto_id, ordem, arquivo, largura, altura, tamanho, hash) "
+            "VALUES (?, 1, ?, 800, 800, 0, '')",
+            [(id, f"{id:06d}-001.jpg") for id in com_foto])
+    diretorio_fotos = os.path.join(base, "products")
+    for id in com_foto:
+        codigo = f"{id:06d}"
+        os.makedirs(os.path.join(diretorio_fotos, codigo))
+        open(os.path.join(diretorio_fotos, codigo, f"{codigo}-001.jpg"), "wb").close()
+    return diretorio_fotos
+
+
+def listar_stat_por_produto(diretorio_fotos: str) -> list:
+    produtos = produto_repo.obter_todos()
+    for produto in produtos:
+        codigo = f"{produto.id:06d}"
+        caminho = os.path.abspath(os.path.join(diretorio_fotos, codigo)) + f"/{codigo}-001.jpg"
+        produto.foto_principal = (
+            f"/static/img/products/{codigo}/{codigo}-001.jpg" if os.path.exists(caminho) else None)
+    return produtos
+
+
+def listar_consulta_por_produto(_: str) -> list:
+    produtos = produto_repo.obter_todos()
+    for produto in produtos:
+        produto.foto_principal = obter_foto_principal(produto.id)
+    return produtos
+
+
+def listar_lote(_: str) -> list:
+    produtos = produto_repo.obter_todos()
+    fotos = obter_fotos_principais([produto.id for produto in produtos])
+    for produto in produtos:
+        produto.foto_principal = fotos[produto.id]
+    return produtos
+
+
+def listar_join(_: str) -> list:
+    return produto_repo.obter_catalogo()
+
+
+MODOS = {
+    "stat_por_produto": listar_stat_por_produto,
+    "consulta_por_produto": listar_consulta_por_produto,
+    "lote": listar_lote,
+    "join": listar_join,
+}
+
+
+def medir(funcao, diretorio_fotos: str, repeticoes: int) -> float:
+    funcao(diretorio_fotos)  # aquece o cache de páginas e de diretórios
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(diretorio_fotos)
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanhos", default="1000,5000,10000,20000")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'produtos':>9} " + " ".join(f"{modo + ' ms':>22}" for modo in MODOS))
+    for quantidade in [int(t) for t in args.tamanhos.split(",")]:
+        diretorio_fotos = preparar(quantidade)
+        com_foto = {p.id: p.foto_principal for p in listar_join(diretorio_fotos)}
+        tempos = []
+        for funcao in MODOS.values():
+            assert {p.id: p.foto_principal for p in funcao(diretorio_fotos)} == com_foto
+            tempos.append(medir(funcao, diretorio_fotos, args.repeticoes))
+        db_util.fechar_pool()
+        print(f"{quantidade:>9} " + " ".join(f"{t:>22.1f}" for t in tempos))
+
+
+if __name__ == "__main__":
+    main()
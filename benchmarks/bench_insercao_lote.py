@@ -0,0 +1,69 @@
+"""
+Benchmark: inserção linha a linha x inserção em lote
+
+Compara produto_repo.inserir / cliente_repo.inserir (uma conexão emprestada
+e um commit por linha) com inserir_lote (executemany em transações de
+TAMANHO_LOTE linhas), e também alterar_lote e excluir_lote de produtos.
+
+Uso:
+    python -m benchmarks.bench_insercao_lote [--quantidade 20000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.categoria_model import Categoria
+from model.cliente_model import Cliente
+from model.produto_model import Produto
+from repo import categoria_repo, cliente_repo, produto_repo
+from util import db_util
+from util.migracao_util import aplicar_migracoes
+
+
+def novo_banco() -> None:
+    db_util.configurar_banco(os.path.join(tempfile.mkdtemp(), "bench.db"))
+    aplicar_migracoes()
+    categoria_repo.inserir(Categoria(0, "Geral"))
+
+
+def medir(descricao: str, quantidade: int, funcao) -> None:
+    inicio = time.perf_counter()
+    funcao()
+    duracao = time.perf_counter() - inicio
+    print(f"{descricao:<32} {quantidade:>8} {duracao:>9.2f}s {quantidade / duracao:>12.0f} linhas/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quantidade", type=int, default=20000)
+    args = parser.parse_args()
+    n = args.quantidade
+
+    produtos = [Produto(0, f"Produto {i:06d}", "Descrição do fornecedor " * 5, 10.0 + i, i % 100, 1) for i in range(n)]
+    clientes = [Cliente(0, f"{i:011d}", "(28) 99999-0000", f"Cliente {i:06d}", f"cliente{i}@teste.com", "hash") for i in range(n)]
+
+    print(f"{'operação':<32} {'linhas':>8} {'tempo':>10} {'vazão':>19}")
+    novo_banco()
+    medir("produto_repo.inserir", n, lambda: [produto_repo.inserir(p) for p in produtos])
+    novo_banco()
+    medir("produto_repo.inserir_lote", n, lambda: produto_repo.inserir_lote(produtos))
+
+    ids = list(range(1, n + 1))
+    alterados = [Produto(id, p.nome, p.descricao, p.preco * 1.1, p.quantidade, 1) for id, p in zip(ids, produtos)]
+    medir("produto_repo.alterar", n, lambda: [produto_repo.alterar(p) for p in alterados])
+    medir("produto_repo.alterar_lote", n, lambda: produto_repo.alterar_lote(alterados))
+    medir("produto_repo.excluir_lote", n, lambda: produto_repo.excluir_lote(ids))
+
+    novo_banco()
+    medir("cliente_repo.inserir", n, lambda: [cliente_repo.inserir(c) for c in clientes])
+    novo_banco()
+    medir("cliente_repo.inserir_lote", n, lambda: cliente_repo.inserir_lote(clientes))
+    db_util.fechar_pool()
+
+
+if __name__ == "__main__":
+    main()
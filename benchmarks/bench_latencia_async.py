@@ -0,0 +1,97 @@
+"""
+Benchmark: latência de cauda do event loop com acesso síncrono x assíncrono
+
+Simula rotas concorrentes: várias "requisições de catálogo" carregam
+produto_repo.obter_todos() enquanto "requisições leves" (que não tocam no
+banco) medem quanto tempo esperam para serem atendidas pelo event loop.
+No modo síncrono a consulta roda dentro do loop e congela todas as outras
+requisições; no modo assíncrono ela vai para as threads do db_util.
+
+Uso:
+    python -m benchmarks.bench_latencia_async [--produtos 20000] [--concorrencia 8] [--segundos 5]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.categoria_model import Categoria
+from repo import categoria_repo, produto_repo
+from util import db_util
+from util.migracao_util import aplicar_migracoes
+
+
+def preparar_banco(quantidade: int) -> None:
+    db_util.configurar_banco(os.path.join(tempfile.mkdtemp(), "bench.db"))
+    aplicar_migracoes()
+    categoria_repo.inserir(Categoria(0, "Geral"))
+    with db_util.get_connection() as conn:
+        conn.executemany(
+            "INSERT INTO produto (nome, descricao, preco, quantidade, categoria_id) VALUES (?, ?, ?, ?, 1)",
+            [(f"Produto {i:06d}", "Descrição de teste " * 10, 10.0 + i, i % 50) for i in range(quantidade)])
+
+
+def percentil(valores: list[float], p: float) -> float:
+    if not valores:
+        return 0.0
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p))] * 1000
+
+
+async def executar(modo: str, concorrencia: int, segundos: float) -> dict:
+    fim = time.perf_counter() + segundos
+    catalogo: list[float] = []
+    leves: list[float] = []
+
+    async def requisicao_catalogo():
+        while time.perf_counter() < fim:
+            inicio = time.perf_counter()
+            if modo == "sincrono":
+                produto_repo.obter_todos()
+            else:
+                await produto_repo.obter_todos_async()
+            catalogo.append(time.perf_counter() - inicio)
+            await asyncio.sleep(0)
+
+    async def requisicao_leve():
+        while time.perf_counter() < fim:
+            inicio = time.perf_counter()
+            await asyncio.sleep(0.001)
+            # O tempo além do sleep é o atraso imposto pelo event loop
+            leves.append(time.perf_counter() - inicio)
+
+    await asyncio.gather(
+        *(requisicao_catalogo() for _ in range(concorrencia)),
+        *(requisicao_leve() for _ in range(concorrencia)))
+    return {
+        "modo": modo,
+        "catalogo_s": len(catalogo) / segundos,
+        "catalogo_p99_ms": percentil(catalogo, 0.99),
+        "leve_p50_ms": percentil(leves, 0.50),
+        "leve_p99_ms": percentil(leves, 0.99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--produtos", type=int, default=20000)
+    parser.add_argument("--concorrencia", type=int, default=8)
+    parser.add_argument("--segundos", type=float, default=5.0)
+    args = parser.parse_args()
+
+    preparar_banco(args.produtos)
+    print(f"{'modo':<10} {'catálogo/s':>11} {'catálogo p99':>13} {'leve p50':>9} {'leve p99':>9}  (ms)")
+    for modo in ("sincrono", "assincrono"):
+        r = asyncio.run(executar(modo, args.concorrencia, args.segundos))
+        print(f"{r['modo']:<10} {r['catalogo_s']:>11.1f} {r['catalogo_p99_ms']:>13.2f} "
+              f"{r['leve_p50_ms']:>9.2f} {r['leve_p99_ms']:>9.2f}")
+    db_util.encerrar_executores()
+    db_util.fechar_pool()
+
+
+if __name__ == "__main__":
+    main()
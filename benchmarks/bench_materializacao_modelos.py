@@ -0,0 +1,99 @@
+"""
+Benchmark: custo de materializar linhas em modelos
+
+Compara o caminho antigo (dataclass com __dict__, sqlite3.Row e busca de
+cada coluna pelo nome) com o atual (dataclass com slots montada pela row
+factory posicional fabrica_modelo), lendo OBTER_TODOS de produtos.
+
+Mostra o tempo por linha e a memória ocupada pela lista de modelos.
+
+Uso:
+    python -m benchmarks.bench_materializacao_modelos [--quantidade 100000]
+"""
+import argparse
+import dataclasses
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.categoria_model import Categoria
+from model.produto_model import Produto
+from repo import categoria_repo, produto_repo
+from sql.produto_sql import OBTER_TODOS
+from util import db_util
+from util.migracao_util import aplicar_migracoes
+
+# Mesmos campos de Produto, sem slots, como os modelos eram antes
+ProdutoSemSlots = dataclasses.make_dataclass(
+    "ProdutoSemSlots", [(f.name, f.type, f) for f in dataclasses.fields(Produto)])
+
+
+def ler_por_nome(conn: sqlite3.Connection) -> list:
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    cursor.execute(OBTER_TODOS)
+    return [
+        ProdutoSemSlots(
+            id=row["id"],
+            nome=row["nome"],
+            descricao=row["descricao"],
+            preco=row["preco"],
+            quantidade=row["quantidade"],
+            categoria_id=row["categoria_id"],
+            categoria_nome=row["categoria_nome"])
+        for row in cursor.fetchall()]
+
+
+def ler_posicional(conn: sqlite3.Connection) -> list:
+    cursor = conn.cursor()
+    cursor.row_factory = produto_repo.LINHA_PRODUTO
+    cursor.execute(OBTER_TODOS)
+    return cursor.fetchall()
+
+
+def medir(descricao: str, caminho: str, funcao, repeticoes: int) -> None:
+    conn = sqlite3.connect(caminho)
+    funcao(conn)  # aquece o cache de páginas do SQLite
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        produtos = funcao(conn)
+        tempos.append(time.perf_counter() - inicio)
+        del produtos
+    tracemalloc.start()
+    produtos = funcao(conn)
+    memoria, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    conn.close()
+    n = len(produtos)
+    print(f"{descricao:<36} {n:>8} {min(tempos) / n * 1e6:>10.2f} us "
+          f"{memoria / 2**20:>9.1f} MiB {memoria / n:>8.0f} B")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quantidade", type=int, default=100000)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    caminho = os.path.join(tempfile.mkdtemp(), "bench.db")
+    db_util.configurar_banco(caminho)
+    aplicar_migracoes()
+    categoria_repo.inserir(Categoria(0, "Geral"))
+    produto_repo.inserir_lote([
+        Produto(0, f"Produto {i:06d}", "Descrição do fornecedor " * 5, 10.0 + i, i % 100, 1)
+        for i in range(args.quantidade)])
+    db_util.fechar_pool()
+
+    print(f"{'caminho':<36} {'linhas':>8} {'por linha':>13} {'memória':>13} {'por modelo':>10}")
+    medir("sqlite3.Row + nomes, sem slots", caminho, ler_por_nome, args.repeticoes)
+    medir("fabrica_modelo + slots", caminho, ler_posicional, args.repeticoes)
+
+
+if __name__ == "__main__":
+    main()
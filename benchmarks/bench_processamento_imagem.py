@@ -0,0 +1,117 @@
+"""
+Benchmark: latência das outras requisições durante uploads de fotos
+
+Vários "uploads" processam, em sequência, uma foto de 12 MP com o pipeline
+de foto_util.processar_imagem (corte, escada de larguras e formatos),
+enquanto "requisições leves" medem quanto tempo esperam pelo event loop.
+Compara:
+
+- no_loop: processamento dentro da rota async (como antes);
+- thread: asyncio.to_thread, que ainda disputa o GIL com o event loop;
+- processos: ProcessadorImagens (pool de processos com fila limitada);
+  uploads recusados com 503 esperam o Retry-After antes de tentar de novo.
+
+Uso:
+    python -m benchmarks.bench_processamento_imagem [--uploads 4] [--segundos 10] [--processos 2] [--fila 8]
+"""
+import argparse
+import asyncio
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from util.exceptions import SobrecargaError
+from util.foto_util import processar_imagem
+from util.processamento_imagem_util import ProcessadorImagens
+
+
+MODOS = ("no_loop", "thread", "processos")
+
+
+def gerar_foto(largura: int = 4000, altura: int = 3000) -> bytes:
+    """JPEG de 12 MP com ruído, para que a codificação custe como uma foto real"""
+    canais = [Image.effect_noise((largura, altura), sigma) for sigma in (40, 60, 80)]
+    img = Image.merge("RGB", canais)
+    saida = io.BytesIO()
+    img.save(saida, "JPEG", quality=90)
+    return saida.getvalue()
+
+
+def percentil(valores: list[float], p: float) -> float:
+    if not valores:
+        return 0.0
+    valores = sorted(valores)
+    return valores[min(len(valores) - 1, int(len(valores) * p))] * 1000
+
+
+async def executar(modo: str, foto: bytes, uploads: int, segundos: float,
+                   processador: ProcessadorImagens) -> dict:
+    fim = time.perf_counter() + segundos
+    processadas: list[float] = []
+    leves: list[float] = []
+    recusadas = 0
+
+    async def upload():
+        nonlocal recusadas
+        while time.perf_counter() < fim:
+            inicio = time.perf_counter()
+            if modo == "no_loop":
+                processar_imagem(io.BytesIO(foto))
+            elif modo == "thread":
+                await asyncio.to_thread(processar_imagem, io.BytesIO(foto))
+            else:
+                try:
+                    await processador.processar(foto)
+                except SobrecargaError as e:
+                    recusadas += 1
+                    await asyncio.sleep(e.repetir_apos)
+                    continue
+            processadas.append(time.perf_counter() - inicio)
+            await asyncio.sleep(0)
+
+    async def requisicao_leve():
+        while time.perf_counter() < fim:
+            inicio = time.perf_counter()
+            await asyncio.sleep(0.001)
+            # O tempo além do sleep é o atraso imposto pelo event loop
+            leves.append(time.perf_counter() - inicio)
+
+    await asyncio.gather(*(requisicao_leve() for _ in range(8)), *(upload() for _ in range(uploads)))
+    return {
+        "modo": modo,
+        "fotos": len(processadas),
+        "recusadas": recusadas,
+        "foto_p50_ms": percentil(processadas, 0.50),
+        "leve_p50_ms": percentil(leves, 0.50),
+        "leve_p99_ms": percentil(leves, 0.99),
+        "leve_max_ms": percentil(leves, 1.0),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--uploads", type=int, default=4, help="uploads simultâneos")
+    parser.add_argument("--segundos", type=float, default=10.0)
+    parser.add_argument("--processos", type=int, default=2)
+    parser.add_argument("--fila", type=int, default=8)
+    args = parser.parse_args()
+
+    foto = gerar_foto()
+    processador = ProcessadorImagens(args.processos, args.fila, repetir_apos=1)
+    processador.iniciar()
+    print(f"foto de {len(foto) / 2**20:.1f} MiB, {args.uploads} uploads simultâneos, {os.cpu_count()} CPUs")
+    print(f"{'modo':<10} {'fotos':>6} {'503':>5} {'foto p50':>9} {'leve p50':>9} {'leve p99':>9} {'leve máx':>9}  (ms)")
+    for modo in MODOS:
+        r = asyncio.run(executar(modo, foto, args.uploads, args.segundos, processador))
+        print(f"{r['modo']:<10} {r['fotos']:>6} {r['recusadas']:>5} {r['foto_p50_ms']:>9.0f} "
+              f"{r['leve_p50_ms']:>9.2f} {r['leve_p99_ms']:>9.2f} {r['leve_max_ms']:>9.2f}")
+    processador.encerrar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark: vazão de leitura do catálogo com escritas concorrentes
+
+Compara o journal padrão (DELETE) com o perfil WAL aplicado por
+util.db_util. Threads leitoras chamam produto_repo.obter_todos() enquanto
+uma thread escritora altera produtos sem parar, simulando um admin salvando
+o cadastro durante o tráfego da vitrine.
+
+Uso:
+    python -m benchmarks.bench_wal_leitura_escrita [--produtos 2000] [--leitores 4] [--segundos 5]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.categoria_model import Categoria
+from model.produto_model import Produto
+from repo import categoria_repo, produto_repo
+from util import db_util
+from util.migracao_util import aplicar_migracoes
+
+
+def preparar_banco(caminho: str, quantidade: int) -> None:
+    aplicar_migracoes()
+    categoria_repo.inserir(Categoria(0, "Geral"))
+    with db_util.get_connection() as conn:
+        conn.executemany(
+            "INSERT INTO produto (nome, descricao, preco, quantidade, categoria_id) VALUES (?, ?, ?, ?, 1)",
+            [(f"Produto {i:06d}", "Descrição de teste " * 10, 10.0 + i, i % 50) for i in range(quantidade)])
+
+
+def executar(journal_mode: str, quantidade: int, leitores: int, segundos: float) -> dict:
+    caminho = os.path.join(tempfile.mkdtemp(), "bench.db")
+    db_util.configurar_banco(caminho)
+    db_util.configurar_pragmas(journal_mode=journal_mode)
+    preparar_banco(caminho, quantidade)
+
+    parar = threading.Event()
+    latencias: list[float] = []
+    erros = {"leitura": 0, "escrita": 0}
+    escritas = [0]
+    lock = threading.Lock()
+
+    def leitor():
+        locais = []
+        while not parar.is_set():
+            inicio = time.perf_counter()
+            try:
+                produto_repo.obter_todos()
+                locais.append(time.perf_counter() - inicio)
+            except Exception:
+                erros["leitura"] += 1
+        with lock:
+            latencias.extend(locais)
+
+    def escritor():
+        i = 0
+        while not parar.is_set():
+            i += 1
+            produto = Produto(i % quantidade + 1, f"Produto {i % quantidade:06d}", "Alterado " * 10, 9.9, i % 7, 1)
+            try:
+                produto_repo.alterar(produto)
+                escritas[0] += 1
+            except Exception:
+                erros["escrita"] += 1
+
+    threads = [threading.Thread(target=leitor) for _ in range(leitores)]
+    threads.append(threading.Thread(target=escritor))
+    for t in threads:
+        t.start()
+    time.sleep(segundos)
+    parar.set()
+    for t in threads:
+        t.join()
+
+    latencias.sort()
+    db_util.fechar_pool()
+    return {
+        "journal_mode": journal_mode,
+        "leituras_s": len(latencias) / segundos,
+        "escritas_s": escritas[0] / segundos,
+        "p50_ms": statistics.median(latencias) * 1000 if latencias else 0.0,
+        "p95_ms": latencias[int(len(latencias) * 0.95)] * 1000 if latencias else 0.0,
+        "erros": erros,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--produtos", type=int, default=2000)
+    parser.add_argument("--leitores", type=int, default=4)
+    parser.add_argument("--segundos", type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"{'journal':<8} {'leituras/s':>11} {'escritas/s':>11} {'p50 ms':>8} {'p95 ms':>8}  erros")
+    for modo in ("DELETE", "WAL"):
+        r = executar(modo, args.produtos, args.leitores, args.segundos)
+        print(f"{r['journal_mode']:<8} {r['leituras_s']:>11.1f} {r['escritas_s']:>11.1f} "
+              f"{r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f}  {r['erros']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,13 +4,6 @@ from starlette.middleware.sessions import SessionMiddleware
 import secrets
 import uvicorn
 
-from repo import usuario_repo
-from repo import admin_repo
-from repo import cliente_repo
-from repo import produto_repo
-from repo import forma_pagamento_repo
-from repo import categoria_repo
-
 from routes.public_routes import router as public_router
 from routes.admin_categorias_routes import router as admin_categorias_router
 from routes.admin_produtos_routes import router as admin_produtos_router
@@ -19,6 +12,17 @@ from routes.admin_formas_routes import router as admin_formas_pagamento_router
 from routes.auth_routes import router as auth_router
 from routes.perfil_routes import router as perfil_router
 from routes.admin_usuarios_routes import router as admin_usuarios_router
+from routes.admin_metricas_routes import router as admin_metricas_router
+from util.migracao_util import aplicar_migracoes
+from util.negociacao_fotos_util import FotosNegociadas
+from util.preenchimento_util import iniciar_preenchimento, parar_preenchimento
+from util.processamento_imagem_util import encerrar_processamento_imagem, iniciar_processamento_imagem
+from util.db_util import fechar_pool, encerrar_executores, iniciar_checkpoint_periodico, parar_checkpoint_periodico
+from util.db_util import imprimir_relatorio_consultas
+from util.metricas_util import salvar_metricas
+from util.snapshot_util import iniciar_snapshot, parar_snapshot
+from util.template_util import precompilar_templates
+from util.versao_util import iniciar_monitor_versoes, parar_monitor_versoes
 
 app = FastAPI()
 
@@ -33,14 +37,11 @@ app.add_middleware(
     https_only=False  # Em produção, defina como True se usar HTTPS
 )
 
+# As fotos de produto são servidas no formato (AVIF/WebP/JPEG) negociado pelo Accept
+app.mount("/static/img/products", FotosNegociadas(directory="static/img/products", check_dir=False), name="fotos")
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
-categoria_repo.criar_tabela()
-produto_repo.criar_tabela()
-usuario_repo.criar_tabela()
-admin_repo.criar_tabela()
-cliente_repo.criar_tabela()
-forma_pagamento_repo.criar_tabela()
+aplicar_migracoes()
 
 # Criar admin padrão ao inicializar
 from util.criar_admin import criar_admin_padrao
@@ -54,6 +55,32 @@ app.include_router(admin_formas_pagamento_router, prefix="/admin/formas")
 app.include_router(auth_router)
 app.include_router(perfil_router)
 app.include_router(admin_usuarios_router)
+app.include_router(admin_metricas_router, prefix="/admin/metricas")
+
+
+@app.on_event("startup")
+def iniciar_aplicacao():
+    # Primeiro: com fork (padrão no Linux) os processos de imagem precisam
+    # ser criados antes das threads
+    iniciar_processamento_imagem()
+    iniciar_checkpoint_periodico()
+    iniciar_monitor_versoes()
+    iniciar_snapshot()
+    iniciar_preenchimento()
+    precompilar_templates()
+
+
+@app.on_event("shutdown")
+def encerrar_aplicacao():
+    parar_checkpoint_periodico()
+    parar_monitor_versoes()
+    parar_snapshot()
+    parar_preenchimento()
+    encerrar_processamento_imagem()
+    encerrar_executores()
+    imprimir_relatorio_consultas()
+    salvar_metricas()
+    fechar_pool()
 
 if __name__ == "__main__":
     uvicorn.run(app="main:app", host="127.0.0.1", port=8000, reload=True)
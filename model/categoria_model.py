@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class Categoria:
     id: int
     nome: str
\ No newline at end of file
@@ -0,0 +1,12 @@
+from dataclasses import dataclass, field
+from typing import Generic, Optional, TypeVar
+
+
+T = TypeVar("T")
+
+
+@dataclass(slots=True)
+class Pagina(Generic[T]):
+    itens: list[T] = field(default_factory=list)
+    anterior: Optional[str] = None
+    proximo: Optional[str] = None
@@ -0,0 +1,10 @@
+from dataclasses import dataclass, field
+
+from model.produto_foto_model import ProdutoFoto
+from model.produto_model import Produto
+
+
+@dataclass(slots=True)
+class ProdutoDetalhes:
+    produto: Produto
+    fotos: list[ProdutoFoto] = field(default_factory=list)
@@ -0,0 +1,58 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+def nome_derivada(arquivo: str, largura: int) -> str:
+    """Nome do arquivo da versão reduzida de uma foto (ex.: 000001-ab12-320w.jpg)"""
+    base, extensao = arquivo.rsplit(".", 1)
+    return f"{base}-{largura}w.{extensao}"
+
+
+def nome_formato(arquivo: str, extensao: str) -> str:
+    """Nome do arquivo da mesma foto em outro formato (ex.: 000001-ab12-320w.webp)"""
+    return f"{arquivo.rsplit('.', 1)[0]}.{extensao}"
+
+
+def montar_srcset(url: Optional[str], larguras: Optional[str]) -> Optional[str]:
+    """
+    Valor do atributo srcset a partir da URL da foto e das larguras
+    disponíveis ("160,320,800"); a maior largura é o próprio arquivo
+    """
+    if not url or not larguras:
+        return None
+    valores = sorted(int(largura) for largura in larguras.split(","))
+    maior = valores[-1]
+    return ", ".join(
+        f"{url if largura == maior else nome_derivada(url, largura)} {largura}w"
+        for largura in valores)
+
+
+@dataclass(slots=True)
+class ProdutoFoto:
+    id: int
+    produto_id: int
+    ordem: int
+    arquivo: str
+    largura: int
+    altura: int
+    tamanho: int
+    hash: str
+    larguras: str = ""
+    formatos: str = ""
+
+    @property
+    def url(self) -> str:
+        return f"/static/img/products/{self.produto_id:06d}/{self.arquivo}"
+
+    @property
+    def srcset(self) -> Optional[str]:
+        return montar_srcset(self.url, self.larguras)
+
+    @property
+    def arquivos(self) -> list[str]:
+        """O arquivo da foto, os das versões reduzidas e os dos outros formatos de cada um"""
+        jpegs = [self.arquivo] + [
+            nome_derivada(self.arquivo, int(largura))
+            for largura in self.larguras.split(",") if largura and int(largura) < self.largura]
+        extensoes = [extensao for extensao in self.formatos.split(",") if extensao]
+        return jpegs + [nome_formato(arquivo, extensao) for arquivo in jpegs for extensao in extensoes]
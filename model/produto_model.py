@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from typing import Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class Produto:
     id: int
     nome: str
@@ -11,6 +11,7 @@ class Produto:
     quantidade: int
     categoria_id: int
     categoria_nome: Optional[str] = None
+    atualizado_em: Optional[str] = None
     foto_principal: Optional[str] = None
 
     
\ No newline at end of file
@@ -0,0 +1,22 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from model.produto_foto_model import montar_srcset
+
+
+@dataclass(slots=True)
+class ProdutoResumo:
+    id: int
+    nome: str
+    preco: float
+    quantidade: int
+    categoria_id: int
+    categoria_nome: Optional[str] = None
+    resumo: Optional[str] = None
+    atualizado_em: Optional[str] = None
+    foto_principal: Optional[str] = None
+    foto_larguras: Optional[str] = None
+
+    @property
+    def foto_srcset(self) -> Optional[str]:
+        return montar_srcset(self.foto_principal, self.foto_larguras)
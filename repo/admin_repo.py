@@ -3,13 +3,9 @@ from repo import usuario_repo
 from model.admin_model import Admin
 from sql.admin_sql import *
 from model.usuario_model import Usuario
-from util.db_util import get_connection
+from util.db_util import fabrica_modelo, get_connection, leitura_async, escrita_async
 
-def criar_tabela() -> bool:
-    with get_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute(CRIAR_TABELA)
-        return cursor.rowcount > 0
+LINHA_ADMIN = fabrica_modelo(Admin)
 
 def inserir(admin: Admin) -> Optional[int]:
     with get_connection() as conn:
@@ -53,27 +49,23 @@ def excluir(id: int) -> bool:
 def obter_por_id(id: int) -> Optional[Admin]:
     with get_connection() as conn:
         cursor = conn.cursor()
+        cursor.row_factory = LINHA_ADMIN
         cursor.execute(OBTER_POR_ID, (id,))
-        row = cursor.fetchone()
-        admin = Admin(
-            id=row["id"],
-            nome=row["nome"],            
-            email=row["email"],
-            senha=row["senha"],
-            master=row["master"])
+        admin = cursor.fetchone()
         return admin
     
 def obter_todos() -> list[Admin]:
     with get_connection() as conn:
         cursor = conn.cursor()
+        cursor.row_factory = LINHA_ADMIN
         cursor.execute(OBTER_TODOS)
-        rows = cursor.fetchall()
-        admins = [
-            Admin(
-                id=row["id"],
-                nome=row["nome"],            
-                email=row["email"],
-                senha=row["senha"],
-                master=row["master"]) 
-                for row in rows]
-        return admins
\ No newline at end of file
+        admins = cursor.fetchall()
+        return admins
+
+
+# Versões assíncronas para uso nas rotas, executadas fora do event loop
+obter_por_id_async = leitura_async(obter_por_id)
+obter_todos_async = leitura_async(obter_todos)
+inserir_async = escrita_async(inserir)
+alterar_async = escrita_async(alterar)
+excluir_async = escrita_async(excluir)
@@ -1,47 +1,122 @@
 from typing import Optional
 from model.categoria_model import Categoria
+from repo import versao_repo
 from sql.categoria_sql import *
-from util.db_util import get_connection
+from util.cache_util import criar_cache_referencia
+from util.db_util import fabrica_modelo, get_connection, leitura_async, escrita_async
+from util.versao_util import DOMINIO_CATALOGO, DOMINIO_CATEGORIAS, altera_catalogo
 
-def criar_tabela() -> bool:
-    with get_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute(CRIAR_TABELA)
-        return cursor.rowcount > 0
-    
+# Quantidade de linhas confirmadas por commit nas operações em lote
+TAMANHO_LOTE = 1000
+
+# Versões compartilhadas incrementadas na transação de cada escrita; o
+# nome da categoria aparece nas páginas do catálogo
+DOMINIOS_ALTERADOS = (DOMINIO_CATEGORIAS, DOMINIO_CATALOGO)
+
+LINHA_CATEGORIA = fabrica_modelo(Categoria)
+
+# Categorias mudam raramente: as leituras vêm do cache, invalidado nas escritas
+cache_categorias = criar_cache_referencia("categorias", DOMINIO_CATEGORIAS)
+
+@cache_categorias.invalidando
+@altera_catalogo
 def inserir(categoria: Categoria) -> Optional[int]:
     with get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute(INSERIR, (categoria.nome,))
-        return cursor.lastrowid
-    
-def obter_todos() -> list[Categoria]:
+        id_inserido = cursor.lastrowid
+        versao_repo.incrementar(DOMINIOS_ALTERADOS, cursor)
+        return id_inserido
+
+@cache_categorias.invalidando
+@altera_catalogo
+def inserir_lote(categorias: list[Categoria], tamanho_lote: int = TAMANHO_LOTE) -> list[int]:
+    """Insere várias categorias com executemany e retorna os ids gerados, na ordem da lista"""
+    ids = []
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        for inicio in range(0, len(categorias), tamanho_lote):
+            lote = categorias[inicio:inicio + tamanho_lote]
+            cursor.executemany(INSERIR, [(categoria.nome,) for categoria in lote])
+            # Dentro da transação os ids de AUTOINCREMENT são sequenciais
+            ultimo_id = cursor.execute(OBTER_ULTIMO_ID).fetchone()[0]
+            ids.extend(range(ultimo_id - len(lote) + 1, ultimo_id + 1))
+            versao_repo.incrementar(DOMINIOS_ALTERADOS, cursor)
+            conn.commit()
+    return ids
+
+def _carregar_todos() -> list[Categoria]:
     with get_connection() as conn:
         cursor = conn.cursor()
+        cursor.row_factory = LINHA_CATEGORIA
         cursor.execute(OBTER_TODOS)
-        rows = cursor.fetchall()
-        categorias = [
-            Categoria(id=row["id"], nome=row["nome"])
-            for row in rows]
+        categorias = cursor.fetchall()
         return categorias
     
+def obter_todos() -> list[Categoria]:
+    return cache_categorias.obter("todos", _carregar_todos)
+    
 def obter_por_id(id: int) -> Optional[Categoria]:
-    with get_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute(OBTER_POR_ID, (id,))
-        row = cursor.fetchone()
-        if row:
-            return Categoria(id=row["id"], nome=row["nome"])
-        return None
+    por_id = cache_categorias.obter("por_id", lambda: {c.id: c for c in obter_todos()})
+    return por_id.get(id)
     
+@cache_categorias.invalidando
+@altera_catalogo
 def excluir_por_id(id: int) -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute(EXCLUIR_POR_ID, (id,))
-        return (cursor.rowcount > 0)
+        sucesso = cursor.rowcount > 0
+        versao_repo.incrementar(DOMINIOS_ALTERADOS, cursor)
+        return sucesso
+
+@cache_categorias.invalidando
+@altera_catalogo
+def excluir_lote(ids: list[int], tamanho_lote: int = TAMANHO_LOTE) -> int:
+    """Exclui várias categorias e retorna quantas foram removidas"""
+    excluidas = 0
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        for inicio in range(0, len(ids), tamanho_lote):
+            cursor.executemany(EXCLUIR_POR_ID, [(id,) for id in ids[inicio:inicio + tamanho_lote]])
+            excluidas += cursor.rowcount
+            versao_repo.incrementar(DOMINIOS_ALTERADOS, cursor)
+            conn.commit()
+    return excluidas
     
+@cache_categorias.invalidando
+@altera_catalogo
 def atualizar(categoria: Categoria) -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute(ALTERAR, (categoria.nome, categoria.id))
-        return (cursor.rowcount > 0)
\ No newline at end of file
+        sucesso = cursor.rowcount > 0
+        versao_repo.incrementar(DOMINIOS_ALTERADOS, cursor)
+        return sucesso
+
+@cache_categorias.invalidando
+@altera_catalogo
+def alterar_lote(categorias: list[Categoria], tamanho_lote: int = TAMANHO_LOTE) -> int:
+    """Altera várias categorias e retorna quantas foram atualizadas"""
+    alteradas = 0
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        for inicio in range(0, len(categorias), tamanho_lote):
+            cursor.executemany(ALTERAR, [
+                (categoria.nome, categoria.id)
+                for categoria in categorias[inicio:inicio + tamanho_lote]])
+            alteradas += cursor.rowcount
+            versao_repo.incrementar(DOMINIOS_ALTERADOS, cursor)
+            conn.commit()
+    return alteradas
+
+
+# Versões assíncronas para uso nas rotas, executadas fora do event loop
+obter_todos_async = leitura_async(obter_todos)
+obter_por_id_async = leitura_async(obter_por_id)
+inserir_async = escrita_async(inserir)
+atualizar_async = escrita_async(atualizar)
+excluir_por_id_async = escrita_async(excluir_por_id)
+inserir_lote_async = escrita_async(inserir_lote)
+alterar_lote_async = escrita_async(alterar_lote)
+excluir_lote_async = escrita_async(excluir_lote)
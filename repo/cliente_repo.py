@@ -1,15 +1,16 @@
 from typing import Optional
 from repo import usuario_repo
 from model.cliente_model import Cliente
+from model.pagina_model import Pagina
 from sql.cliente_sql import *
 from model.usuario_model import Usuario
-from util.db_util import get_connection
+from util.db_util import fabrica_modelo, get_connection, leitura_async, escrita_async
+from util.paginacao_util import CHAVE_INICIAL, montar_pagina
 
-def criar_tabela() -> bool:
-    with get_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute(CRIAR_TABELA)
-        return cursor.rowcount > 0
+# Quantidade de linhas confirmadas por commit nas operações em lote
+TAMANHO_LOTE = 1000
+
+LINHA_CLIENTE = fabrica_modelo(Cliente)
 
 def inserir(cliente: Cliente) -> Optional[int]:
     with get_connection() as conn:
@@ -28,6 +29,27 @@ def inserir(cliente: Cliente) -> Optional[int]:
             cliente.telefone))
         return id_usuario
 
+def inserir_lote(clientes: list[Cliente], tamanho_lote: int = TAMANHO_LOTE) -> list[int]:
+    """Insere vários clientes (usuário + cliente) e retorna os ids gerados, na ordem da lista"""
+    ids = []
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        for inicio in range(0, len(clientes), tamanho_lote):
+            lote = clientes[inicio:inicio + tamanho_lote]
+            for cliente in lote:
+                assert cliente.nome is not None, "Nome do cliente é obrigatório"
+                assert cliente.email is not None, "Email do cliente é obrigatório"
+                assert cliente.senha is not None, "Senha do cliente é obrigatória"
+            ids_lote = usuario_repo.inserir_lote([
+                Usuario(0, cliente.nome, cliente.email, cliente.senha)
+                for cliente in lote], cursor)
+            cursor.executemany(INSERIR, [
+                (id_usuario, cliente.cpf, cliente.telefone)
+                for id_usuario, cliente in zip(ids_lote, lote)])
+            ids.extend(ids_lote)
+            conn.commit()
+    return ids
+
 def alterar(cliente: Cliente) -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
@@ -44,6 +66,29 @@ def alterar(cliente: Cliente) -> bool:
             cliente.telefone,
             cliente.id))
         return (cursor.rowcount > 0)
+
+def alterar_contato(id: int, cpf: Optional[str], telefone: Optional[str]) -> bool:
+    """Altera só os dados próprios do cliente (CPF e telefone)"""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(ALTERAR, (cpf, telefone, id))
+        return (cursor.rowcount > 0)
+
+def alterar_lote(clientes: list[Cliente], tamanho_lote: int = TAMANHO_LOTE) -> int:
+    """Altera vários clientes (usuário + cliente) e retorna quantos foram atualizados"""
+    alterados = 0
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        for inicio in range(0, len(clientes), tamanho_lote):
+            lote = clientes[inicio:inicio + tamanho_lote]
+            usuario_repo.alterar_lote([
+                Usuario(cliente.id, cliente.nome, cliente.email, cliente.senha)
+                for cliente in lote], cursor)
+            cursor.executemany(ALTERAR, [
+                (cliente.cpf, cliente.telefone, cliente.id) for cliente in lote])
+            alterados += cursor.rowcount
+            conn.commit()
+    return alterados
     
 def excluir(id: int) -> bool:
     with get_connection() as conn:
@@ -52,32 +97,55 @@ def excluir(id: int) -> bool:
         usuario_repo.excluir(id, cursor)
         return (cursor.rowcount > 0)
 
+def excluir_lote(ids: list[int], tamanho_lote: int = TAMANHO_LOTE) -> int:
+    """Exclui vários clientes (cliente + usuário) e retorna quantos foram removidos"""
+    excluidos = 0
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        for inicio in range(0, len(ids), tamanho_lote):
+            lote = [(id,) for id in ids[inicio:inicio + tamanho_lote]]
+            cursor.executemany(EXCLUIR, lote)
+            excluidos += cursor.rowcount
+            usuario_repo.excluir_lote([id for (id,) in lote], cursor)
+            conn.commit()
+    return excluidos
+
 def obter_por_id(id: int) -> Optional[Cliente]:
     with get_connection() as conn:
         cursor = conn.cursor()
+        cursor.row_factory = LINHA_CLIENTE
         cursor.execute(OBTER_POR_ID, (id,))
-        row = cursor.fetchone()
-        cliente = Cliente(
-            id=row["id"],
-            nome=row["nome"],
-            cpf=row["cpf"],
-            email=row["email"],
-            telefone=row["telefone"],
-            senha=row["senha"])
+        cliente = cursor.fetchone()
         return cliente
     
 def obter_todos() -> list[Cliente]:
     with get_connection() as conn:
         cursor = conn.cursor()
+        cursor.row_factory = LINHA_CLIENTE
         cursor.execute(OBTER_TODOS)
-        rows = cursor.fetchall()
-        clientes = [
-            Cliente(
-                id=row["id"], 
-                nome=row["nome"], 
-                cpf=row["cpf"],
-                email=row["email"],
-                telefone=row["telefone"],
-                senha=row["senha"]) 
-                for row in rows]
-        return clientes
\ No newline at end of file
+        clientes = cursor.fetchall()
+        return clientes
+
+def obter_pagina(limite: int, apos: Optional[tuple] = None, antes: Optional[tuple] = None) -> Pagina[Cliente]:
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = LINHA_CLIENTE
+        if antes is not None:
+            cursor.execute(OBTER_PAGINA_ANTERIOR, (*antes, limite + 1))
+        else:
+            cursor.execute(OBTER_PAGINA, (*(apos or CHAVE_INICIAL), limite + 1))
+        clientes = cursor.fetchall()
+        return montar_pagina(clientes, limite, lambda c: (c.nome, c.id), apos, antes)
+
+
+# Versões assíncronas para uso nas rotas, executadas fora do event loop
+obter_por_id_async = leitura_async(obter_por_id)
+obter_todos_async = leitura_async(obter_todos)
+obter_pagina_async = leitura_async(obter_pagina)
+inserir_async = escrita_async(inserir)
+alterar_async = escrita_async(alterar)
+alterar_contato_async = escrita_async(alterar_contato)
+excluir_async = escrita_async(excluir)
+inserir_lote_async = escrita_async(inserir_lote)
+alterar_lote_async = escrita_async(alterar_lote)
+excluir_lote_async = escrita_async(excluir_lote)
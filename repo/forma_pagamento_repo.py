@@ -1,16 +1,21 @@
 from typing import Optional
 from model.forma_pagamento_model import FormaPagamento
+from repo import versao_repo
 from sql.forma_pagamento_sql import *
-from util.db_util import get_connection
+from util.cache_util import criar_cache_referencia
+from util.db_util import fabrica_modelo, get_connection, leitura_async, escrita_async
+from util.versao_util import DOMINIO_FORMAS_PAGAMENTO
 
+LINHA_FORMA_PAGAMENTO = fabrica_modelo(FormaPagamento)
 
-def criar_tabela() -> bool:
-    with get_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute(CRIAR_TABELA)
-        return cursor.rowcount > 0
+# Versões compartilhadas incrementadas na transação de cada escrita
+DOMINIOS_ALTERADOS = (DOMINIO_FORMAS_PAGAMENTO,)
+
+# Formas de pagamento mudam raramente: as leituras vêm do cache, invalidado nas escritas
+cache_formas_pagamento = criar_cache_referencia("formas_pagamento", DOMINIO_FORMAS_PAGAMENTO)
 
 
+@cache_formas_pagamento.invalidando
 def inserir(forma_pagamento: FormaPagamento) -> Optional[int]:
     with get_connection() as conn:
         cursor = conn.cursor()
@@ -18,35 +23,28 @@ def inserir(forma_pagamento: FormaPagamento) -> Optional[int]:
             forma_pagamento.nome, 
             forma_pagamento.desconto))
         id_inserido = cursor.lastrowid
+        versao_repo.incrementar(DOMINIOS_ALTERADOS, cursor)
         return id_inserido
 
 
-def obter_todas() -> list[FormaPagamento]:
+def _carregar_todas() -> list[FormaPagamento]:
     with get_connection() as conn:
         cursor = conn.cursor()
+        cursor.row_factory = LINHA_FORMA_PAGAMENTO
         cursor.execute(OBTER_TODOS)
-        rows = cursor.fetchall()
-        return [FormaPagamento(
-            id=row["id"], 
-            nome=row["nome"], 
-            desconto=row["desconto"])
-            for row in rows]
+        return cursor.fetchall()
+
+
+def obter_todas() -> list[FormaPagamento]:
+    return cache_formas_pagamento.obter("todas", _carregar_todas)
 
 
 def obter_por_id(id: int) -> Optional[FormaPagamento]:
-    with get_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute(OBTER_POR_ID, (id,))
-        row = cursor.fetchone()
-        if row:
-            return FormaPagamento(
-                id=row["id"],
-                nome=row["nome"],
-                desconto=row["desconto"]
-            )
-        return None
+    por_id = cache_formas_pagamento.obter("por_id", lambda: {f.id: f for f in obter_todas()})
+    return por_id.get(id)
 
 
+@cache_formas_pagamento.invalidando
 def atualizar(forma_pagamento: FormaPagamento) -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
@@ -55,11 +53,24 @@ def atualizar(forma_pagamento: FormaPagamento) -> bool:
             forma_pagamento.desconto,
             forma_pagamento.id
         ))
-        return cursor.rowcount > 0
+        sucesso = cursor.rowcount > 0
+        versao_repo.incrementar(DOMINIOS_ALTERADOS, cursor)
+        return sucesso
 
 
+@cache_formas_pagamento.invalidando
 def excluir_por_id(id: int) -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute(EXCLUIR_POR_ID, (id,))
-        return cursor.rowcount > 0
+        sucesso = cursor.rowcount > 0
+        versao_repo.incrementar(DOMINIOS_ALTERADOS, cursor)
+        return sucesso
+
+
+# Versões assíncronas para uso nas rotas, executadas fora do event loop
+obter_todas_async = leitura_async(obter_todas)
+obter_por_id_async = leitura_async(obter_por_id)
+inserir_async = escrita_async(inserir)
+atualizar_async = escrita_async(atualizar)
+excluir_por_id_async = escrita_async(excluir_por_id)
@@ -0,0 +1,25 @@
+import time
+from typing import Optional
+from sql.lease_sql import *
+from util.db_util import get_connection
+
+def adquirir(chave: str, dono: str, duracao: float) -> bool:
+    """Tenta obter a lease da chave por `duracao` segundos; False se outro dono a detém"""
+    agora = time.time()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(ADQUIRIR, (chave, dono, agora + duracao, agora))
+        return (cursor.rowcount > 0)
+
+def liberar(chave: str, dono: str) -> bool:
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(LIBERAR, (chave, dono))
+        return (cursor.rowcount > 0)
+
+def obter_por_chave(chave: str) -> Optional[tuple[str, float]]:
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(OBTER_POR_CHAVE, (chave,))
+        row = cursor.fetchone()
+        return (row[0], row[1]) if row else None
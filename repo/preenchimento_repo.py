@@ -0,0 +1,15 @@
+from sql.preenchimento_sql import *
+from util.db_util import get_connection
+
+def inserir(etapa: str) -> bool:
+    """Registra a etapa de preenchimento como concluída"""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(INSERIR, (etapa,))
+        return (cursor.rowcount > 0)
+
+def obter_concluidas() -> set[str]:
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(OBTER_CONCLUIDAS)
+        return {etapa for (etapa,) in cursor.fetchall()}
@@ -0,0 +1,107 @@
+import json
+from typing import Any, Optional
+from model.produto_foto_model import ProdutoFoto
+from sql.produto_foto_sql import *
+from util.db_util import fabrica_modelo, get_connection
+
+LINHA_PRODUTO_FOTO = fabrica_modelo(ProdutoFoto)
+
+def inserir(foto: ProdutoFoto) -> Optional[int]:
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(INSERIR, (
+            foto.produto_id,
+            foto.ordem,
+            foto.arquivo,
+            foto.largura,
+            foto.altura,
+            foto.tamanho,
+            foto.hash,
+            foto.larguras,
+            foto.formatos))
+        return cursor.lastrowid
+
+def excluir(id: int) -> bool:
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(EXCLUIR, (id,))
+        return (cursor.rowcount > 0)
+
+def excluir_por_produto(produto_id: int, cursor: Any = None) -> int:
+    """Remove o manifesto das fotos do produto; com cursor, na transação da exclusão do produto"""
+    if cursor:
+        cursor.execute(EXCLUIR_POR_PRODUTO, (produto_id,))
+        return cursor.rowcount
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(EXCLUIR_POR_PRODUTO, (produto_id,))
+        return cursor.rowcount
+
+def excluir_por_produtos(produto_ids: list[int], cursor: Any) -> int:
+    """Remove o manifesto das fotos de vários produtos na transação do cursor informado"""
+    cursor.executemany(EXCLUIR_POR_PRODUTO, [(produto_id,) for produto_id in produto_ids])
+    return cursor.rowcount
+
+def deslocar(produto_id: int, a_partir_de: int, deslocamento: int) -> int:
+    """Soma `deslocamento` à ordem das fotos do produto a partir da posição informada"""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(DESLOCAR, (deslocamento, produto_id, a_partir_de))
+        return cursor.rowcount
+
+def alterar_ordens(ordens: list[tuple[int, int]]) -> int:
+    """Grava a nova ordem de várias fotos; recebe pares (ordem, id)"""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.executemany(ALTERAR_ORDEM, ordens)
+        return cursor.rowcount
+
+def alterar_versoes(id: int, larguras: str, formatos: str) -> bool:
+    """Grava as larguras e os formatos gerados para uma foto registrada sem eles"""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(ALTERAR_VERSOES, (larguras, formatos, id))
+        return (cursor.rowcount > 0)
+
+def obter_incompletas() -> list[ProdutoFoto]:
+    """Fotos sem as versões reduzidas ou sem os formatos alternativos"""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = LINHA_PRODUTO_FOTO
+        cursor.execute(SELECIONAR_INCOMPLETAS)
+        return cursor.fetchall()
+
+def obter_por_produto(produto_id: int) -> list[ProdutoFoto]:
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = LINHA_PRODUTO_FOTO
+        cursor.execute(OBTER_POR_PRODUTO, (produto_id,))
+        return cursor.fetchall()
+
+def obter_por_ordem(produto_id: int, ordem: int) -> Optional[ProdutoFoto]:
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = LINHA_PRODUTO_FOTO
+        cursor.execute(OBTER_POR_ORDEM, (produto_id, ordem))
+        return cursor.fetchone()
+
+def obter_principais(produto_ids: list[int]) -> list[ProdutoFoto]:
+    """Foto principal (ordem 1) de cada produto informado que tiver fotos, em uma única consulta"""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = LINHA_PRODUTO_FOTO
+        cursor.execute(OBTER_PRINCIPAIS, (json.dumps(list(produto_ids)),))
+        return cursor.fetchall()
+
+def obter_por_hash(produto_id: int, hash: str) -> Optional[ProdutoFoto]:
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = LINHA_PRODUTO_FOTO
+        cursor.execute(OBTER_POR_HASH, (produto_id, hash))
+        return cursor.fetchone()
+
+def obter_proxima_ordem(produto_id: int) -> int:
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(OBTER_PROXIMA_ORDEM, (produto_id,))
+        return cursor.fetchone()[0]
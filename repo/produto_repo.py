@@ -1,95 +1,219 @@
+import os
 from typing import Optional
+from model.pagina_model import Pagina
+from model.produto_detalhes_model import ProdutoDetalhes
 from model.produto_model import Produto
+from model.produto_resumo_model import ProdutoResumo
+from repo import produto_foto_repo, versao_repo
 from sql.produto_sql import *
-from util.db_util import get_connection
+from util.cache_util import criar_cache_lru
+from util.db_util import fabrica_modelo, get_connection, leitura_async, escrita_async
+from util.paginacao_util import CHAVE_INICIAL, montar_pagina
+from util.versao_util import DOMINIO_CATALOGO, altera_catalogo, obter_versao_catalogo
 
-def criar_tabela() -> bool:
-    with get_connection() as conn:
-        cursor = conn.cursor()
-        
-        # Verifica se a tabela existe
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='produto'")
-        tabela_existe = cursor.fetchone() is not None
-        
-        if tabela_existe:
-            # Verifica se a coluna categoria_id existe
-            cursor.execute("PRAGMA table_info(produto)")
-            colunas = cursor.fetchall()
-            tem_categoria = any(col[1] == 'categoria_id' for col in colunas)
-            
-            if not tem_categoria:
-                try:
-                    # Adiciona a coluna categoria_id com valor padrão 1
-                    cursor.execute("ALTER TABLE produto ADD COLUMN categoria_id INTEGER DEFAULT 1")
-                    conn.commit()
-                except:
-                    pass
-        else:
-            # Cria a tabela nova com categoria_id
-            cursor.execute(CRIAR_TABELA)
-        
-        return True
+# Quantidade de linhas confirmadas por commit nas operações em lote
+TAMANHO_LOTE = 1000
+
+# Versões compartilhadas incrementadas na transação de cada escrita
+DOMINIOS_ALTERADOS = (DOMINIO_CATALOGO,)
+
+# Tamanho máximo do resumo exibido nas listagens
+TAMANHO_RESUMO = 160
 
+def gerar_resumo(descricao: str) -> str:
+    """Resumo da descrição para as listagens, calculado na gravação do produto"""
+    texto = " ".join(descricao.split())
+    if len(texto) <= TAMANHO_RESUMO:
+        return texto
+    return texto[:TAMANHO_RESUMO - 3].rstrip() + "..."
+
+# As consultas trazem as colunas na ordem dos campos dos modelos
+LINHA_PRODUTO = fabrica_modelo(Produto)
+LINHA_PRODUTO_RESUMO = fabrica_modelo(ProdutoResumo)
+
+# Detalhes dos produtos mais vistos; qualquer alteração do catálogo (produto,
+# categoria ou fotos) muda a versão e descarta o cache
+cache_detalhes = criar_cache_lru(
+    "detalhes_produto",
+    max_entradas=int(os.getenv("CACHE_DETALHES_TAMANHO", "512")),
+    ttl=float(os.getenv("CACHE_DETALHES_TTL", "300")),
+    versao=obter_versao_catalogo)
+
+@altera_catalogo
 def inserir(produto: Produto) -> Optional[int]:
     with get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute(INSERIR, (
             produto.nome, 
             produto.descricao, 
+            gerar_resumo(produto.descricao),
             produto.preco, 
             produto.quantidade,
             produto.categoria_id))
-        return cursor.lastrowid
+        id_inserido = cursor.lastrowid
+        versao_repo.incrementar(DOMINIOS_ALTERADOS, cursor)
+        return id_inserido
+
+@altera_catalogo
+def inserir_lote(produtos: list[Produto], tamanho_lote: int = TAMANHO_LOTE) -> list[int]:
+    """Insere vários produtos com executemany e retorna os ids gerados, na ordem da lista"""
+    ids = []
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        for inicio in range(0, len(produtos), tamanho_lote):
+            lote = produtos[inicio:inicio + tamanho_lote]
+            cursor.executemany(INSERIR, [(
+                produto.nome, 
+                produto.descricao, 
+                gerar_resumo(produto.descricao),
+                produto.preco, 
+                produto.quantidade,
+                produto.categoria_id) for produto in lote])
+            # Dentro da transação os ids de AUTOINCREMENT são sequenciais
+            ultimo_id = cursor.execute(OBTER_ULTIMO_ID).fetchone()[0]
+            ids.extend(range(ultimo_id - len(lote) + 1, ultimo_id + 1))
+            versao_repo.incrementar(DOMINIOS_ALTERADOS, cursor)
+            conn.commit()
+    return ids
 
 def obter_todos() -> list[Produto]:
     with get_connection() as conn:
         cursor = conn.cursor()
+        cursor.row_factory = LINHA_PRODUTO
         cursor.execute(OBTER_TODOS)
-        rows = cursor.fetchall()
-        produtos = [
-            Produto(
-                id=row["id"], 
-                nome=row["nome"], 
-                descricao=row["descricao"], 
-                preco=row["preco"], 
-                quantidade=row["quantidade"],
-                categoria_id=row["categoria_id"],
-                categoria_nome=row["categoria_nome"])
-            for row in rows]
+        produtos = cursor.fetchall()
         return produtos
+
+def obter_pagina(limite: int, apos: Optional[tuple] = None, antes: Optional[tuple] = None) -> Pagina[ProdutoResumo]:
+    """Página da listagem de produtos, sem a descrição completa"""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = LINHA_PRODUTO_RESUMO
+        if antes is not None:
+            cursor.execute(OBTER_PAGINA_ANTERIOR, (*antes, limite + 1))
+        else:
+            cursor.execute(OBTER_PAGINA, (*(apos or CHAVE_INICIAL), limite + 1))
+        produtos = cursor.fetchall()
+        return montar_pagina(produtos, limite, lambda p: (p.nome, p.id), apos, antes)
     
+def obter_catalogo() -> list[ProdutoResumo]:
+    """Todos os produtos na projeção da listagem, na ordem das páginas"""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = LINHA_PRODUTO_RESUMO
+        cursor.execute(OBTER_CATALOGO)
+        return cursor.fetchall()
+
 def obter_por_id(id: int) -> Optional[Produto]:
     with get_connection() as conn:
         cursor = conn.cursor()
+        cursor.row_factory = LINHA_PRODUTO
         cursor.execute(OBTER_POR_ID, (id,))
-        row = cursor.fetchone()
-        if row:
-            produto = Produto(
-                id=row["id"], 
-                nome=row["nome"], 
-                descricao=row["descricao"], 
-                preco=row["preco"], 
-                quantidade=row["quantidade"],
-                categoria_id=row["categoria_id"],
-                categoria_nome=row["categoria_nome"])
-            return produto
-        return None
+        return cursor.fetchone()
     
 
+def _carregar_detalhes(id: int) -> Optional[ProdutoDetalhes]:
+    produto = obter_por_id(id)
+    if produto is None:
+        return None
+    return ProdutoDetalhes(produto, produto_foto_repo.obter_por_produto(id))
+
+def obter_detalhes(id: int) -> Optional[ProdutoDetalhes]:
+    """Produto com a categoria e o manifesto das fotos em ordem, para a página de detalhes"""
+    return cache_detalhes.obter(id, lambda: _carregar_detalhes(id))
+
+@altera_catalogo
+def preencher_resumos() -> int:
+    """Calcula o resumo dos produtos gravados antes da coluna existir; retorna quantos"""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(SELECIONAR_SEM_RESUMO)
+        produtos = cursor.fetchall()
+        if produtos:
+            cursor.executemany(ATUALIZAR_RESUMO, [(gerar_resumo(descricao), id) for id, descricao in produtos])
+            versao_repo.incrementar(DOMINIOS_ALTERADOS, cursor)
+        return len(produtos)
+
+@altera_catalogo
+def tocar(id: int) -> bool:
+    """Atualiza atualizado_em de um produto alterado fora da tabela (fotos)"""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(TOCAR, (id,))
+        sucesso = cursor.rowcount > 0
+        versao_repo.incrementar(DOMINIOS_ALTERADOS, cursor)
+        return sucesso
+
+@altera_catalogo
 def excluir_por_id(id: int) -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute(EXCLUIR_POR_ID, (id,))
-        return (cursor.rowcount > 0)
+        sucesso = cursor.rowcount > 0
+        produto_foto_repo.excluir_por_produto(id, cursor)
+        versao_repo.incrementar(DOMINIOS_ALTERADOS, cursor)
+        return sucesso
 
+@altera_catalogo
+def excluir_lote(ids: list[int], tamanho_lote: int = TAMANHO_LOTE) -> int:
+    """Exclui vários produtos e retorna quantos foram removidos"""
+    excluidos = 0
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        for inicio in range(0, len(ids), tamanho_lote):
+            lote = ids[inicio:inicio + tamanho_lote]
+            cursor.executemany(EXCLUIR_POR_ID, [(id,) for id in lote])
+            excluidos += cursor.rowcount
+            produto_foto_repo.excluir_por_produtos(lote, cursor)
+            versao_repo.incrementar(DOMINIOS_ALTERADOS, cursor)
+            conn.commit()
+    return excluidos
+
+@altera_catalogo
 def alterar(produto: Produto) -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute(ALTERAR, (
             produto.nome,
             produto.descricao,
+            gerar_resumo(produto.descricao),
             produto.preco,
             produto.quantidade,
             produto.categoria_id,
             produto.id))
-        return cursor.rowcount > 0
\ No newline at end of file
+        sucesso = cursor.rowcount > 0
+        versao_repo.incrementar(DOMINIOS_ALTERADOS, cursor)
+        return sucesso
+
+@altera_catalogo
+def alterar_lote(produtos: list[Produto], tamanho_lote: int = TAMANHO_LOTE) -> int:
+    """Altera vários produtos e retorna quantos foram atualizados"""
+    alterados = 0
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        for inicio in range(0, len(produtos), tamanho_lote):
+            cursor.executemany(ALTERAR, [(
+                produto.nome,
+                produto.descricao,
+                gerar_resumo(produto.descricao),
+                produto.preco,
+                produto.quantidade,
+                produto.categoria_id,
+                produto.id) for produto in produtos[inicio:inicio + tamanho_lote]])
+            alterados += cursor.rowcount
+            versao_repo.incrementar(DOMINIOS_ALTERADOS, cursor)
+            conn.commit()
+    return alterados
+
+
+# Versões assíncronas para uso nas rotas, executadas fora do event loop
+obter_todos_async = leitura_async(obter_todos)
+obter_por_id_async = leitura_async(obter_por_id)
+obter_pagina_async = leitura_async(obter_pagina)
+obter_detalhes_async = leitura_async(obter_detalhes)
+inserir_async = escrita_async(inserir)
+alterar_async = escrita_async(alterar)
+excluir_por_id_async = escrita_async(excluir_por_id)
+inserir_lote_async = escrita_async(inserir_lote)
+alterar_lote_async = escrita_async(alterar_lote)
+excluir_lote_async = escrita_async(excluir_lote)
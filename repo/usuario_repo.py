@@ -2,13 +2,9 @@ from typing import Any, Optional
 from datetime import datetime
 from model.usuario_model import Usuario
 from sql.usuario_sql import *
-from util.db_util import get_connection
+from util.db_util import fabrica_modelo, get_connection, leitura_async, escrita_async
 
-def criar_tabela() -> bool:
-    with get_connection() as conn:
-        cursor = conn.cursor()
-        cursor.execute(CRIAR_TABELA)
-        return (cursor.rowcount > 0)
+LINHA_USUARIO = fabrica_modelo(Usuario)
 
 def inserir(usuario: Usuario, cursor: Any = None) -> Optional[int]:
     if cursor:
@@ -28,6 +24,17 @@ def inserir(usuario: Usuario, cursor: Any = None) -> Optional[int]:
                 usuario.perfil))
             return cursor.lastrowid
     
+def inserir_lote(usuarios: list[Usuario], cursor: Any) -> list[int]:
+    """Insere vários usuários na transação do cursor informado e retorna os ids gerados"""
+    cursor.executemany(INSERIR, [(
+        usuario.nome,
+        usuario.email,
+        usuario.senha,
+        usuario.perfil) for usuario in usuarios])
+    # Dentro da transação os ids de AUTOINCREMENT são sequenciais
+    ultimo_id = cursor.execute(OBTER_ULTIMO_ID).fetchone()[0]
+    return list(range(ultimo_id - len(usuarios) + 1, ultimo_id + 1))
+    
 def alterar(usuario: Usuario, cursor: Any = None) -> bool:
     if cursor:
         cursor.execute(ALTERAR, (
@@ -44,6 +51,14 @@ def alterar(usuario: Usuario, cursor: Any = None) -> bool:
                 usuario.id))
             return (cursor.rowcount > 0)
     
+def alterar_lote(usuarios: list[Usuario], cursor: Any) -> int:
+    """Altera vários usuários na transação do cursor informado"""
+    cursor.executemany(ALTERAR, [(
+        usuario.nome,
+        usuario.email,
+        usuario.id) for usuario in usuarios])
+    return cursor.rowcount
+    
 def atualizar_senha(id: int, senha: str, cursor: Any = None) -> bool:
     if cursor:
         cursor.execute(ALTERAR_SENHA, (senha, id))
@@ -64,55 +79,32 @@ def excluir(id: int, cursor: Any = None) -> bool:
             cursor.execute(EXCLUIR, (id,))
             return (cursor.rowcount > 0)
     
+def excluir_lote(ids: list[int], cursor: Any) -> int:
+    """Exclui vários usuários na transação do cursor informado"""
+    cursor.executemany(EXCLUIR, [(id,) for id in ids])
+    return cursor.rowcount
+    
 def obter_por_id(id: int) -> Optional[Usuario]:
     with get_connection() as conn:
         cursor = conn.cursor()
+        cursor.row_factory = LINHA_USUARIO
         cursor.execute(OBTER_POR_ID, (id,))
-        row = cursor.fetchone()
-        if row:
-            usuario = Usuario(
-                    id=row["id"], 
-                    nome=row["nome"],
-                    email=row["email"],
-                    senha=row["senha"],
-                    perfil=row["perfil"],
-                    foto=row["foto"],
-                    token_redefinicao=row["token_redefinicao"],
-                    data_token=row["data_token"])
-            return usuario
-        return None
+        return cursor.fetchone()
 
 def obter_todos() -> list[Usuario]:
     with get_connection() as conn:
         cursor = conn.cursor()
+        cursor.row_factory = LINHA_USUARIO
         cursor.execute(OBTER_TODOS)
-        rows = cursor.fetchall()
-        usuarios = [
-            Usuario(
-                id=row["id"], 
-                nome=row["nome"],
-                email=row["email"],
-                senha=row["senha"],
-                perfil=row["perfil"],
-                foto=row["foto"]) 
-                for row in rows]
+        usuarios = cursor.fetchall()
         return usuarios
 
 def obter_por_email(email: str) -> Optional[Usuario]:
     with get_connection() as conn:
         cursor = conn.cursor()
+        cursor.row_factory = LINHA_USUARIO
         cursor.execute(OBTER_POR_EMAIL, (email,))
-        row = cursor.fetchone()
-        if row:
-            usuario = Usuario(
-                    id=row["id"], 
-                    nome=row["nome"],
-                    email=row["email"],
-                    senha=row["senha"],
-                    perfil=row["perfil"],
-                    foto=row["foto"])
-            return usuario
-        return None
+        return cursor.fetchone()
 
 def atualizar_token(email: str, token: str, data_expiracao: str) -> bool:
     with get_connection() as conn:
@@ -129,42 +121,35 @@ def atualizar_foto(id: int, caminho_foto: str) -> bool:
 def obter_por_token(token: str) -> Optional[Usuario]:
     with get_connection() as conn:
         cursor = conn.cursor()
+        cursor.row_factory = LINHA_USUARIO
         cursor.execute(OBTER_POR_TOKEN, (token,))
-        row = cursor.fetchone()
-        if row:
-            usuario = Usuario(
-                    id=row["id"], 
-                    nome=row["nome"],
-                    email=row["email"],
-                    senha=row["senha"],
-                    perfil=row["perfil"],
-                    foto=row["foto"],
-                    token_redefinicao=row["token_redefinicao"],
-                    data_token=row["data_token"])
-            return usuario
-        return None
+        return cursor.fetchone()
 
 def limpar_token(id: int) -> bool:
     with get_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute("UPDATE usuario SET token_redefinicao=NULL, data_token=NULL WHERE id=?", (id,))
+        cursor.execute(LIMPAR_TOKEN, (id,))
         return (cursor.rowcount > 0)
 
 def obter_todos_por_perfil(perfil: str) -> list[Usuario]:
     with get_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM usuario WHERE perfil=? ORDER BY nome", (perfil,))
-        rows = cursor.fetchall()
-        usuarios = []
-        for row in rows:
-            usuario = Usuario(
-                id=row["id"], 
-                nome=row["nome"],
-                email=row["email"],
-                senha=row["senha"],
-                perfil=row["perfil"],
-                foto=row["foto"],
-                data_cadastro=row["data_cadastro"]
-            )
-            usuarios.append(usuario)
-        return usuarios
\ No newline at end of file
+        cursor.row_factory = LINHA_USUARIO
+        cursor.execute(OBTER_TODOS_POR_PERFIL, (perfil,))
+        usuarios = cursor.fetchall()
+        return usuarios
+
+
+# Versões assíncronas para uso nas rotas, executadas fora do event loop
+obter_por_id_async = leitura_async(obter_por_id)
+obter_todos_async = leitura_async(obter_todos)
+obter_por_email_async = leitura_async(obter_por_email)
+obter_por_token_async = leitura_async(obter_por_token)
+obter_todos_por_perfil_async = leitura_async(obter_todos_por_perfil)
+inserir_async = escrita_async(inserir)
+alterar_async = escrita_async(alterar)
+atualizar_senha_async = escrita_async(atualizar_senha)
+excluir_async = escrita_async(excluir)
+atualizar_token_async = escrita_async(atualizar_token)
+atualizar_foto_async = escrita_async(atualizar_foto)
+limpar_token_async = escrita_async(limpar_token)
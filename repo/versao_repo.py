@@ -0,0 +1,19 @@
+from typing import Any, Iterable
+from sql.versao_sql import *
+from util.db_util import get_connection
+
+def incrementar(dominios: Iterable[str], cursor: Any = None) -> None:
+    """Incrementa a versão dos domínios; com cursor, na mesma transação da escrita"""
+    parametros = [(dominio,) for dominio in dominios]
+    if cursor:
+        cursor.executemany(INCREMENTAR, parametros)
+    else:
+        with get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(INCREMENTAR, parametros)
+
+def obter_todas() -> dict[str, int]:
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(OBTER_TODAS)
+        return {dominio: versao for dominio, versao in cursor.fetchall()}
@@ -19,7 +19,7 @@ templates = criar_templates("templates/admin/categorias")
 @router.get("/")
 @requer_autenticacao(["admin"])
 async def gets(request: Request, usuario_logado: Optional[dict] = None):
-    categorias = categoria_repo.obter_todos()
+    categorias = await categoria_repo.obter_todos_async()
     response = templates.TemplateResponse(
         "listar.html", {"request": request, "categorias": categorias}
     )
@@ -40,7 +40,7 @@ async def post_cadastrar(
     categoria_dto: CriarCategoriaDTO,
     usuario_logado: Optional[dict] = None):
     categoria = Categoria(id=0, nome=categoria_dto.nome)
-    categoria_id = categoria_repo.inserir(categoria)
+    categoria_id = await categoria_repo.inserir_async(categoria)
     if categoria_id:
         toast_sucesso(request, "Categoria criada com sucesso!")
         response = RedirectResponse("/admin/categorias", status.HTTP_303_SEE_OTHER)
@@ -55,7 +55,7 @@ async def post_cadastrar(
 @router.get("/alterar/{id}")
 @requer_autenticacao(["admin"])
 async def get_alterar(request: Request, id: int, usuario_logado: Optional[dict] = None):
-    categoria = categoria_repo.obter_por_id(id)
+    categoria = await categoria_repo.obter_por_id_async(id)
     if categoria:
         response = templates.TemplateResponse(
             "alterar.html", {"request": request, "categoria": categoria}
@@ -71,13 +71,13 @@ async def post_alterar(
     categoria_dto: AlterarCategoriaDTO,
     usuario_logado: Optional[dict] = None):
     categoria = Categoria(id=categoria_dto.id, nome=categoria_dto.nome)
-    if categoria_repo.atualizar(categoria):
+    if await categoria_repo.atualizar_async(categoria):
         toast_sucesso(request, "Categoria alterada com sucesso!")
         response = RedirectResponse(
             "/admin/categorias", status_code=status.HTTP_303_SEE_OTHER
         )
         return response
-    categoria_recuperada = categoria_repo.obter_por_id(categoria_dto.id)
+    categoria_recuperada = await categoria_repo.obter_por_id_async(categoria_dto.id)
     toast_erro(request, "Erro ao alterar categoria")
     return templates.TemplateResponse(
         "alterar.html",
@@ -88,7 +88,7 @@ async def post_alterar(
 @router.get("/excluir/{id}")
 @requer_autenticacao(["admin"])
 async def get_excluir(request: Request, id: int, usuario_logado: Optional[dict] = None):
-    categoria = categoria_repo.obter_por_id(id)
+    categoria = await categoria_repo.obter_por_id_async(id)
     if categoria:
         response = templates.TemplateResponse(
             "excluir.html", {"request": request, "categoria": categoria}
@@ -100,11 +100,11 @@ async def get_excluir(request: Request, id: int, usuario_logado: Optional[dict]
 @router.post("/excluir")
 @requer_autenticacao(["admin"])
 async def post_excluir(request: Request, id: int = Form(...), usuario_logado: Optional[dict] = None):
-    if categoria_repo.excluir_por_id(id):
+    if await categoria_repo.excluir_por_id_async(id):
         toast_sucesso(request, "Categoria excluída com sucesso!")
         response = RedirectResponse("/admin/categorias", status.HTTP_303_SEE_OTHER)
         return response
-    categoria = categoria_repo.obter_por_id(id)
+    categoria = await categoria_repo.obter_por_id_async(id)
     toast_erro(request, "Erro ao excluir categoria")
     return templates.TemplateResponse(
         "excluir.html",
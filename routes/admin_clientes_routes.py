@@ -7,18 +7,27 @@ from model.cliente_model import Cliente
 from repo import cliente_repo
 from util.template_util import criar_templates
 from util.auth_decorator import requer_autenticacao
+from util.paginacao_util import decodificar_cursor
 
 
 router = APIRouter()
 templates = criar_templates("templates/admin/clientes")
 
+CLIENTES_POR_PAGINA = 50
+
 
 @router.get("/")
 @requer_autenticacao(["admin"])
-async def gets(request: Request, usuario_logado: Optional[dict] = None):
-    clientes = cliente_repo.obter_todos()
+async def gets(
+    request: Request,
+    apos: Optional[str] = None,
+    antes: Optional[str] = None,
+    usuario_logado: Optional[dict] = None
+):
+    pagina = await cliente_repo.obter_pagina_async(
+        CLIENTES_POR_PAGINA, decodificar_cursor(apos), decodificar_cursor(antes))
     response = templates.TemplateResponse(
-        "listar.html", {"request": request, "clientes": clientes}
+        "listar.html", {"request": request, "clientes": pagina.itens, "pagina": pagina}
     )
     return response
 
@@ -26,7 +35,7 @@ async def gets(request: Request, usuario_logado: Optional[dict] = None):
 @router.get("/detalhar/{id}")
 @requer_autenticacao(["admin"])
 async def get_detalhar(request: Request, id: int, usuario_logado: Optional[dict] = None):
-    cliente = cliente_repo.obter_por_id(id)
+    cliente = await cliente_repo.obter_por_id_async(id)
     if cliente:
         response = templates.TemplateResponse(
             "detalhar.html", {"request": request, "cliente": cliente}
@@ -57,7 +66,7 @@ async def post_cadastrar(
         telefone=cliente_dto.telefone,
         senha=cliente_dto.senha
     )
-    cliente_id = cliente_repo.inserir(cliente)
+    cliente_id = await cliente_repo.inserir_async(cliente)
     if cliente_id:
         response = RedirectResponse("/admin/clientes", status.HTTP_303_SEE_OTHER)
         return response
@@ -70,7 +79,7 @@ async def post_cadastrar(
 @router.get("/alterar/{id}")
 @requer_autenticacao(["admin"])
 async def get_alterar(request: Request, id: int, usuario_logado: Optional[dict] = None):
-    cliente = cliente_repo.obter_por_id(id)
+    cliente = await cliente_repo.obter_por_id_async(id)
     if cliente:
         response = templates.TemplateResponse(
             "alterar.html", {"request": request, "cliente": cliente}
@@ -89,7 +98,7 @@ async def post_alterar(
     # Se a senha não foi fornecida, buscar a senha atual
     senha = cliente_dto.senha
     if not senha or not senha.strip():
-        cliente_atual = cliente_repo.obter_por_id(cliente_dto.id)
+        cliente_atual = await cliente_repo.obter_por_id_async(cliente_dto.id)
         senha = cliente_atual.senha if cliente_atual else ""
 
     cliente = Cliente(
@@ -100,7 +109,7 @@ async def post_alterar(
         telefone=cliente_dto.telefone,
         senha=senha
     )
-    if cliente_repo.alterar(cliente):
+    if await cliente_repo.alterar_async(cliente):
         response = RedirectResponse(
             "/admin/clientes", status_code=status.HTTP_303_SEE_OTHER
         )
@@ -114,7 +123,7 @@ async def post_alterar(
 @router.get("/excluir/{id}")
 @requer_autenticacao(["admin"])
 async def get_excluir(request: Request, id: int, usuario_logado: Optional[dict] = None):
-    cliente = cliente_repo.obter_por_id(id)
+    cliente = await cliente_repo.obter_por_id_async(id)
     if cliente:
         response = templates.TemplateResponse(
             "excluir.html", {"request": request, "cliente": cliente}
@@ -126,10 +135,10 @@ async def get_excluir(request: Request, id: int, usuario_logado: Optional[dict]
 @router.post("/excluir")
 @requer_autenticacao(["admin"])
 async def post_excluir(request: Request, cliente_dto: ExcluirClienteDTO, usuario_logado: Optional[dict] = None):
-    if cliente_repo.excluir(cliente_dto.id):
+    if await cliente_repo.excluir_async(cliente_dto.id):
         response = RedirectResponse("/admin/clientes", status.HTTP_303_SEE_OTHER)
         return response
-    cliente = cliente_repo.obter_por_id(cliente_dto.id)
+    cliente = await cliente_repo.obter_por_id_async(cliente_dto.id)
     return templates.TemplateResponse(
         "excluir.html",
         {"request": request, "cliente": cliente, "mensagem": "Erro ao excluir cliente."},
@@ -16,7 +16,7 @@ templates = criar_templates("templates/admin/formas")
 @router.get("/")
 @requer_autenticacao(["admin"])
 async def gets(request: Request, usuario_logado: Optional[dict] = None):
-    formas = forma_pagamento_repo.obter_todas()
+    formas = await forma_pagamento_repo.obter_todas_async()
     response = templates.TemplateResponse(
         "listar.html", {"request": request, "formas": formas}
     )
@@ -34,7 +34,7 @@ async def get_cadastrar(request: Request, usuario_logado: Optional[dict] = None)
 @requer_autenticacao(["admin"])
 async def post_cadastrar(request: Request, forma_dto: CriarFormaPagamentoDTO, usuario_logado: Optional[dict] = None):
     forma = FormaPagamento(id=0, nome=forma_dto.nome, desconto=forma_dto.desconto)
-    forma_id = forma_pagamento_repo.inserir(forma)
+    forma_id = await forma_pagamento_repo.inserir_async(forma)
     if forma_id:
         response = RedirectResponse("/admin/formas", status.HTTP_303_SEE_OTHER)
         return response
@@ -47,7 +47,7 @@ async def post_cadastrar(request: Request, forma_dto: CriarFormaPagamentoDTO, us
 @router.get("/alterar/{id}")
 @requer_autenticacao(["admin"])
 async def get_alterar(request: Request, id: int, usuario_logado: Optional[dict] = None):
-    forma = forma_pagamento_repo.obter_por_id(id)
+    forma = await forma_pagamento_repo.obter_por_id_async(id)
     if forma:
         response = templates.TemplateResponse(
             "alterar.html", {"request": request, "forma": forma}
@@ -60,7 +60,7 @@ async def get_alterar(request: Request, id: int, usuario_logado: Optional[dict]
 @requer_autenticacao(["admin"])
 async def post_alterar(request: Request, forma_dto: AlterarFormaPagamentoDTO, usuario_logado: Optional[dict] = None):
     forma = FormaPagamento(id=forma_dto.id, nome=forma_dto.nome, desconto=forma_dto.desconto)
-    if forma_pagamento_repo.atualizar(forma):
+    if await forma_pagamento_repo.atualizar_async(forma):
         response = RedirectResponse(
             "/admin/formas", status_code=status.HTTP_303_SEE_OTHER
         )
@@ -74,7 +74,7 @@ async def post_alterar(request: Request, forma_dto: AlterarFormaPagamentoDTO, us
 @router.get("/excluir/{id}")
 @requer_autenticacao(["admin"])
 async def get_excluir(request: Request, id: int, usuario_logado: Optional[dict] = None):
-    forma = forma_pagamento_repo.obter_por_id(id)
+    forma = await forma_pagamento_repo.obter_por_id_async(id)
     if forma:
         response = templates.TemplateResponse(
             "excluir.html", {"request": request, "forma": forma}
@@ -86,10 +86,10 @@ async def get_excluir(request: Request, id: int, usuario_logado: Optional[dict]
 @router.post("/excluir")
 @requer_autenticacao(["admin"])
 async def post_excluir(request: Request, forma_dto: ExcluirFormaPagamentoDTO, usuario_logado: Optional[dict] = None):
-    if forma_pagamento_repo.excluir_por_id(forma_dto.id):
+    if await forma_pagamento_repo.excluir_por_id_async(forma_dto.id):
         response = RedirectResponse("/admin/formas", status.HTTP_303_SEE_OTHER)
         return response
-    forma = forma_pagamento_repo.obter_por_id(forma_dto.id)
+    forma = await forma_pagamento_repo.obter_por_id_async(forma_dto.id)
     return templates.TemplateResponse(
         "excluir.html",
         {"request": request, "forma": forma, "mensagem": "Erro ao excluir forma de pagamento."},
@@ -0,0 +1,15 @@
+from typing import Optional
+from fastapi import APIRouter, Request
+from fastapi.responses import JSONResponse
+
+from util.auth_decorator import requer_autenticacao
+from util.metricas_util import coletar_metricas
+
+
+router = APIRouter()
+
+
+@router.get("/")
+@requer_autenticacao(["admin"])
+async def get_metricas(request: Request, usuario_logado: Optional[dict] = None):
+    return JSONResponse(coletar_metricas())
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Form, Request, status, UploadFile, File
+from fastapi import APIRouter, Depends, Form, Request, status, UploadFile, File
 from fastapi.responses import RedirectResponse
 import os
 from typing import Optional
@@ -8,27 +8,36 @@ from model.produto_model import Produto
 from repo import produto_repo, categoria_repo
 from util.template_util import criar_templates
 from util.auth_decorator import requer_autenticacao
+from util.exceptions import SobrecargaError
 from util.foto_util import (
-    salvar_nova_foto, obter_foto_principal, obter_todas_fotos,
-    excluir_foto, reordenar_fotos, obter_proximo_numero
+    obter_foto_principal_async, obter_fotos,
+    excluir_foto_async, reordenar_fotos_async
 )
+from util.paginacao_util import decodificar_cursor
+from util.processamento_imagem_util import gravar_nova_foto_async, processar_upload, resposta_sobrecarga
+from util.unidade_trabalho import UnidadeTrabalho, obter_unidade_trabalho
 
 
 router = APIRouter()
 templates = criar_templates("templates/admin/produtos")
 
+PRODUTOS_POR_PAGINA = 50
+
 
 @router.get("/")
 @requer_autenticacao(["admin"])
-async def gets(request: Request, usuario_logado: Optional[dict] = None):
-    produtos = produto_repo.obter_todos()
-
-    # Adicionar informação de foto para cada produto
-    for produto in produtos:
-        produto.foto_principal = obter_foto_principal(produto.id)
+async def gets(
+    request: Request,
+    apos: Optional[str] = None,
+    antes: Optional[str] = None,
+    usuario_logado: Optional[dict] = None
+):
+    # A foto principal vem na própria consulta (manifesto produto_foto)
+    pagina = await produto_repo.obter_pagina_async(
+        PRODUTOS_POR_PAGINA, decodificar_cursor(apos), decodificar_cursor(antes))
 
     response = templates.TemplateResponse(
-        "listar.html", {"request": request, "produtos": produtos}
+        "listar.html", {"request": request, "produtos": pagina.itens, "pagina": pagina}
     )
     return response
 
@@ -36,7 +45,7 @@ async def gets(request: Request, usuario_logado: Optional[dict] = None):
 @router.get("/detalhar/{id}")
 @requer_autenticacao(["admin"])
 async def get_detalhar(request: Request, id: int, usuario_logado: Optional[dict] = None):
-    produto = produto_repo.obter_por_id(id)
+    produto = await produto_repo.obter_por_id_async(id)
     if produto:
         response = templates.TemplateResponse(
             "detalhar.html", {"request": request, "produto": produto}
@@ -48,7 +57,7 @@ async def get_detalhar(request: Request, id: int, usuario_logado: Optional[dict]
 @router.get("/cadastrar")
 @requer_autenticacao(["admin"])
 async def get_cadastrar(request: Request, usuario_logado: Optional[dict] = None):
-    categorias = categoria_repo.obter_todos()
+    categorias = await categoria_repo.obter_todos_async()
     response = templates.TemplateResponse(
         "cadastrar.html", {"request": request, "categorias": categorias}
     )
@@ -71,18 +80,24 @@ async def post_cadastrar(
         quantidade=produto_dto.quantidade,
         categoria_id=produto_dto.categoria_id,
     )
-    produto_id = produto_repo.inserir(produto)
+    # A foto é processada antes de gravar o produto: com a fila de imagens
+    # cheia, a requisição é recusada (503) sem deixar nada gravado
+    try:
+        versoes = await processar_upload(foto) if foto and foto.filename else None
+    except SobrecargaError as e:
+        return resposta_sobrecarga(e)
+    produto_id = await produto_repo.inserir_async(produto)
     if produto_id:
         # Salvar foto se foi enviada
-        if foto and foto.filename:
+        if versoes:
             try:
-                salvar_nova_foto(produto_id, foto.file, como_principal=True)
+                await gravar_nova_foto_async(produto_id, versoes, como_principal=True)
             except Exception as e:
                 print(f"Erro ao salvar foto: {e}")
 
         response = RedirectResponse("/admin/produtos", status.HTTP_303_SEE_OTHER)
         return response
-    categorias = categoria_repo.obter_todos()
+    categorias = await categoria_repo.obter_todos_async()
     return templates.TemplateResponse(
         "cadastrar.html",
         {
@@ -96,10 +111,10 @@ async def post_cadastrar(
 @router.get("/alterar/{id}")
 @requer_autenticacao(["admin"])
 async def get_alterar(request: Request, id: int, usuario_logado: Optional[dict] = None):
-    produto = produto_repo.obter_por_id(id)
-    categorias = categoria_repo.obter_todos()
+    produto = await produto_repo.obter_por_id_async(id)
+    categorias = await categoria_repo.obter_todos_async()
     if produto:
-        foto_principal = obter_foto_principal(id)
+        foto_principal = await obter_foto_principal_async(id)
         response = templates.TemplateResponse(
             "alterar.html",
             {
@@ -129,18 +144,22 @@ async def post_alterar(
         quantidade=produto_dto.quantidade,
         categoria_id=produto_dto.categoria_id,
     )
-    if produto_repo.alterar(produto):
+    try:
+        versoes = await processar_upload(foto) if foto and foto.filename else None
+    except SobrecargaError as e:
+        return resposta_sobrecarga(e)
+    if await produto_repo.alterar_async(produto):
         # Salvar nova foto se foi enviada
-        if foto and foto.filename:
+        if versoes:
             try:
-                salvar_nova_foto(produto_dto.id, foto.file, como_principal=True)
+                await gravar_nova_foto_async(produto_dto.id, versoes, como_principal=True)
             except Exception as e:
                 print(f"Erro ao salvar foto: {e}")
 
         response = RedirectResponse("/admin/produtos", status.HTTP_303_SEE_OTHER)
         return response
-    categorias = categoria_repo.obter_todos()
-    foto_principal = obter_foto_principal(produto_dto.id)
+    categorias = await categoria_repo.obter_todos_async()
+    foto_principal = await obter_foto_principal_async(produto_dto.id)
     return templates.TemplateResponse(
         "alterar.html",
         {
@@ -156,7 +175,7 @@ async def post_alterar(
 @router.get("/excluir/{id}")
 @requer_autenticacao(["admin"])
 async def get_excluir(request: Request, id: int, usuario_logado: Optional[dict] = None):
-    produto = produto_repo.obter_por_id(id)
+    produto = await produto_repo.obter_por_id_async(id)
     if produto:
         response = templates.TemplateResponse(
             "excluir.html", {"request": request, "produto": produto}
@@ -168,10 +187,10 @@ async def get_excluir(request: Request, id: int, usuario_logado: Optional[dict]
 @router.post("/excluir")
 @requer_autenticacao(["admin"])
 async def post_excluir(request: Request, produto_dto: ExcluirProdutoDTO, usuario_logado: Optional[dict] = None):
-    if produto_repo.excluir_por_id(produto_dto.id):
+    if await produto_repo.excluir_por_id_async(produto_dto.id):
         response = RedirectResponse("/admin/produtos", status.HTTP_303_SEE_OTHER)
         return response
-    produto = produto_repo.obter_por_id(produto_dto.id)
+    produto = await produto_repo.obter_por_id_async(produto_dto.id)
     return templates.TemplateResponse(
         "excluir.html",
         {
@@ -184,12 +203,17 @@ async def post_excluir(request: Request, produto_dto: ExcluirProdutoDTO, usuario
 
 @router.get("/{id}/galeria")
 @requer_autenticacao(["admin"])
-async def get_galeria(request: Request, id: int, usuario_logado: Optional[dict] = None):
-    produto = produto_repo.obter_por_id(id)
+async def get_galeria(
+    request: Request,
+    id: int,
+    usuario_logado: Optional[dict] = None,
+    uow: UnidadeTrabalho = Depends(obter_unidade_trabalho)
+):
+    produto = await uow.obter(produto_repo.obter_por_id, id)
     if not produto:
         return RedirectResponse("/admin/produtos", status.HTTP_303_SEE_OTHER)
 
-    fotos = obter_todas_fotos(id)
+    fotos = await uow.obter(obter_fotos, id)
     response = templates.TemplateResponse(
         "galeria.html",
         {
@@ -209,7 +233,7 @@ async def post_galeria_upload(
     fotos: list[UploadFile] = File(...),
     usuario_logado: Optional[dict] = None
 ):
-    produto = produto_repo.obter_por_id(id)
+    produto = await produto_repo.obter_por_id_async(id)
     if not produto:
         return RedirectResponse("/admin/produtos", status.HTTP_303_SEE_OTHER)
 
@@ -217,8 +241,13 @@ async def post_galeria_upload(
     for foto in fotos:
         if foto.filename:
             try:
-                salvar_nova_foto(id, foto.file, como_principal=False)
-                sucesso += 1
+                versoes = await processar_upload(foto)
+                if versoes and await gravar_nova_foto_async(id, versoes, como_principal=False):
+                    sucesso += 1
+            except SobrecargaError as e:
+                # As fotos já gravadas ficam; reenviar todas é seguro, pois
+                # a mesma imagem não é registrada duas vezes (hash)
+                return resposta_sobrecarga(e)
             except Exception as e:
                 print(f"Erro ao salvar foto {foto.filename}: {e}")
 
@@ -234,12 +263,12 @@ async def post_galeria_excluir(
     numero: int,
     usuario_logado: Optional[dict] = None
 ):
-    produto = produto_repo.obter_por_id(id)
+    produto = await produto_repo.obter_por_id_async(id)
     if not produto:
         return RedirectResponse("/admin/produtos", status.HTTP_303_SEE_OTHER)
 
     try:
-        excluir_foto(id, numero)
+        await excluir_foto_async(id, numero)
     except Exception as e:
         print(f"Erro ao excluir foto: {e}")
 
@@ -254,14 +283,14 @@ async def post_galeria_reordenar(
     reordenar_dto: ReordenarFotosDTO,
     usuario_logado: Optional[dict] = None
 ):
-    produto = produto_repo.obter_por_id(id)
+    produto = await produto_repo.obter_por_id_async(id)
     if not produto:
         return RedirectResponse("/admin/produtos", status.HTTP_303_SEE_OTHER)
 
     try:
         # Converter string de números separados por vírgula em lista de inteiros
         ordem_lista = [int(x.strip()) for x in reordenar_dto.nova_ordem.split(",")]
-        reordenar_fotos(id, ordem_lista)
+        await reordenar_fotos_async(id, ordem_lista)
     except Exception as e:
         print(f"Erro ao reordenar fotos: {e}")
 
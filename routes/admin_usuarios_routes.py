@@ -16,7 +16,7 @@ templates = criar_templates("templates/admin/usuarios")
 @router.get("/lista")
 @requer_autenticacao(["admin"])
 async def get_lista(request: Request, usuario_logado: Optional[dict] = None):
-    usuarios_admin = usuario_repo.obter_todos_por_perfil("admin")
+    usuarios_admin = await usuario_repo.obter_todos_por_perfil_async("admin")
     return templates.TemplateResponse(
         "lista.html",
         {"request": request, "usuarios": usuarios_admin}
@@ -40,7 +40,7 @@ async def post_cadastro(
     usuario_logado: Optional[dict] = None
 ):
     # Verificar se o email já existe
-    usuario_existente = usuario_repo.obter_por_email(usuario_dto.email)
+    usuario_existente = await usuario_repo.obter_por_email_async(usuario_dto.email)
     if usuario_existente:
         return RedirectResponse(
             "/admin/usuarios/cadastro?erro=email_existe",
@@ -57,7 +57,7 @@ async def post_cadastro(
         perfil="admin"
     )
     
-    usuario_repo.inserir(usuario)
+    await usuario_repo.inserir_async(usuario)
     return RedirectResponse(
         "/admin/usuarios/lista",
         status.HTTP_303_SEE_OTHER
@@ -67,7 +67,7 @@ async def post_cadastro(
 @router.get("/alterar/{id:int}")
 @requer_autenticacao(["admin"])
 async def get_alterar(request: Request, id: int, usuario_logado: Optional[dict] = None):
-    usuario = usuario_repo.obter_por_id(id)
+    usuario = await usuario_repo.obter_por_id_async(id)
     if not usuario or usuario.perfil != "admin":
         return RedirectResponse(
             "/admin/usuarios/lista",
@@ -88,7 +88,7 @@ async def post_alterar(
     usuario_dto: AlterarUsuarioDTO,
     usuario_logado: Optional[dict] = None
 ):
-    usuario = usuario_repo.obter_por_id(id)
+    usuario = await usuario_repo.obter_por_id_async(id)
     if not usuario or usuario.perfil != "admin":
         return RedirectResponse(
             "/admin/usuarios/lista",
@@ -96,7 +96,7 @@ async def post_alterar(
         )
 
     # Verificar se o novo email já está em uso por outro usuário
-    usuario_existente = usuario_repo.obter_por_email(usuario_dto.email)
+    usuario_existente = await usuario_repo.obter_por_email_async(usuario_dto.email)
     if usuario_existente and usuario_existente.id != id:
         return RedirectResponse(
             f"/admin/usuarios/alterar/{id}?erro=email_existe",
@@ -112,7 +112,7 @@ async def post_alterar(
         senha_hash = criar_hash_senha(usuario_dto.senha)
         usuario.senha = senha_hash
     
-    usuario_repo.alterar(usuario)
+    await usuario_repo.alterar_async(usuario)
     
     return RedirectResponse(
         "/admin/usuarios/lista",
@@ -134,7 +134,7 @@ async def get_excluir(request: Request, id: int, usuario_logado: Optional[dict]
             status.HTTP_303_SEE_OTHER
         )
 
-    usuario = usuario_repo.obter_por_id(id)
+    usuario = await usuario_repo.obter_por_id_async(id)
     if not usuario or usuario.perfil != "admin":
         return RedirectResponse(
             "/admin/usuarios/lista",
@@ -164,9 +164,9 @@ async def post_excluir(
             status.HTTP_303_SEE_OTHER
         )
 
-    usuario = usuario_repo.obter_por_id(id)
+    usuario = await usuario_repo.obter_por_id_async(id)
     if usuario and usuario.perfil == "admin":
-        usuario_repo.excluir(id)
+        await usuario_repo.excluir_async(id)
 
     return RedirectResponse(
         "/admin/usuarios/lista",
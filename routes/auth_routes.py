@@ -3,9 +3,8 @@ from fastapi import APIRouter, Form, Request, status
 from fastapi.responses import RedirectResponse
 
 from dtos.auth_dto import LoginDTO, CadastroPublicoDTO, EsqueciSenhaDTO, RedefinirSenhaDTO
-from model.usuario_model import Usuario
 from model.cliente_model import Cliente
-from repo import usuario_repo
+from repo import cliente_repo, usuario_repo
 from util.email_service import email_service
 from util.security import criar_hash_senha, verificar_senha, gerar_token_redefinicao, obter_data_expiracao_token, validar_forca_senha
 from util.auth_decorator import criar_sessao, destruir_sessao, esta_logado
@@ -49,7 +48,7 @@ async def post_login(
         )
     
     # Buscar usuário pelo email
-    usuario = usuario_repo.obter_por_email(login_dto.email)
+    usuario = await usuario_repo.obter_por_email_async(login_dto.email)
 
     if not usuario or not verificar_senha(login_dto.senha, usuario.senha):
         return templates.TemplateResponse(
@@ -143,7 +142,7 @@ async def post_cadastro(
         )
 
     # Verificar se email já existe
-    if usuario_repo.obter_por_email(cadastro_dto.email):
+    if await usuario_repo.obter_por_email_async(cadastro_dto.email):
         return templates.TemplateResponse(
             "cadastro.html",
             {
@@ -156,37 +155,19 @@ async def post_cadastro(
         )
 
     try:
-        # Criar usuário com senha hash
-        usuario = Usuario(
+        # Inserir usuário (perfil cliente, senha com hash) e cliente em
+        # uma única transação, na thread escritora
+        cliente = Cliente(
             id=0,
+            cpf=cadastro_dto.cpf,
+            telefone=cadastro_dto.telefone,
             nome=cadastro_dto.nome,
             email=cadastro_dto.email,
-            senha=criar_hash_senha(cadastro_dto.senha),
-            perfil='cliente'
+            senha=criar_hash_senha(cadastro_dto.senha)
         )
-
-        # Inserir usuário e cliente
-        from util.db_util import get_connection
-        with get_connection() as conn:
-            cursor = conn.cursor()
-
-            # Inserir usuário
-            usuario_id = usuario_repo.inserir(usuario, cursor)
-            if not usuario_id:
-                raise Exception("Erro ao inserir usuário")
-
-            # Inserir dados do cliente
-            cliente = Cliente(
-                id=usuario_id,
-                cpf=cadastro_dto.cpf,
-                telefone=cadastro_dto.telefone
-            )
-            cursor.execute(
-                "INSERT INTO cliente (id, cpf, telefone) VALUES (?, ?, ?)",
-                (cliente.id, cliente.cpf, cliente.telefone)
-            )
-
-            conn.commit()
+        usuario_id = await cliente_repo.inserir_async(cliente)
+        if not usuario_id:
+            raise Exception("Erro ao inserir usuário")
 
         # Fazer login automático após cadastro
         usuario_dict = {
@@ -239,7 +220,7 @@ async def post_esqueci_senha(
             }
         )
     
-    usuario = usuario_repo.obter_por_email(esqueci_dto.email)
+    usuario = await usuario_repo.obter_por_email_async(esqueci_dto.email)
 
     # Sempre mostrar mensagem de sucesso por segurança (não revelar emails válidos)
     mensagem_sucesso = "Se o email estiver cadastrado, você receberá instruções para redefinir sua senha."
@@ -248,7 +229,7 @@ async def post_esqueci_senha(
         # Gerar token e salvar no banco
         token = gerar_token_redefinicao()
         data_expiracao = obter_data_expiracao_token(24)  # 24 horas
-        usuario_repo.atualizar_token(esqueci_dto.email, token, data_expiracao)
+        await usuario_repo.atualizar_token_async(esqueci_dto.email, token, data_expiracao)
 
         # TODO: Enviar email com o link de redefinição
         # Por enquanto, vamos apenas mostrar o link (em produção, remover isso)
@@ -274,7 +255,7 @@ async def post_esqueci_senha(
 
 @router.get("/redefinir-senha/{token}")
 async def get_redefinir_senha(request: Request, token: str):
-    usuario = usuario_repo.obter_por_token(token)
+    usuario = await usuario_repo.obter_por_token_async(token)
 
     if not usuario:
         return templates.TemplateResponse(
@@ -301,7 +282,7 @@ async def post_redefinir_senha(
     senha: Annotated[str, Form()],
     confirmar_senha: Annotated[str, Form()]
 ):
-    usuario = usuario_repo.obter_por_token(token)
+    usuario = await usuario_repo.obter_por_token_async(token)
 
     if not usuario:
         return templates.TemplateResponse(
@@ -341,8 +322,8 @@ async def post_redefinir_senha(
 
     # Atualizar senha e limpar token
     senha_hash = criar_hash_senha(redefinir_dto.senha)
-    usuario_repo.atualizar_senha(usuario.id, senha_hash)
-    usuario_repo.limpar_token(usuario.id)
+    await usuario_repo.atualizar_senha_async(usuario.id, senha_hash)
+    await usuario_repo.limpar_token_async(usuario.id)
 
     return templates.TemplateResponse(
         "redefinir_senha.html",
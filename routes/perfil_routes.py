@@ -1,5 +1,6 @@
 import os
-from fastapi import APIRouter, Form, Request, status, UploadFile, File
+import sqlite3
+from fastapi import APIRouter, Depends, Form, Request, status, UploadFile, File
 from fastapi.responses import RedirectResponse
 from typing import Optional, Annotated
 
@@ -10,45 +11,40 @@ from repo import usuario_repo, cliente_repo
 from util.security import criar_hash_senha, verificar_senha, validar_forca_senha
 from util.auth_decorator import requer_autenticacao, obter_usuario_logado
 from util.template_util import criar_templates
+from util.unidade_trabalho import UnidadeTrabalho, obter_unidade_trabalho
 
 router = APIRouter()
 templates = criar_templates("templates/perfil")
 
 
+async def obter_dados_cliente(uow: UnidadeTrabalho, usuario: Usuario) -> Optional[Cliente]:
+    """Dados adicionais (CPF e telefone) quando o usuário é cliente"""
+    if usuario.perfil != 'cliente':
+        return None
+    return await uow.obter(cliente_repo.obter_por_id, usuario.id)
+
+
 @router.get("/perfil")
 @requer_autenticacao()
-async def get_perfil(request: Request, usuario_logado: Optional[dict] = None):
+async def get_perfil(
+    request: Request,
+    usuario_logado: Optional[dict] = None,
+    uow: UnidadeTrabalho = Depends(obter_unidade_trabalho)
+):
     if not usuario_logado:
         return RedirectResponse("/login", status.HTTP_303_SEE_OTHER)
 
     # Buscar dados completos do usuário
-    usuario = usuario_repo.obter_por_id(usuario_logado['id'])
+    usuario = await uow.obter(usuario_repo.obter_por_id, usuario_logado['id'])
     if not usuario:
         return RedirectResponse("/login", status.HTTP_303_SEE_OTHER)
 
-    # Se for cliente, buscar dados adicionais
-    cliente_dados = None
-    if usuario.perfil == 'cliente':
-        try:
-            from util.db_util import get_connection
-            with get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT cpf, telefone FROM cliente WHERE id=?", (usuario.id,))
-                row = cursor.fetchone()
-                if row:
-                    cliente_dados = {
-                        'cpf': row['cpf'],
-                        'telefone': row['telefone']
-                    }
-        except:
-            pass
-
     return templates.TemplateResponse(
         "dados.html",
         {
             "request": request,
             "usuario": usuario,
-            "cliente_dados": cliente_dados
+            "cliente_dados": await obter_dados_cliente(uow, usuario)
         }
     )
 
@@ -61,12 +57,13 @@ async def post_perfil(
     email: Annotated[str, Form()],
     cpf: Annotated[str, Form(None)],
     telefone: Annotated[str, Form(None)],
-    usuario_logado: Optional[dict] = None
+    usuario_logado: Optional[dict] = None,
+    uow: UnidadeTrabalho = Depends(obter_unidade_trabalho)
 ):
     if not usuario_logado:
         return RedirectResponse("/login", status.HTTP_303_SEE_OTHER)
 
-    usuario = usuario_repo.obter_por_id(usuario_logado['id'])
+    usuario = await uow.obter(usuario_repo.obter_por_id, usuario_logado['id'])
     if not usuario:
         return RedirectResponse("/login", status.HTTP_303_SEE_OTHER)
 
@@ -79,79 +76,52 @@ async def post_perfil(
             telefone=telefone
         )
     except Exception as e:
-        cliente_dados = None
-        if usuario.perfil == 'cliente':
-            try:
-                from util.db_util import get_connection
-                with get_connection() as conn:
-                    cursor = conn.cursor()
-                    cursor.execute("SELECT cpf, telefone FROM cliente WHERE id=?", (usuario.id,))
-                    row = cursor.fetchone()
-                    if row:
-                        cliente_dados = {
-                            'cpf': row['cpf'],
-                            'telefone': row['telefone']
-                        }
-            except:
-                pass
-
         return templates.TemplateResponse(
             "dados.html",
             {
                 "request": request,
                 "usuario": usuario,
-                "cliente_dados": cliente_dados,
+                "cliente_dados": await obter_dados_cliente(uow, usuario),
                 "erro": str(e)
             }
         )
 
     # Verificar se o email já está em uso por outro usuário
-    usuario_existente = usuario_repo.obter_por_email(perfil_dto.email)
+    usuario_existente = await uow.obter(usuario_repo.obter_por_email, perfil_dto.email)
     if usuario_existente and usuario_existente.id != usuario.id:
-        cliente_dados = None
-        if usuario.perfil == 'cliente':
-            try:
-                from util.db_util import get_connection
-                with get_connection() as conn:
-                    cursor = conn.cursor()
-                    cursor.execute("SELECT cpf, telefone FROM cliente WHERE id=?", (usuario.id,))
-                    row = cursor.fetchone()
-                    if row:
-                        cliente_dados = {
-                            'cpf': row['cpf'],
-                            'telefone': row['telefone']
-                        }
-            except:
-                pass
-
         return templates.TemplateResponse(
             "dados.html",
             {
                 "request": request,
                 "usuario": usuario,
-                "cliente_dados": cliente_dados,
+                "cliente_dados": await obter_dados_cliente(uow, usuario),
                 "erro": "Este email já está em uso"
             }
         )
 
-    # Atualizar dados do usuário
+    # Atualizar dados do usuário e, se for cliente, os dados adicionais;
+    # as duas escritas são gravadas juntas, em uma única transação
     usuario.nome = perfil_dto.nome
     usuario.email = perfil_dto.email
-    usuario_repo.alterar(usuario)
-
-    # Se for cliente, atualizar dados adicionais
+    uow.registrar(usuario_repo.alterar, usuario)
     if usuario.perfil == 'cliente' and perfil_dto.cpf and perfil_dto.telefone:
-        try:
-            from util.db_util import get_connection
-            with get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "UPDATE cliente SET cpf=?, telefone=? WHERE id=?",
-                    (perfil_dto.cpf, perfil_dto.telefone, usuario.id)
-                )
-                conn.commit()
-        except:
-            pass
+        uow.registrar(cliente_repo.alterar_contato, usuario.id, perfil_dto.cpf, perfil_dto.telefone)
+
+    # Confirmadas aqui, e não ao final da requisição, para que a sessão só
+    # receba os dados novos depois de gravados
+    try:
+        await uow.confirmar()
+    except sqlite3.IntegrityError:
+        # Outro usuário gravou o mesmo email depois da verificação acima
+        return templates.TemplateResponse(
+            "dados.html",
+            {
+                "request": request,
+                "usuario": await uow.obter(usuario_repo.obter_por_id, usuario.id),
+                "cliente_dados": await obter_dados_cliente(uow, usuario),
+                "erro": "Este email já está em uso"
+            }
+        )
 
     # Atualizar sessão
     from util.auth_decorator import criar_sessao
@@ -188,7 +158,7 @@ async def post_alterar_senha(
     if not usuario_logado:
         return RedirectResponse("/login", status.HTTP_303_SEE_OTHER)
 
-    usuario = usuario_repo.obter_por_id(usuario_logado['id'])
+    usuario = await usuario_repo.obter_por_id_async(usuario_logado['id'])
     if not usuario:
         return RedirectResponse("/login", status.HTTP_303_SEE_OTHER)
 
@@ -233,7 +203,7 @@ async def post_alterar_senha(
 
     # Atualizar senha
     senha_hash = criar_hash_senha(alterar_senha_dto.senha_nova)
-    usuario_repo.atualizar_senha(usuario.id, senha_hash)
+    await usuario_repo.atualizar_senha_async(usuario.id, senha_hash)
 
     return templates.TemplateResponse(
         "alterar_senha.html",
@@ -277,7 +247,7 @@ async def alterar_foto(
 
         # Atualizar caminho no banco
         caminho_relativo = f"/static/uploads/usuarios/{nome_arquivo}"
-        usuario_repo.atualizar_foto(usuario_logado['id'], caminho_relativo)
+        await usuario_repo.atualizar_foto_async(usuario_logado['id'], caminho_relativo)
 
         # Atualizar sessão
         usuario_logado['foto'] = caminho_relativo
@@ -1,39 +1,100 @@
 from fastapi import APIRouter, Request
-from fastapi.templating import Jinja2Templates
-from fastapi.responses import RedirectResponse
+from fastapi.responses import HTMLResponse, RedirectResponse
+from datetime import datetime
+from typing import Optional
 from repo import produto_repo
-from util.foto_util import obter_foto_principal, obter_todas_fotos
+from util.cache_http_util import (
+    converter_atualizado_em, gerar_etag, modificado_em_cabecalhos, montar_cabecalhos,
+    nao_modificado, resposta_nao_modificada, ultima_modificacao
+)
+from util import snapshot_util
+from util.cache_util import criar_cache_respostas
+from util.carga_unica_util import criar_carga_unica
+from util.paginacao_util import decodificar_cursor
+from util.template_util import criar_templates, obter_versao_templates
+from util.versao_util import DOMINIO_CATALOGO, obter_versao_catalogo, obter_versao_compartilhada
 
 
 router = APIRouter()
-templates = Jinja2Templates(directory="templates")
+templates = criar_templates()
+
+PRODUTOS_POR_PAGINA = 24
+
+# HTML da vitrine para visitantes anônimos, por versão do catálogo
+cache_pagina_inicial = criar_cache_respostas("pagina_inicial")
+# Uma única reconstrução da vitrine por vez quando o catálogo muda
+carga_pagina_inicial = criar_carga_unica("pagina_inicial")
 
 
 @router.get("/")
-async def get_root(request: Request):
-    produtos = produto_repo.obter_todos()
+async def get_root(request: Request, apos: Optional[str] = None, antes: Optional[str] = None):
+    # Sem sessão (nem usuário logado, nem toasts pendentes) a página é a
+    # mesma para todos os visitantes e pode vir do cache
+    if request.session:
+        response, _ = await montar_pagina_inicial(request, apos, antes)
+        return response
+
+    versao = obter_versao_catalogo()
+    versao_templates = obter_versao_templates()
+    chave = (versao_templates, apos, antes)
+    # A versão compartilhada é a mesma em todos os workers, então o ETag
+    # também é; ele serve ainda de chave da carga única entre workers. A
+    # versão dos templates invalida as cópias dos navegadores após um deploy
+    etag = gerar_etag("pagina_inicial", obter_versao_compartilhada(DOMINIO_CATALOGO),
+                      versao_templates, apos, antes)
+    if nao_modificado(request, etag):
+        return resposta_nao_modificada(etag)
+
+    guardada = cache_pagina_inicial.obter(versao, chave)
+    if guardada is None:
+        async def carregar():
+            response, modificado_em = await montar_pagina_inicial(request, apos, antes)
+            cabecalhos = montar_cabecalhos(etag, modificado_em)
+            cache_pagina_inicial.guardar(versao, chave, response.body, cabecalhos)
+            return response.body, cabecalhos
+        guardada = await carga_pagina_inicial.executar(
+            etag, carregar, obsoleto=cache_pagina_inicial.obter_obsoleta(chave))
 
-    # Adicionar informação de foto para cada produto
-    for produto in produtos:
-        produto.foto_principal = obter_foto_principal(produto.id)
+    corpo, cabecalhos = guardada
+    modificado_em = modificado_em_cabecalhos(cabecalhos)
+    if nao_modificado(request, cabecalhos["ETag"], modificado_em):
+        return resposta_nao_modificada(cabecalhos["ETag"], modificado_em)
+    return HTMLResponse(corpo, headers=cabecalhos)
 
-    response = templates.TemplateResponse("index.html", {"request": request, "produtos": produtos})
-    return response
+
+async def montar_pagina_inicial(request: Request, apos: Optional[str],
+                                antes: Optional[str]) -> tuple[HTMLResponse, Optional[datetime]]:
+    """Consulta e renderiza a vitrine; devolve também a maior data de atualização exibida"""
+    # Sem o snapshot do catálogo (ainda não publicado para a versão atual),
+    # consulta o banco; nos dois casos a foto principal já vem resolvida
+    pagina = snapshot_util.obter_pagina(
+        PRODUTOS_POR_PAGINA, decodificar_cursor(apos), decodificar_cursor(antes))
+    if pagina is None:
+        pagina = await produto_repo.obter_pagina_async(
+            PRODUTOS_POR_PAGINA, decodificar_cursor(apos), decodificar_cursor(antes))
+
+    response = templates.TemplateResponse(
+        "index.html", {"request": request, "produtos": pagina.itens, "pagina": pagina})
+    return response, ultima_modificacao(p.atualizado_em for p in pagina.itens)
 
 
 @router.get("/produtos/{id}")
 async def get_produto_detalhes(request: Request, id: int):
-    produto = produto_repo.obter_por_id(id)
+    detalhes = await produto_repo.obter_detalhes_async(id)
 
-    if not produto:
+    if not detalhes:
         return RedirectResponse("/", status_code=302)
 
-    # Obter todas as fotos do produto para a galeria
-    fotos = obter_todas_fotos(id)
+    produto = detalhes.produto
+    fotos = detalhes.fotos
 
-    # Se não há fotos, usar placeholder
-    if not fotos:
-        fotos = ["/static/img/placeholder.png"]
+    # Para visitantes anônimos a página depende só dos dados do produto
+    anonimo = not request.session
+    if anonimo:
+        modificado_em = converter_atualizado_em(produto.atualizado_em)
+        etag = gerar_etag("produto", produto.id, produto.atualizado_em, produto.categoria_nome, fotos)
+        if nao_modificado(request, etag, modificado_em):
+            return resposta_nao_modificada(etag, modificado_em)
 
     response = templates.TemplateResponse(
         "produto_detalhes.html",
@@ -43,4 +104,6 @@ async def get_produto_detalhes(request: Request, id: int):
             "fotos": fotos
         }
     )
+    if anonimo:
+        response.headers.update(montar_cabecalhos(etag, modificado_em))
     return response
\ No newline at end of file
@@ -9,6 +9,10 @@ INSERT INTO categoria (nome)
 VALUES (?)
 """
 
+OBTER_ULTIMO_ID = """
+SELECT last_insert_rowid()
+"""
+
 OBTER_TODOS = """
 SELECT 
 id, nome
@@ -32,4 +36,10 @@ WHERE id=?
 EXCLUIR_POR_ID = """
 DELETE FROM categoria
 WHERE id=?
-"""
\ No newline at end of file
+"""
+
+CRIAR_INDICE_NOME = """
+CREATE INDEX IF NOT EXISTS idx_categoria_nome ON categoria (nome)
+"""
+
+INDICES = (CRIAR_INDICE_NOME,)
\ No newline at end of file
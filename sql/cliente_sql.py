@@ -7,8 +7,8 @@ FOREIGN KEY (id) REFERENCES usuario(id)
 );"""
 
 INSERIR = """
-INSERT INTO cliente (cpf, telefone) 
-VALUES (?, ?)
+INSERT INTO cliente (id, cpf, telefone) 
+VALUES (?, ?, ?)
 """
 
 ALTERAR = """
@@ -36,4 +36,24 @@ c.id, c.cpf, c.telefone, u.nome, u.email, u.senha
 FROM cliente c
 INNER JOIN usuario u ON c.id = u.id
 ORDER BY u.nome
-""" 
\ No newline at end of file
+"""
+
+OBTER_PAGINA = """
+SELECT 
+c.id, c.cpf, c.telefone, u.nome, u.email, u.senha
+FROM cliente c
+INNER JOIN usuario u ON c.id = u.id
+WHERE (u.nome, u.id) > (?, ?)
+ORDER BY u.nome, u.id
+LIMIT ?
+"""
+
+OBTER_PAGINA_ANTERIOR = """
+SELECT 
+c.id, c.cpf, c.telefone, u.nome, u.email, u.senha
+FROM cliente c
+INNER JOIN usuario u ON c.id = u.id
+WHERE (u.nome, u.id) < (?, ?)
+ORDER BY u.nome DESC, u.id DESC
+LIMIT ?
+"""
\ No newline at end of file
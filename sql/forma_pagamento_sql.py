@@ -33,4 +33,10 @@ WHERE id = ?
 EXCLUIR_POR_ID = """
 DELETE FROM forma_pagamento
 WHERE id = ?
-"""
\ No newline at end of file
+"""
+
+CRIAR_INDICE_NOME = """
+CREATE INDEX IF NOT EXISTS idx_forma_pagamento_nome ON forma_pagamento (nome)
+"""
+
+INDICES = (CRIAR_INDICE_NOME,)
\ No newline at end of file
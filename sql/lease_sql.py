@@ -0,0 +1,24 @@
+CRIAR_TABELA = """
+CREATE TABLE IF NOT EXISTS cache_lease (
+chave TEXT PRIMARY KEY,
+dono TEXT NOT NULL,
+expira_em REAL NOT NULL)
+"""
+
+# Só substitui o dono quando a lease anterior já expirou
+ADQUIRIR = """
+INSERT INTO cache_lease (chave, dono, expira_em) VALUES (?, ?, ?)
+ON CONFLICT (chave) DO UPDATE SET dono = excluded.dono, expira_em = excluded.expira_em
+WHERE cache_lease.expira_em < ?
+"""
+
+LIBERAR = """
+DELETE FROM cache_lease
+WHERE chave=? AND dono=?
+"""
+
+OBTER_POR_CHAVE = """
+SELECT dono, expira_em
+FROM cache_lease
+WHERE chave=?
+"""
@@ -0,0 +1,15 @@
+CRIAR_TABELA = """
+CREATE TABLE IF NOT EXISTS schema_version (
+versao INTEGER PRIMARY KEY,
+descricao TEXT NOT NULL,
+aplicada_em TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP)
+"""
+
+OBTER_VERSAO_ATUAL = """
+SELECT MAX(versao) FROM schema_version
+"""
+
+INSERIR = """
+INSERT INTO schema_version (versao, descricao)
+VALUES (?, ?)
+"""
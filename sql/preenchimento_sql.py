@@ -0,0 +1,16 @@
+CRIAR_TABELA = """
+CREATE TABLE IF NOT EXISTS preenchimento (
+etapa TEXT PRIMARY KEY,
+concluida_em TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP)
+"""
+
+INSERIR = """
+INSERT OR IGNORE INTO preenchimento (etapa)
+VALUES (?)
+"""
+
+OBTER_CONCLUIDAS = """
+SELECT etapa
+FROM preenchimento
+ORDER BY etapa
+"""
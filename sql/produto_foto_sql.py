@@ -0,0 +1,117 @@
+CRIAR_TABELA = """
+CREATE TABLE IF NOT EXISTS produto_foto (
+id INTEGER PRIMARY KEY AUTOINCREMENT,
+produto_id INTEGER NOT NULL,
+ordem INTEGER NOT NULL,
+arquivo TEXT NOT NULL,
+largura INTEGER NOT NULL,
+altura INTEGER NOT NULL,
+tamanho INTEGER NOT NULL,
+hash TEXT NOT NULL,
+FOREIGN KEY (produto_id) REFERENCES produto(id))
+"""
+
+CRIAR_INDICE_PRODUTO = """
+CREATE INDEX IF NOT EXISTS idx_produto_foto_produto_ordem ON produto_foto (produto_id, ordem)
+"""
+
+INDICES = (CRIAR_INDICE_PRODUTO,)
+
+INSERIR = """
+INSERT INTO produto_foto (produto_id, ordem, arquivo, largura, altura, tamanho, hash, larguras, formatos)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Registro das fotos legadas pela migração 8, anterior à coluna larguras
+INSERIR_LEGADA = """
+INSERT INTO produto_foto (produto_id, ordem, arquivo, largura, altura, tamanho, hash)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+# Larguras das versões reduzidas disponíveis, separadas por vírgula
+ALTERAR_TABELA_ADD_LARGURAS = """
+ALTER TABLE produto_foto ADD COLUMN larguras TEXT NOT NULL DEFAULT ''
+"""
+
+SELECIONAR_SEM_LARGURAS = """
+SELECT id, produto_id, arquivo, largura FROM produto_foto WHERE larguras = ''
+"""
+
+ALTERAR_LARGURAS = """
+UPDATE produto_foto SET larguras = ? WHERE id = ?
+"""
+
+# Extensões dos formatos gravados além do JPEG (ex.: webp,avif)
+ALTERAR_TABELA_ADD_FORMATOS = """
+ALTER TABLE produto_foto ADD COLUMN formatos TEXT NOT NULL DEFAULT ''
+"""
+
+SELECIONAR_SEM_FORMATOS = """
+SELECT id, produto_id, arquivo, largura, larguras FROM produto_foto WHERE formatos = ''
+"""
+
+ALTERAR_FORMATOS = """
+UPDATE produto_foto SET formatos = ? WHERE id = ?
+"""
+
+# Fotos registradas antes das versões reduzidas ou dos formatos (preenchimento)
+SELECIONAR_INCOMPLETAS = """
+SELECT id, produto_id, ordem, arquivo, largura, altura, tamanho, hash, larguras, formatos
+FROM produto_foto
+WHERE larguras = '' OR formatos = ''
+"""
+
+ALTERAR_VERSOES = """
+UPDATE produto_foto SET larguras = ?, formatos = ? WHERE id = ?
+"""
+
+EXCLUIR = """
+DELETE FROM produto_foto WHERE id = ?
+"""
+
+EXCLUIR_POR_PRODUTO = """
+DELETE FROM produto_foto WHERE produto_id = ?
+"""
+
+# Soma `deslocamento` à ordem das fotos a partir de uma posição
+DESLOCAR = """
+UPDATE produto_foto SET ordem = ordem + ?
+WHERE produto_id = ? AND ordem >= ?
+"""
+
+ALTERAR_ORDEM = """
+UPDATE produto_foto SET ordem = ? WHERE id = ?
+"""
+
+OBTER_POR_PRODUTO = """
+SELECT id, produto_id, ordem, arquivo, largura, altura, tamanho, hash, larguras, formatos
+FROM produto_foto
+WHERE produto_id = ?
+ORDER BY ordem
+"""
+
+OBTER_POR_ORDEM = """
+SELECT id, produto_id, ordem, arquivo, largura, altura, tamanho, hash, larguras, formatos
+FROM produto_foto
+WHERE produto_id = ? AND ordem = ?
+"""
+
+# Foto principal de vários produtos; os ids vão em um único parâmetro JSON
+# ([1, 2, ...]) para não depender do limite de parâmetros do SQLite
+OBTER_PRINCIPAIS = """
+SELECT id, produto_id, ordem, arquivo, largura, altura, tamanho, hash, larguras, formatos
+FROM produto_foto
+WHERE ordem = 1 AND produto_id IN (SELECT value FROM json_each(?))
+"""
+
+OBTER_POR_HASH = """
+SELECT id, produto_id, ordem, arquivo, largura, altura, tamanho, hash, larguras, formatos
+FROM produto_foto
+WHERE produto_id = ? AND hash = ?
+"""
+
+OBTER_PROXIMA_ORDEM = """
+SELECT COALESCE(MAX(ordem), 0) + 1
+FROM produto_foto
+WHERE produto_id = ?
+"""
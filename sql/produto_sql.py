@@ -10,15 +10,20 @@ FOREIGN KEY (categoria_id) REFERENCES categoria(id))
 """
 
 INSERIR = """
-INSERT INTO produto (nome, descricao, preco, quantidade, categoria_id) 
-VALUES (?, ?, ?, ?, ?)
+INSERT INTO produto (nome, descricao, resumo, preco, quantidade, categoria_id, atualizado_em) 
+VALUES (?, ?, ?, ?, ?, ?, strftime('%Y-%m-%d %H:%M:%f', 'now'))
+"""
+
+OBTER_ULTIMO_ID = """
+SELECT last_insert_rowid()
 """
 
 OBTER_TODOS = """
 SELECT 
 p.id, p.nome, p.descricao, p.preco, p.quantidade, 
 COALESCE(p.categoria_id, 1) as categoria_id, 
-COALESCE(c.nome, 'Sem Categoria') as categoria_nome 
+COALESCE(c.nome, 'Sem Categoria') as categoria_nome, 
+p.atualizado_em 
 FROM produto p
 LEFT JOIN categoria c ON p.categoria_id = c.id
 ORDER BY p.nome
@@ -28,22 +33,111 @@ OBTER_POR_ID = """
 SELECT 
 p.id, p.nome, p.descricao, p.preco, p.quantidade, 
 COALESCE(p.categoria_id, 1) as categoria_id, 
-COALESCE(c.nome, 'Sem Categoria') as categoria_nome 
+COALESCE(c.nome, 'Sem Categoria') as categoria_nome, 
+p.atualizado_em 
 FROM produto p
 LEFT JOIN categoria c ON p.categoria_id = c.id
 WHERE p.id = ?
 """ 
 
+OBTER_PAGINA = """
+SELECT 
+p.id, p.nome, p.preco, p.quantidade, 
+COALESCE(p.categoria_id, 1) as categoria_id, 
+COALESCE(c.nome, 'Sem Categoria') as categoria_nome, 
+p.resumo, p.atualizado_em, 
+'/static/img/products/' || printf('%06d', p.id) || '/' || f.arquivo as foto_principal, 
+f.larguras as foto_larguras 
+FROM produto p
+LEFT JOIN categoria c ON p.categoria_id = c.id
+LEFT JOIN produto_foto f ON f.produto_id = p.id AND f.ordem = 1
+WHERE (p.nome, p.id) > (?, ?)
+ORDER BY p.nome, p.id
+LIMIT ?
+"""
+
+# Projeção da listagem para o snapshot do catálogo, na ordem das páginas
+OBTER_CATALOGO = """
+SELECT 
+p.id, p.nome, p.preco, p.quantidade, 
+COALESCE(p.categoria_id, 1) as categoria_id, 
+COALESCE(c.nome, 'Sem Categoria') as categoria_nome, 
+p.resumo, p.atualizado_em, 
+'/static/img/products/' || printf('%06d', p.id) || '/' || f.arquivo as foto_principal, 
+f.larguras as foto_larguras 
+FROM produto p
+LEFT JOIN categoria c ON p.categoria_id = c.id
+LEFT JOIN produto_foto f ON f.produto_id = p.id AND f.ordem = 1
+ORDER BY p.nome, p.id
+"""
+
+OBTER_PAGINA_ANTERIOR = """
+SELECT 
+p.id, p.nome, p.preco, p.quantidade, 
+COALESCE(p.categoria_id, 1) as categoria_id, 
+COALESCE(c.nome, 'Sem Categoria') as categoria_nome, 
+p.resumo, p.atualizado_em, 
+'/static/img/products/' || printf('%06d', p.id) || '/' || f.arquivo as foto_principal, 
+f.larguras as foto_larguras 
+FROM produto p
+LEFT JOIN categoria c ON p.categoria_id = c.id
+LEFT JOIN produto_foto f ON f.produto_id = p.id AND f.ordem = 1
+WHERE (p.nome, p.id) < (?, ?)
+ORDER BY p.nome DESC, p.id DESC
+LIMIT ?
+"""
+
 EXCLUIR_POR_ID = """
 DELETE FROM produto WHERE id = ?
 """
 
 ALTERAR = """
 UPDATE produto 
-SET nome = ?, descricao = ?, preco = ?, quantidade = ?, categoria_id = ?
+SET nome = ?, descricao = ?, resumo = ?, preco = ?, quantidade = ?, categoria_id = ?, 
+atualizado_em = strftime('%Y-%m-%d %H:%M:%f', 'now')
 WHERE id = ?
 """
 
 ALTERAR_TABELA_ADD_CATEGORIA = """
 ALTER TABLE produto ADD COLUMN categoria_id INTEGER REFERENCES categoria(id)
-"""
\ No newline at end of file
+"""
+
+CRIAR_INDICE_NOME = """
+CREATE INDEX IF NOT EXISTS idx_produto_nome_id ON produto (nome, id)
+"""
+
+CRIAR_INDICE_CATEGORIA = """
+CREATE INDEX IF NOT EXISTS idx_produto_categoria ON produto (categoria_id)
+"""
+
+INDICES = (CRIAR_INDICE_NOME, CRIAR_INDICE_CATEGORIA)
+
+ALTERAR_TABELA_ADD_RESUMO = """
+ALTER TABLE produto ADD COLUMN resumo TEXT
+"""
+
+SELECIONAR_SEM_RESUMO = """
+SELECT id, descricao FROM produto WHERE resumo IS NULL
+"""
+
+ATUALIZAR_RESUMO = """
+UPDATE produto SET resumo = ? WHERE id = ?
+"""
+
+ALTERAR_TABELA_ADD_ATUALIZADO_EM = """
+ALTER TABLE produto ADD COLUMN atualizado_em TEXT
+"""
+
+PREENCHER_ATUALIZADO_EM = """
+UPDATE produto SET atualizado_em = strftime('%Y-%m-%d %H:%M:%f', 'now')
+WHERE atualizado_em IS NULL
+"""
+
+SELECIONAR_IDS = """
+SELECT id FROM produto
+"""
+
+TOCAR = """
+UPDATE produto SET atualizado_em = strftime('%Y-%m-%d %H:%M:%f', 'now')
+WHERE id = ?
+"""
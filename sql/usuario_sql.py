@@ -16,6 +16,10 @@ INSERT INTO usuario (nome, email, senha, perfil)
 VALUES (?, ?, ?, ?)
 """
 
+OBTER_ULTIMO_ID = """
+SELECT last_insert_rowid()
+"""
+
 ALTERAR = """
 UPDATE usuario
 SET nome=?, email=?
@@ -71,4 +75,33 @@ SELECT
 id, nome, email, senha, perfil, foto, token_redefinicao, data_token
 FROM usuario
 WHERE token_redefinicao=? AND data_token > datetime('now')
-"""
\ No newline at end of file
+"""
+
+LIMPAR_TOKEN = """
+UPDATE usuario
+SET token_redefinicao=NULL, data_token=NULL
+WHERE id=?
+"""
+
+OBTER_TODOS_POR_PERFIL = """
+SELECT 
+id, nome, email, senha, perfil, foto
+FROM usuario
+WHERE perfil=?
+ORDER BY nome
+"""
+
+CRIAR_INDICE_NOME = """
+CREATE INDEX IF NOT EXISTS idx_usuario_nome_id ON usuario (nome, id)
+"""
+
+CRIAR_INDICE_PERFIL = """
+CREATE INDEX IF NOT EXISTS idx_usuario_perfil_nome ON usuario (perfil, nome)
+"""
+
+CRIAR_INDICE_TOKEN = """
+CREATE INDEX IF NOT EXISTS idx_usuario_token ON usuario (token_redefinicao)
+WHERE token_redefinicao IS NOT NULL
+"""
+
+INDICES = (CRIAR_INDICE_NOME, CRIAR_INDICE_PERFIL, CRIAR_INDICE_TOKEN)
\ No newline at end of file
@@ -0,0 +1,16 @@
+CRIAR_TABELA = """
+CREATE TABLE IF NOT EXISTS cache_version (
+dominio TEXT PRIMARY KEY,
+versao INTEGER NOT NULL DEFAULT 0)
+"""
+
+INCREMENTAR = """
+INSERT INTO cache_version (dominio, versao) VALUES (?, 1)
+ON CONFLICT (dominio) DO UPDATE SET versao = versao + 1
+"""
+
+OBTER_TODAS = """
+SELECT dominio, versao
+FROM cache_version
+ORDER BY dominio
+"""
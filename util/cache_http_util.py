@@ -0,0 +1,82 @@
+"""
+Requisições condicionais HTTP (ETag, Last-Modified e 304)
+
+As páginas públicas do catálogo enviam um ETag forte, derivado das versões
+dos dados exibidos, e o Last-Modified vindo de produto.atualizado_em. Se o
+navegador (ou o proxy) reenviar um If-None-Match que ainda vale, a rota
+responde 304 sem corpo, antes de renderizar o template.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Iterable, Optional
+
+from fastapi import Request, Response
+
+
+# Força a revalidação a cada uso, sem impedir o armazenamento
+CACHE_CONTROL = "no-cache"
+
+
+def gerar_etag(*partes: object) -> str:
+    """ETag forte a partir das partes que determinam o conteúdo da página"""
+    resumo = hashlib.sha1(repr(partes).encode("utf-8")).hexdigest()[:24]
+    return f'"{resumo}"'
+
+
+def converter_atualizado_em(valor: Optional[str]) -> Optional[datetime]:
+    """Converte o texto de atualizado_em (UTC, com milissegundos) em datetime"""
+    if not valor:
+        return None
+    return datetime.strptime(valor, "%Y-%m-%d %H:%M:%S.%f").replace(tzinfo=timezone.utc)
+
+
+def ultima_modificacao(valores: Iterable[Optional[str]]) -> Optional[datetime]:
+    """A maior data de atualização entre os itens exibidos"""
+    datas = [d for d in map(converter_atualizado_em, valores) if d is not None]
+    return max(datas) if datas else None
+
+
+def montar_cabecalhos(etag: str, modificado_em: Optional[datetime]) -> dict[str, str]:
+    cabecalhos = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if modificado_em is not None:
+        cabecalhos["Last-Modified"] = format_datetime(modificado_em, usegmt=True)
+    return cabecalhos
+
+
+def modificado_em_cabecalhos(cabecalhos: dict[str, str]) -> Optional[datetime]:
+    """Recupera o Last-Modified de cabeçalhos montados por montar_cabecalhos"""
+    valor = cabecalhos.get("Last-Modified")
+    return parsedate_to_datetime(valor) if valor else None
+
+
+def _etags(valor: str) -> list[str]:
+    # Comparação fraca (RFC 9110): proxies que comprimem a resposta trocam
+    # o ETag forte por W/"..."
+    return [e.strip().removeprefix("W/") for e in valor.split(",")]
+
+
+def nao_modificado(request: Request, etag: str, modificado_em: Optional[datetime] = None) -> bool:
+    """
+    Indica se a cópia do cliente ainda vale. If-None-Match tem precedência;
+    If-Modified-Since só é usado quando o cliente não envia ETag.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        etags = _etags(if_none_match)
+        return "*" in etags or etag in etags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and modificado_em is not None:
+        try:
+            desde = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if desde.tzinfo is None:
+            desde = desde.replace(tzinfo=timezone.utc)
+        # Last-Modified tem precisão de segundos
+        return modificado_em.replace(microsecond=0) <= desde
+    return False
+
+
+def resposta_nao_modificada(etag: str, modificado_em: Optional[datetime] = None) -> Response:
+    return Response(status_code=304, headers=montar_cabecalhos(etag, modificado_em))
@@ -0,0 +1,316 @@
+"""
+Caches em processo
+
+CacheReferencia guarda dados de referência que quase nunca mudam
+(categorias, formas de pagamento). A leitura é feita sob demanda na
+primeira consulta e reaproveitada até que o repositório chame invalidar()
+depois de uma escrita ou até que a versão compartilhada do seu domínio
+mude (escrita feita em outro worker, ver util/versao_util.py).
+
+CacheLRU guarda objetos montados sob demanda (modelos de visualização),
+com número máximo de entradas (descarta a menos usada) e tempo de vida.
+
+CacheRespostas guarda o HTML já renderizado de páginas públicas, associado
+a uma versão (ver util/versao_util.py): quando a versão muda, tudo o que
+foi guardado com a versão anterior deixa de valer, mas continua disponível
+como cópia obsoleta enquanto a nova é montada (ver util/carga_unica_util.py).
+
+Cada processo (worker) tem os seus próprios caches.
+"""
+import functools
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional, TypeVar
+
+from util.db_util import apos_confirmar
+from util.metricas_util import registrar_metricas
+from util.versao_util import obter_versao_compartilhada
+
+
+T = TypeVar("T")
+
+
+class CacheReferencia:
+    """
+    Cache read-through com invalidação explícita.
+
+    Os valores devolvidos são compartilhados entre as requisições e não
+    devem ser alterados por quem os recebe.
+    """
+
+    def __init__(self, nome: str, dominio: Optional[str] = None):
+        self.nome = nome
+        self.dominio = dominio
+        self._valores: dict[Hashable, object] = {}
+        self._lock = threading.Lock()
+        # Incrementada a cada invalidação: uma carga iniciada antes dela
+        # não é guardada, pois pode ter lido dados já alterados
+        self._geracao = 0
+        self._versao_compartilhada = 0
+        # Métricas
+        self.acertos = 0
+        self.faltas = 0
+        self.invalidacoes = 0
+
+    def obter(self, chave: Hashable, carregar: Callable[[], T]) -> T:
+        """Devolve o valor em cache ou o carrega com `carregar`"""
+        with self._lock:
+            if self.dominio is not None:
+                versao = obter_versao_compartilhada(self.dominio)
+                if versao != self._versao_compartilhada:
+                    self._versao_compartilhada = versao
+                    self._limpar()
+            if chave in self._valores:
+                self.acertos += 1
+                return self._valores[chave]
+            self.faltas += 1
+            geracao = self._geracao
+        valor = carregar()
+        with self._lock:
+            if geracao == self._geracao:
+                self._valores[chave] = valor
+        return valor
+
+    def invalidar(self) -> None:
+        """Descarta todos os valores; chamado após as escritas, depois do commit"""
+        with self._lock:
+            self._limpar()
+
+    def _limpar(self) -> None:
+        self._valores.clear()
+        self._geracao += 1
+        self.invalidacoes += 1
+
+    def invalidando(self, func: Callable[..., T]) -> Callable[..., T]:
+        """Decorador para as funções de escrita: invalida o cache ao final de cada chamada (após o commit)"""
+        @functools.wraps(func)
+        def envoltorio(*args, **kwargs):
+            try:
+                return func(*args, **kwargs)
+            finally:
+                apos_confirmar(self.invalidar)
+        return envoltorio
+
+    def metricas(self) -> dict:
+        with self._lock:
+            consultas = self.acertos + self.faltas
+            return {
+                "acertos": self.acertos,
+                "faltas": self.faltas,
+                "taxa_acerto": round(self.acertos / consultas, 4) if consultas else None,
+                "invalidacoes": self.invalidacoes,
+                "chaves": len(self._valores),
+            }
+
+
+_caches_referencia: dict[str, CacheReferencia] = {}
+
+
+def criar_cache_referencia(nome: str, dominio: Optional[str] = None) -> CacheReferencia:
+    """Cria um CacheReferencia e o inclui nas métricas da aplicação"""
+    cache = CacheReferencia(nome, dominio)
+    _caches_referencia[nome] = cache
+    return cache
+
+
+def obter_metricas_cache_referencia() -> dict:
+    return {nome: cache.metricas() for nome, cache in _caches_referencia.items()}
+
+
+registrar_metricas("cache_referencia", obter_metricas_cache_referencia)
+
+
+class CacheLRU:
+    """
+    Cache read-through limitado por número de entradas (LRU) e por tempo
+    de vida (TTL).
+
+    Se `versao` for informada, é chamada a cada consulta; quando o valor
+    devolvido muda, todas as entradas são descartadas. Resultados None
+    (registro inexistente) não são guardados.
+    """
+
+    def __init__(self, nome: str, max_entradas: int, ttl: float,
+                 versao: Optional[Callable[[], Hashable]] = None):
+        self.nome = nome
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self._versao = versao
+        self._versao_atual: Optional[Hashable] = versao() if versao else None
+        self._entradas: OrderedDict[Hashable, tuple[float, object]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._geracao = 0
+        # Métricas
+        self.acertos = 0
+        self.faltas = 0
+        self.descartes = 0
+        self.expiracoes = 0
+        self.invalidacoes = 0
+
+    def _sincronizar(self) -> None:
+        if self._versao is None:
+            return
+        versao = self._versao()
+        if versao != self._versao_atual:
+            self._versao_atual = versao
+            self._entradas.clear()
+            self._geracao += 1
+            self.invalidacoes += 1
+
+    def obter(self, chave: Hashable, carregar: Callable[[], T]) -> T:
+        """Devolve o valor em cache ou o carrega com `carregar`"""
+        agora = time.monotonic()
+        with self._lock:
+            self._sincronizar()
+            entrada = self._entradas.get(chave)
+            if entrada is not None:
+                if entrada[0] > agora:
+                    self._entradas.move_to_end(chave)
+                    self.acertos += 1
+                    return entrada[1]
+                del self._entradas[chave]
+                self.expiracoes += 1
+            self.faltas += 1
+            geracao = self._geracao
+        valor = carregar()
+        if valor is None:
+            return valor
+        with self._lock:
+            if geracao == self._geracao:
+                self._entradas[chave] = (agora + self.ttl, valor)
+                self._entradas.move_to_end(chave)
+                while len(self._entradas) > self.max_entradas:
+                    self._entradas.popitem(last=False)
+                    self.descartes += 1
+        return valor
+
+    def invalidar(self, chave: Optional[Hashable] = None) -> None:
+        """Descarta uma entrada ou, sem chave, todas"""
+        with self._lock:
+            if chave is None:
+                self._entradas.clear()
+            else:
+                self._entradas.pop(chave, None)
+            self._geracao += 1
+            self.invalidacoes += 1
+
+    def metricas(self) -> dict:
+        with self._lock:
+            consultas = self.acertos + self.faltas
+            return {
+                "acertos": self.acertos,
+                "faltas": self.faltas,
+                "taxa_acerto": round(self.acertos / consultas, 4) if consultas else None,
+                "descartes": self.descartes,
+                "expiracoes": self.expiracoes,
+                "invalidacoes": self.invalidacoes,
+                "entradas": len(self._entradas),
+                "max_entradas": self.max_entradas,
+            }
+
+
+_caches_lru: dict[str, CacheLRU] = {}
+
+
+def criar_cache_lru(nome: str, max_entradas: int, ttl: float,
+                    versao: Optional[Callable[[], Hashable]] = None) -> CacheLRU:
+    """Cria um CacheLRU e o inclui nas métricas da aplicação"""
+    cache = CacheLRU(nome, max_entradas, ttl, versao)
+    _caches_lru[nome] = cache
+    return cache
+
+
+def obter_metricas_cache_lru() -> dict:
+    return {nome: cache.metricas() for nome, cache in _caches_lru.items()}
+
+
+registrar_metricas("cache_lru", obter_metricas_cache_lru)
+
+
+class CacheRespostas:
+    """
+    Corpos de respostas renderizadas, com os seus cabeçalhos, válidos para
+    uma versão de conteúdo.
+
+    A chave identifica a variante da página (cursor de paginação, filtros);
+    o número de variantes guardadas é limitado a `max_entradas`, descartando
+    a mais antiga. As respostas da versão imediatamente anterior ficam
+    disponíveis em obter_obsoleta().
+    """
+
+    def __init__(self, nome: str, max_entradas: int = 256):
+        self.nome = nome
+        self.max_entradas = max_entradas
+        self._versao: Optional[Hashable] = None
+        self._corpos: OrderedDict[Hashable, tuple[bytes, dict[str, str]]] = OrderedDict()
+        self._obsoletos: OrderedDict[Hashable, tuple[bytes, dict[str, str]]] = OrderedDict()
+        self._lock = threading.Lock()
+        # Métricas
+        self.acertos = 0
+        self.faltas = 0
+        self.descartes = 0
+
+    def _sincronizar(self, versao: Hashable) -> None:
+        if versao != self._versao:
+            self._versao = versao
+            self._obsoletos = self._corpos
+            self._corpos = OrderedDict()
+
+    def obter(self, versao: Hashable, chave: Hashable) -> Optional[tuple[bytes, dict[str, str]]]:
+        """Devolve (corpo, cabeçalhos) guardados para a variante, se ainda valem"""
+        with self._lock:
+            self._sincronizar(versao)
+            resposta = self._corpos.get(chave)
+            if resposta is None:
+                self.faltas += 1
+            else:
+                self.acertos += 1
+            return resposta
+
+    def obter_obsoleta(self, chave: Hashable) -> Optional[tuple[bytes, dict[str, str]]]:
+        """Resposta da variante montada com a versão anterior, se houver"""
+        with self._lock:
+            return self._obsoletos.get(chave)
+
+    def guardar(self, versao: Hashable, chave: Hashable, corpo: bytes,
+                cabecalhos: Optional[dict[str, str]] = None) -> None:
+        """Guarda o corpo montado com `versao`; ignora se a versão já mudou"""
+        with self._lock:
+            if versao != self._versao:
+                return
+            self._corpos[chave] = (corpo, cabecalhos or {})
+            if len(self._corpos) > self.max_entradas:
+                self._corpos.popitem(last=False)
+                self.descartes += 1
+
+    def metricas(self) -> dict:
+        with self._lock:
+            consultas = self.acertos + self.faltas
+            return {
+                "acertos": self.acertos,
+                "faltas": self.faltas,
+                "taxa_acerto": round(self.acertos / consultas, 4) if consultas else None,
+                "descartes": self.descartes,
+                "versao": self._versao,
+                "entradas": len(self._corpos),
+                "obsoletas": len(self._obsoletos),
+                "bytes": sum(len(corpo) for corpo, _ in self._corpos.values()),
+            }
+
+
+_caches_respostas: dict[str, CacheRespostas] = {}
+
+
+def criar_cache_respostas(nome: str, max_entradas: int = 256) -> CacheRespostas:
+    """Cria um CacheRespostas e o inclui nas métricas da aplicação"""
+    cache = CacheRespostas(nome, max_entradas)
+    _caches_respostas[nome] = cache
+    return cache
+
+
+def obter_metricas_cache_respostas() -> dict:
+    return {nome: cache.metricas() for nome, cache in _caches_respostas.items()}
+
+
+registrar_metricas("cache_respostas", obter_metricas_cache_respostas)
@@ -0,0 +1,146 @@
+"""
+Carga única (single-flight) para reconstruções de cache
+
+Quando a versão do catálogo muda, todas as requisições que chegam antes
+de o cache ser refeito encontram uma falta ao mesmo tempo. Sem proteção,
+cada uma repete a mesma consulta e a mesma renderização (efeito manada).
+
+CargaUnica.executar(chave, carregar) garante que:
+
+- dentro do worker, só uma carga por chave roda de cada vez: as demais
+  requisições aguardam o resultado dela ou, se receberem uma cópia
+  obsoleta, respondem com ela na hora enquanto a carga acontece em
+  segundo plano (stale-while-revalidate);
+- entre workers, a carga só começa depois de obtida a lease da chave na
+  tabela cache_lease. Um worker que não obtém a lease continua servindo a
+  cópia obsoleta e tenta de novo na próxima requisição; sem cópia, espera
+  a lease ser liberada (ou expirar) antes de carregar. Como os caches são
+  por worker, cada um ainda monta a sua cópia, mas uma de cada vez, e não
+  todos juntos.
+
+A chave da lease precisa ser igual em todos os workers (ex.: o ETag da
+página, derivado da versão compartilhada).
+"""
+import asyncio
+import os
+import time
+import uuid
+from typing import Awaitable, Callable, Hashable, Optional, TypeVar
+
+from repo import lease_repo
+from util.db_util import executar_async
+from util.metricas_util import registrar_metricas
+
+
+T = TypeVar("T")
+
+# Tempo máximo (em segundos) que uma carga pode segurar a lease; depois
+# disso outro worker pode assumir (ex.: o dono caiu no meio da carga)
+DURACAO_LEASE = float(os.getenv("CARGA_UNICA_LEASE", "30"))
+USAR_LEASE = os.getenv("CARGA_UNICA_USAR_LEASE", "1") == "1"
+INTERVALO_ESPERA = 0.05
+
+# Identifica este worker como dono das leases
+DONO = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+
+class CargaUnica:
+    """Agrupa cargas concorrentes da mesma chave em uma só"""
+
+    def __init__(self, nome: str, usar_lease: bool = USAR_LEASE, duracao_lease: float = DURACAO_LEASE):
+        self.nome = nome
+        self.usar_lease = usar_lease
+        self.duracao_lease = duracao_lease
+        self._em_andamento: dict[Hashable, asyncio.Task] = {}
+        # Métricas
+        self.cargas = 0
+        self.agrupadas = 0
+        self.obsoletas = 0
+        self.leases_negadas = 0
+        self.esperas = 0
+
+    async def executar(self, chave: Hashable, carregar: Callable[[], Awaitable[T]],
+                       obsoleto: Optional[T] = None) -> T:
+        """
+        Devolve o resultado de `carregar()`, executada uma única vez para
+        todas as chamadas concorrentes com a mesma chave. Com `obsoleto`,
+        devolve essa cópia sem esperar e deixa a carga em segundo plano.
+        `carregar` não deve devolver None.
+        """
+        tarefa = self._em_andamento.get(chave)
+        if tarefa is None:
+            tarefa = asyncio.ensure_future(self._carregar(chave, carregar, obsoleto is not None))
+            self._em_andamento[chave] = tarefa
+            tarefa.add_done_callback(lambda t: self._concluir(chave, t))
+        else:
+            self.agrupadas += 1
+        if obsoleto is not None:
+            self.obsoletas += 1
+            return obsoleto
+        resultado = await asyncio.shield(tarefa)
+        if resultado is None:
+            # A carga em andamento desistiu (lease com outro worker) porque
+            # quem a iniciou tinha uma cópia obsoleta; esta chamada não tem
+            resultado = await self._carregar(chave, carregar, False)
+        return resultado
+
+    def _concluir(self, chave: Hashable, tarefa: asyncio.Task) -> None:
+        if self._em_andamento.get(chave) is tarefa:
+            del self._em_andamento[chave]
+        if not tarefa.cancelled() and tarefa.exception() is not None:
+            print(f"Erro na carga de {self.nome}: {tarefa.exception()}")
+
+    async def _carregar(self, chave: Hashable, carregar: Callable[[], Awaitable[T]],
+                        pode_desistir: bool) -> Optional[T]:
+        if not self.usar_lease:
+            self.cargas += 1
+            return await carregar()
+        chave_lease = f"{self.nome}:{chave}"
+        while not await executar_async("escrita", lease_repo.adquirir, chave_lease, DONO, self.duracao_lease):
+            self.leases_negadas += 1
+            if pode_desistir:
+                return None
+            # Vários workers podem estar esperando a mesma lease: ao ser
+            # liberada, só um a obtém e os demais voltam a esperar
+            await self._aguardar_lease(chave_lease)
+        try:
+            self.cargas += 1
+            return await carregar()
+        finally:
+            await executar_async("escrita", lease_repo.liberar, chave_lease, DONO)
+
+    async def _aguardar_lease(self, chave_lease: str) -> None:
+        """Espera o dono atual liberar a lease ou deixá-la expirar"""
+        self.esperas += 1
+        while True:
+            lease = await executar_async("leitura", lease_repo.obter_por_chave, chave_lease)
+            if lease is None or lease[1] < time.time():
+                return
+            await asyncio.sleep(INTERVALO_ESPERA)
+
+    def metricas(self) -> dict:
+        return {
+            "cargas": self.cargas,
+            "agrupadas": self.agrupadas,
+            "obsoletas": self.obsoletas,
+            "leases_negadas": self.leases_negadas,
+            "esperas": self.esperas,
+            "em_andamento": len(self._em_andamento),
+        }
+
+
+_cargas: dict[str, CargaUnica] = {}
+
+
+def criar_carga_unica(nome: str, usar_lease: bool = USAR_LEASE) -> CargaUnica:
+    """Cria uma CargaUnica e a inclui nas métricas da aplicação"""
+    carga = CargaUnica(nome, usar_lease)
+    _cargas[nome] = carga
+    return carga
+
+
+def obter_metricas_carga_unica() -> dict:
+    return {nome: carga.metricas() for nome, carga in _cargas.items()}
+
+
+registrar_metricas("carga_unica", obter_metricas_carga_unica)
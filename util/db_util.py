@@ -1,11 +1,605 @@
+import asyncio
+import contextvars
+import functools
+import importlib
+import os
+import pkgutil
+import queue
 import sqlite3
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Iterator, Optional, TypeVar
 
+from util.metricas_util import registrar_metricas
 
-def get_connection():
-    conn = None
-    try:
-        conn = sqlite3.connect("dados.db")
+T = TypeVar("T")
+
+
+CAMINHO_BANCO = os.getenv("DATABASE_PATH", "dados.db")
+TAMANHO_POOL = int(os.getenv("DB_POOL_TAMANHO", "8"))
+TIMEOUT_POOL = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+THREADS_LEITURA = int(os.getenv("DB_THREADS_LEITURA", "4"))
+INSTRUMENTAR_CONSULTAS = os.getenv("DB_INSTRUMENTAR", "1") == "1"
+
+# Perfil de PRAGMAs aplicado uma única vez, quando a conexão é aberta.
+# Cada valor pode ser sobrescrito por variável de ambiente; valor vazio
+# mantém o padrão do SQLite.
+PERFIL_PRAGMAS = {
+    "journal_mode": os.getenv("DB_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("DB_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": os.getenv("DB_BUSY_TIMEOUT", "5000"),
+    "cache_size": os.getenv("DB_CACHE_SIZE", "-16000"),
+    "mmap_size": os.getenv("DB_MMAP_SIZE", "134217728"),
+    "temp_store": os.getenv("DB_TEMP_STORE", "MEMORY"),
+}
+
+# Intervalo (em segundos) do checkpoint periódico do WAL; 0 desativa
+INTERVALO_CHECKPOINT = float(os.getenv("DB_CHECKPOINT_INTERVALO", "300"))
+MODO_CHECKPOINT = os.getenv("DB_CHECKPOINT_MODO", "PASSIVE")
+
+
+class EstatisticasConsultas:
+    """
+    Acumula, por comando SQL, a quantidade de execuções, o tempo total, as
+    linhas retornadas/afetadas e uma janela das últimas durações para o
+    cálculo de p50/p95/p99.
+
+    Os comandos são rotulados pelo nome da constante em sql/*.py que os
+    define (ex.: produto_sql.OBTER_TODOS); SQL que não vem de uma constante
+    é rotulado pelo próprio texto, abreviado.
+    """
+
+    TAMANHO_JANELA = 2048
+    LIMITE_ROTULOS = 1000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._dados: dict[str, dict] = {}
+        self._rotulos: dict[str, str] = {}
+        self._constantes: Optional[dict[str, str]] = None
+
+    def _carregar_constantes(self) -> dict[str, str]:
+        import sql
+        constantes = {}
+        for modulo_info in pkgutil.iter_modules(sql.__path__):
+            modulo = importlib.import_module(f"sql.{modulo_info.name}")
+            for nome, valor in vars(modulo).items():
+                if nome.isupper() and isinstance(valor, str):
+                    constantes[" ".join(valor.split())] = f"{modulo_info.name}.{nome}"
+        return constantes
+
+    def rotular(self, comando: str) -> str:
+        rotulo = self._rotulos.get(comando)
+        if rotulo is None:
+            if self._constantes is None:
+                self._constantes = self._carregar_constantes()
+            normalizado = " ".join(comando.split())
+            rotulo = self._constantes.get(normalizado) or f"sql: {normalizado[:80]}"
+            if len(self._rotulos) < self.LIMITE_ROTULOS:
+                self._rotulos[comando] = rotulo
+        return rotulo
+
+    def registrar(self, rotulo: str, duracao: float, linhas: int, nova_execucao: bool = True) -> None:
+        with self._lock:
+            dados = self._dados.get(rotulo)
+            if dados is None:
+                dados = {"execucoes": 0, "tempo_total": 0.0, "linhas": 0,
+                         "duracoes": deque(maxlen=self.TAMANHO_JANELA)}
+                self._dados[rotulo] = dados
+            dados["tempo_total"] += duracao
+            dados["linhas"] += linhas
+            if nova_execucao:
+                dados["execucoes"] += 1
+                dados["duracoes"].append(duracao)
+            elif dados["duracoes"]:
+                dados["duracoes"][-1] += duracao
+
+    def relatorio(self) -> list[dict]:
+        """Estatísticas por comando, ordenadas pelo tempo total gasto"""
+        with self._lock:
+            copia = [(rotulo, dict(d, duracoes=sorted(d["duracoes"]))) for rotulo, d in self._dados.items()]
+
+        def percentil(valores: list[float], p: float) -> float:
+            if not valores:
+                return 0.0
+            return round(valores[min(len(valores) - 1, int(len(valores) * p))] * 1000, 3)
+
+        linhas = []
+        for rotulo, d in copia:
+            linhas.append({
+                "comando": rotulo,
+                "execucoes": d["execucoes"],
+                "tempo_total_ms": round(d["tempo_total"] * 1000, 3),
+                "tempo_medio_ms": round(d["tempo_total"] * 1000 / d["execucoes"], 3) if d["execucoes"] else 0.0,
+                "p50_ms": percentil(d["duracoes"], 0.50),
+                "p95_ms": percentil(d["duracoes"], 0.95),
+                "p99_ms": percentil(d["duracoes"], 0.99),
+                "linhas": d["linhas"],
+            })
+        linhas.sort(key=lambda l: l["tempo_total_ms"], reverse=True)
+        return linhas
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._dados.clear()
+
+
+estatisticas_consultas = EstatisticasConsultas()
+
+
+class CursorInstrumentado(sqlite3.Cursor):
+    """
+    Cursor que mede cada comando, do execute até a leitura do resultado.
+
+    A execução fica pendente até o primeiro fetchone/fetchall, o próximo
+    execute ou o fechamento do cursor; o tempo de leitura das linhas é
+    somado à mesma amostra, já que no SQLite boa parte do trabalho de um
+    SELECT acontece durante o fetch.
+    """
+
+    _pendente: Optional[list] = None
+    _rotulo: Optional[str] = None
+
+    def _finalizar(self) -> None:
+        pendente = self._pendente
+        if pendente is not None:
+            self._pendente = None
+            estatisticas_consultas.registrar(*pendente)
+
+    def _medir_leitura(self, inicio: float, linhas: int) -> None:
+        duracao = time.perf_counter() - inicio
+        if self._pendente is not None:
+            self._pendente[1] += duracao
+            self._pendente[2] += linhas
+            self._finalizar()
+        elif self._rotulo is not None:
+            estatisticas_consultas.registrar(self._rotulo, duracao, linhas, nova_execucao=False)
+
+    def execute(self, comando, parametros=()):
+        self._finalizar()
+        self._rotulo = estatisticas_consultas.rotular(comando)
+        inicio = time.perf_counter()
+        try:
+            return super().execute(comando, parametros)
+        finally:
+            self._pendente = [self._rotulo, time.perf_counter() - inicio, max(self.rowcount, 0)]
+
+    def executemany(self, comando, sequencia):
+        self._finalizar()
+        self._rotulo = estatisticas_consultas.rotular(comando)
+        inicio = time.perf_counter()
+        try:
+            return super().executemany(comando, sequencia)
+        finally:
+            self._pendente = [self._rotulo, time.perf_counter() - inicio, max(self.rowcount, 0)]
+
+    def fetchone(self):
+        inicio = time.perf_counter()
+        row = super().fetchone()
+        self._medir_leitura(inicio, 0 if row is None else 1)
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        inicio = time.perf_counter()
+        rows = super().fetchmany(*args, **kwargs)
+        self._medir_leitura(inicio, len(rows))
+        return rows
+
+    def fetchall(self):
+        inicio = time.perf_counter()
+        rows = super().fetchall()
+        self._medir_leitura(inicio, len(rows))
+        return rows
+
+    def close(self):
+        self._finalizar()
+        super().close()
+
+    def __del__(self):
+        try:
+            self._finalizar()
+        except Exception:
+            pass
+
+
+class ConexaoInstrumentada(sqlite3.Connection):
+    """Conexão cujos cursores (inclusive os de conn.execute) são instrumentados"""
+
+    def cursor(self, factory=CursorInstrumentado):
+        return super().cursor(factory)
+
+    def execute(self, comando, parametros=()):
+        return self.cursor().execute(comando, parametros)
+
+    def executemany(self, comando, sequencia):
+        return self.cursor().executemany(comando, sequencia)
+
+
+class PoolConexoes:
+    """
+    Pool limitado de conexões SQLite já abertas e configuradas.
+
+    As conexões são criadas sob demanda até o limite `tamanho` e reaproveitadas
+    entre as chamadas dos repositórios. Quando todas estão em uso, quem pede
+    uma conexão espera até `timeout` segundos pela devolução de outra.
+    """
+
+    def __init__(self, caminho: str, tamanho: int = TAMANHO_POOL, timeout: float = TIMEOUT_POOL):
+        self.caminho = caminho
+        self.tamanho = tamanho
+        self.timeout = timeout
+        self._disponiveis: queue.LifoQueue = queue.LifoQueue(maxsize=tamanho)
+        self._lock = threading.Lock()
+        self._criadas = 0
+        self._pid = os.getpid()
+        # Métricas
+        self.checkouts = 0
+        self.esperas = 0
+        self.timeouts = 0
+        self.espera_total = 0.0
+        self.espera_maxima = 0.0
+
+    def _criar_conexao(self) -> sqlite3.Connection:
+        fabrica = ConexaoInstrumentada if INSTRUMENTAR_CONSULTAS else sqlite3.Connection
+        conn = sqlite3.connect(self.caminho, check_same_thread=False, factory=fabrica)
         conn.row_factory = sqlite3.Row
+        aplicar_pragmas(conn)
+        return conn
+
+    def obter(self) -> sqlite3.Connection:
+        """Retira uma conexão do pool, criando uma nova se ainda houver vaga"""
+        inicio = time.perf_counter()
+        try:
+            conn = self._disponiveis.get_nowait()
+        except queue.Empty:
+            conn = None
+            with self._lock:
+                if self._criadas < self.tamanho:
+                    self._criadas += 1
+                    criar = True
+                else:
+                    criar = False
+            if criar:
+                try:
+                    conn = self._criar_conexao()
+                except sqlite3.Error:
+                    with self._lock:
+                        self._criadas -= 1
+                    raise
+            else:
+                try:
+                    conn = self._disponiveis.get(timeout=self.timeout)
+                except queue.Empty:
+                    with self._lock:
+                        self.timeouts += 1
+                    raise sqlite3.OperationalError(
+                        f"Nenhuma conexão disponível no pool após {self.timeout}s")
+                with self._lock:
+                    self.esperas += 1
+        espera = time.perf_counter() - inicio
+        with self._lock:
+            self.checkouts += 1
+            self.espera_total += espera
+            if espera > self.espera_maxima:
+                self.espera_maxima = espera
+        return conn
+
+    def devolver(self, conn: sqlite3.Connection) -> None:
+        """Devolve a conexão ao pool; conexões em estado inválido são descartadas"""
+        if conn.in_transaction:
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                self._descartar(conn)
+                return
+        try:
+            self._disponiveis.put_nowait(conn)
+        except queue.Full:
+            self._descartar(conn)
+
+    def _descartar(self, conn: sqlite3.Connection) -> None:
+        with self._lock:
+            self._criadas -= 1
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def fechar(self) -> None:
+        """Fecha todas as conexões ociosas do pool"""
+        while True:
+            try:
+                conn = self._disponiveis.get_nowait()
+            except queue.Empty:
+                break
+            self._descartar(conn)
+
+    def metricas(self) -> dict:
+        with self._lock:
+            return {
+                "caminho": self.caminho,
+                "tamanho": self.tamanho,
+                "conexoes_abertas": self._criadas,
+                "conexoes_ociosas": self._disponiveis.qsize(),
+                "checkouts": self.checkouts,
+                "esperas": self.esperas,
+                "timeouts": self.timeouts,
+                "espera_total_ms": round(self.espera_total * 1000, 3),
+                "espera_media_ms": round(self.espera_total * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+                "espera_maxima_ms": round(self.espera_maxima * 1000, 3),
+            }
+
+
+def aplicar_pragmas(conn: sqlite3.Connection) -> None:
+    """Aplica o PERFIL_PRAGMAS atual em uma conexão recém-aberta"""
+    for nome, valor in PERFIL_PRAGMAS.items():
+        if valor not in (None, ""):
+            conn.execute(f"PRAGMA {nome} = {valor}")
+
+
+def configurar_pragmas(**pragmas) -> None:
+    """
+    Altera o perfil de PRAGMAs e recria o pool para que as novas conexões
+    já nasçam com ele.
+
+    Exemplo:
+        configurar_pragmas(journal_mode="DELETE", synchronous="FULL")
+    """
+    PERFIL_PRAGMAS.update({nome: str(valor) for nome, valor in pragmas.items()})
+    fechar_pool()
+
+
+_pool: Optional[PoolConexoes] = None
+_pool_lock = threading.Lock()
+
+
+def obter_pool() -> PoolConexoes:
+    """Retorna o pool do processo atual, criando-o na primeira chamada"""
+    global _pool
+    pool = _pool
+    if pool is None or pool._pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool._pid != os.getpid():
+                _pool = PoolConexoes(CAMINHO_BANCO)
+            pool = _pool
+    return pool
+
+
+def configurar_banco(caminho: str) -> None:
+    """Aponta o pool para outro arquivo de banco (usado em scripts e benchmarks)"""
+    global CAMINHO_BANCO
+    fechar_pool()
+    CAMINHO_BANCO = caminho
+
+
+def fechar_pool() -> None:
+    """Fecha as conexões do pool; deve ser chamado no encerramento da aplicação"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.fechar()
+            _pool = None
+
+
+def obter_metricas_pool() -> dict:
+    return obter_pool().metricas()
+
+
+def obter_relatorio_consultas() -> list[dict]:
+    return estatisticas_consultas.relatorio()
+
+
+def imprimir_relatorio_consultas(limite: int = 20) -> None:
+    """Imprime os comandos que mais consumiram tempo de banco"""
+    relatorio = obter_relatorio_consultas()[:limite]
+    if not relatorio:
+        return
+    print(f"{'comando':<45} {'exec':>7} {'total ms':>10} {'p50':>8} {'p95':>8} {'p99':>8} {'linhas':>8}")
+    for l in relatorio:
+        print(f"{l['comando'][:45]:<45} {l['execucoes']:>7} {l['tempo_total_ms']:>10.1f} "
+              f"{l['p50_ms']:>8.3f} {l['p95_ms']:>8.3f} {l['p99_ms']:>8.3f} {l['linhas']:>8}")
+
+
+registrar_metricas("pool", obter_metricas_pool)
+registrar_metricas("consultas", obter_relatorio_consultas)
+
+
+class _Transacao:
+    """Transação aberta por transacao(), compartilhada pelos get_connection do bloco"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.ao_confirmar: list[Callable[[], None]] = []
+
+
+_transacao_atual: contextvars.ContextVar[Optional[_Transacao]] = contextvars.ContextVar(
+    "transacao_atual", default=None)
+
+
+@contextmanager
+def get_connection() -> Iterator[sqlite3.Connection]:
+    """
+    Empresta uma conexão do pool durante o bloco `with`.
+
+    Ao final do bloco a transação é confirmada (ou desfeita em caso de
+    exceção) e a conexão volta para o pool, sem ser fechada. Dentro de um
+    bloco transacao(), devolve a conexão da transação em andamento e deixa
+    o commit para o final dela.
+    """
+    transacao_atual = _transacao_atual.get()
+    if transacao_atual is not None:
+        yield transacao_atual.conn
+        return
+    pool = obter_pool()
+    try:
+        conn = pool.obter()
     except sqlite3.Error as e:
         print(e)
-    return conn
+        raise
+    try:
+        yield conn
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        pool.devolver(conn)
+
+
+@contextmanager
+def transacao() -> Iterator[sqlite3.Connection]:
+    """
+    Agrupa em uma única transação todas as chamadas aos repositórios feitas
+    dentro do bloco `with` (na mesma thread). Blocos aninhados participam
+    da transação externa. As operações em lote, que confirmam a cada lote,
+    continuam confirmando por conta própria.
+    """
+    if _transacao_atual.get() is not None:
+        with get_connection() as conn:
+            yield conn
+        return
+    with get_connection() as conn:
+        transacao_atual = _Transacao(conn)
+        token = _transacao_atual.set(transacao_atual)
+        try:
+            yield conn
+        finally:
+            _transacao_atual.reset(token)
+    for callback in transacao_atual.ao_confirmar:
+        callback()
+
+
+def apos_confirmar(callback: Callable[[], None]) -> None:
+    """
+    Executa `callback` depois do commit da transação em andamento, ou na
+    hora se não houver uma. Usado pelas invalidações de cache, que não
+    podem acontecer antes de os dados novos estarem visíveis. O mesmo
+    callback registrado várias vezes na transação roda uma vez só.
+    """
+    transacao_atual = _transacao_atual.get()
+    if transacao_atual is None:
+        callback()
+    elif callback not in transacao_atual.ao_confirmar:
+        transacao_atual.ao_confirmar.append(callback)
+
+
+def fabrica_modelo(modelo: Callable[..., T]) -> Callable[[sqlite3.Cursor, tuple], T]:
+    """
+    Row factory posicional para cursor.row_factory.
+
+    Monta o modelo direto da tupla da linha, sem passar pelo sqlite3.Row e
+    pela busca de cada coluna pelo nome. As colunas do SELECT precisam vir
+    na mesma ordem dos campos do modelo.
+    """
+    def fabrica(cursor: sqlite3.Cursor, row: tuple) -> T:
+        return modelo(*row)
+    return fabrica
+
+
+class CheckpointPeriodico:
+    """Thread em segundo plano que executa `PRAGMA wal_checkpoint` em intervalos fixos"""
+
+    def __init__(self, intervalo: float, modo: str = MODO_CHECKPOINT):
+        self.intervalo = intervalo
+        self.modo = modo
+        self.execucoes = 0
+        self.ultimo_resultado: Optional[tuple] = None
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._executar, name="wal-checkpoint", daemon=True)
+
+    def iniciar(self) -> None:
+        self._thread.start()
+
+    def parar(self) -> None:
+        self._parar.set()
+        self._thread.join(timeout=self.intervalo)
+
+    def checkpoint(self) -> Optional[tuple]:
+        with get_connection() as conn:
+            row = conn.execute(f"PRAGMA wal_checkpoint({self.modo})").fetchone()
+        # (busy, páginas no WAL, páginas copiadas para o banco)
+        self.ultimo_resultado = tuple(row) if row else None
+        self.execucoes += 1
+        return self.ultimo_resultado
+
+    def _executar(self) -> None:
+        while not self._parar.wait(self.intervalo):
+            try:
+                self.checkpoint()
+            except sqlite3.Error as e:
+                print(f"Erro no checkpoint do WAL: {e}")
+
+
+_checkpoint: Optional[CheckpointPeriodico] = None
+
+
+def iniciar_checkpoint_periodico(intervalo: float = INTERVALO_CHECKPOINT) -> None:
+    """Agenda o checkpoint do WAL; não faz nada se o banco não estiver em modo WAL"""
+    global _checkpoint
+    if intervalo <= 0 or _checkpoint is not None:
+        return
+    if str(PERFIL_PRAGMAS.get("journal_mode", "")).upper() != "WAL":
+        return
+    _checkpoint = CheckpointPeriodico(intervalo)
+    _checkpoint.iniciar()
+
+
+def parar_checkpoint_periodico() -> None:
+    global _checkpoint
+    if _checkpoint is not None:
+        _checkpoint.parar()
+        _checkpoint = None
+
+
+# Execução assíncrona: leituras vão para um pool de threads leitoras e
+# escritas para uma única thread escritora, de modo que o event loop nunca
+# espera pelo SQLite e as escritas não disputam o lock do banco entre si.
+
+_executores: dict[str, ThreadPoolExecutor] = {}
+_executores_lock = threading.Lock()
+
+
+def _obter_executor(tipo: str) -> ThreadPoolExecutor:
+    executor = _executores.get(tipo)
+    if executor is None:
+        with _executores_lock:
+            executor = _executores.get(tipo)
+            if executor is None:
+                threads = THREADS_LEITURA if tipo == "leitura" else 1
+                executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix=f"db-{tipo}")
+                _executores[tipo] = executor
+    return executor
+
+
+async def executar_async(tipo: str, func: Callable[..., T], *args, **kwargs) -> T:
+    """Executa uma função de repositório no executor `leitura` ou `escrita`"""
+    loop = asyncio.get_running_loop()
+    contexto = contextvars.copy_context()
+    chamada = functools.partial(contexto.run, func, *args, **kwargs)
+    return await loop.run_in_executor(_obter_executor(tipo), chamada)
+
+
+def leitura_async(func: Callable[..., T]) -> Callable[..., Awaitable[T]]:
+    """Cria a versão assíncrona de uma função de leitura do repositório"""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await executar_async("leitura", func, *args, **kwargs)
+    return wrapper
+
+
+def escrita_async(func: Callable[..., T]) -> Callable[..., Awaitable[T]]:
+    """Cria a versão assíncrona de uma função de escrita do repositório"""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await executar_async("escrita", func, *args, **kwargs)
+    return wrapper
+
+
+def encerrar_executores() -> None:
+    with _executores_lock:
+        for executor in _executores.values():
+            executor.shutdown(wait=True)
+        _executores.clear()
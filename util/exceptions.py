@@ -33,4 +33,10 @@ class BancoDadosError(LojaVirtualError):
     """Erro relacionado ao banco de dados"""
     def __init__(self, mensagem: str, operacao: str, erro_original: Optional[Exception] = None):
         super().__init__(mensagem, erro_original)
-        self.operacao = operacao
\ No newline at end of file
+        self.operacao = operacao
+
+class SobrecargaError(LojaVirtualError):
+    """Erro quando um recurso está saturado e a requisição deve ser repetida mais tarde"""
+    def __init__(self, mensagem: str, repetir_apos: int):
+        super().__init__(mensagem)
+        self.repetir_apos = repetir_apos
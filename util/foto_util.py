@@ -1,6 +1,79 @@
+"""
+Fotos dos produtos
+
+Os arquivos ficam em static/img/products/<código>/ e o manifesto de cada
+foto (ordem, arquivo, dimensões, tamanho e hash) na tabela produto_foto.
+Todas as consultas passam pelo manifesto, sem listar o diretório nem
+verificar a existência dos arquivos. Fotos novas recebem um nome derivado
+do hash do conteúdo, de modo que reordenar é só atualizar a coluna ordem;
+as fotos anteriores ao manifesto mantêm o nome <código>-NNN.jpg.
+
+Cada foto é gravada também em versões reduzidas (LARGURAS_FOTO), geradas
+a partir de uma única decodificação da imagem enviada e nomeadas
+<arquivo>-<largura>w.jpg. A coluna larguras do manifesto diz quais existem,
+e as páginas as oferecem ao navegador em srcset.
+
+Cada versão também é gravada nos formatos de FORMATOS_FOTO suportados
+pelo Pillow (WebP e AVIF), com a mesma base de nome e outra extensão. A
+escolha do formato entregue é feita ao servir o arquivo, pelo cabeçalho
+Accept (ver negociacao_fotos_util); a coluna formatos registra quais
+existem.
+"""
+import functools
+import hashlib
+import io
 import os
-from PIL import Image
-from typing import List, Optional
+import re
+import tempfile
+from PIL import Image, features
+from typing import Dict, List, Optional, Tuple
+
+from model.produto_foto_model import ProdutoFoto, nome_derivada, nome_formato
+from repo import produto_foto_repo, produto_repo
+from util.db_util import apos_confirmar, escrita_async, leitura_async, transacao
+
+
+# Larguras (em pixels) das versões de cada foto; a maior é o arquivo principal
+LARGURAS_FOTO = tuple(sorted(int(l) for l in os.getenv("FOTO_LARGURAS", "160,320,480,800").split(",")))
+QUALIDADE_JPEG = 85
+
+# Extensão -> (formato do Pillow, opções de codificação)
+CODIFICADORES = {
+    "jpg": ("JPEG", {"quality": QUALIDADE_JPEG, "optimize": True}),
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "avif": ("AVIF", {"quality": 60, "speed": 8}),
+}
+
+
+def _suportado(extensao: str) -> bool:
+    try:
+        return features.check_module(extensao)
+    except ValueError:
+        return False
+
+
+# Formatos gravados além do JPEG, entre os que o Pillow instalado suporta
+FORMATOS_FOTO = tuple(
+    f for f in os.getenv("FOTO_FORMATOS", "webp,avif").split(",") if f in CODIFICADORES and _suportado(f))
+
+# Nome dos arquivos gravados antes do manifesto: <código>-<NNN>.jpg
+PADRAO_FOTO_LEGADA = re.compile(r"^(\d{6})-(\d{3})\.jpg$")
+
+
+def altera_fotos(func):
+    """
+    Decorador para as operações que alteram as fotos de um produto (primeiro
+    argumento): executa a operação em uma transação junto com a atualização
+    da data de alteração do produto e da versão do catálogo, usadas pelos
+    caches e pelos ETags das páginas públicas.
+    """
+    @functools.wraps(func)
+    def envoltorio(produto_id: int, *args, **kwargs):
+        with transacao():
+            resultado = func(produto_id, *args, **kwargs)
+            produto_repo.tocar(produto_id)
+        return resultado
+    return envoltorio
 
 
 def obter_diretorio_produto(produto_id: int) -> str:
@@ -28,14 +101,42 @@ def criar_diretorio_produto(produto_id: int) -> bool:
         return False
 
 
-def processar_imagem(arquivo, caminho_destino: str) -> bool:
+def codificar(img: Image.Image, extensao: str) -> bytes:
+    formato, opcoes = CODIFICADORES[extensao]
+    saida = io.BytesIO()
+    img.save(saida, formato, **opcoes)
+    return saida.getvalue()
+
+
+def gerar_versoes(img: Image.Image, larguras: Tuple[int, ...],
+                  extensoes: Tuple[str, ...] = ("jpg",) + FORMATOS_FOTO) -> Dict[int, Dict[str, bytes]]:
+    """
+    Codifica a imagem quadrada em cada largura pedida, da maior para a
+    menor, e em cada formato; cada versão é reduzida a partir da anterior,
+    sem decodificar de novo. Retorna {largura: {extensão: conteúdo}}.
+    """
+    versoes = {}
+    for largura in sorted(larguras, reverse=True):
+        if img.width != largura:
+            img = img.resize((largura, largura), Image.Resampling.LANCZOS)
+        versoes[largura] = {extensao: codificar(img, extensao) for extensao in extensoes}
+    return versoes
+
+
+def processar_imagem(arquivo, larguras: Tuple[int, ...] = LARGURAS_FOTO) -> Optional[Dict[int, Dict[str, bytes]]]:
     """
-    Processa uma imagem: corta para quadrado, redimensiona e salva como JPG
+    Processa uma imagem: corta para quadrado e codifica como JPG (e nos
+    FORMATOS_FOTO) em cada uma das larguras. Retorna {largura: {extensão:
+    conteúdo}} ou None se a imagem for inválida.
     """
     try:
         # Abrir a imagem
         img: Image.Image = Image.open(arquivo)
 
+        # Em JPEG, decodificar já reduzido (em potências de 2) até perto do
+        # maior tamanho pedido, em vez de expandir a imagem inteira
+        img.draft('RGB', (max(larguras), max(larguras)))
+
         # Converter para RGB se necessário (para salvar como JPG)
         if img.mode != 'RGB':
             img = img.convert('RGB')
@@ -51,230 +152,270 @@ def processar_imagem(arquivo, caminho_destino: str) -> bool:
 
         img = img.crop((left, top, right, bottom))
 
-        # Redimensionar para tamanho padrão
-        img = img.resize((800, 800), Image.Resampling.LANCZOS)
-
-        # Criar diretório se não existir
-        os.makedirs(os.path.dirname(caminho_destino), exist_ok=True)
-
-        # Salvar como JPG
-        img.save(caminho_destino, 'JPEG', quality=85, optimize=True)
-
-        return True
+        return gerar_versoes(img, larguras)
     except Exception as e:
         print(f"Erro ao processar imagem: {e}")
-        return False
+        return None
 
 
-def obter_foto_principal(produto_id: int) -> Optional[str]:
-    """Retorna a URL da foto principal do produto ou None se não existir"""
-    codigo_produto = f"{produto_id:06d}"
-    caminho_foto = obter_diretorio_produto(produto_id) + f"/{codigo_produto}-001.jpg"
-
-    if os.path.exists(caminho_foto):
-        return f"/static/img/products/{codigo_produto}/{codigo_produto}-001.jpg"
-    return None
+def gravar_arquivo(caminho_destino: str, conteudo: bytes) -> None:
+    """Grava o arquivo de forma atômica (temporário + rename)"""
+    diretorio = os.path.dirname(caminho_destino)
+    os.makedirs(diretorio, exist_ok=True)
+    descritor, temporario = tempfile.mkstemp(prefix=".foto-", dir=diretorio)
+    try:
+        with os.fdopen(descritor, "wb") as arquivo:
+            arquivo.write(conteudo)
+        os.replace(temporario, caminho_destino)
+    except BaseException:
+        os.unlink(temporario)
+        raise
 
 
-def obter_todas_fotos(produto_id: int) -> List[str]:
-    """Retorna lista de URLs de todas as fotos do produto ordenadas"""
-    codigo_produto = f"{produto_id:06d}"
+def _remover_arquivos(produto_id: int, arquivos: List[str]) -> None:
     diretorio = obter_diretorio_produto(produto_id)
+    for arquivo in arquivos:
+        try:
+            os.remove(os.path.join(diretorio, arquivo))
+        except OSError:
+            pass
 
-    if not os.path.exists(diretorio):
-        return []
 
-    fotos = []
-    arquivos = os.listdir(diretorio)
+def gerar_derivadas(produto_id: int, arquivo: str, largura: int) -> str:
+    """
+    Grava as versões reduzidas de uma foto já existente e retorna o valor
+    da coluna larguras ("" se o arquivo não puder ser lido)
+    """
+    caminho = os.path.join(obter_diretorio_produto(produto_id), arquivo)
+    larguras = tuple(l for l in LARGURAS_FOTO if l < largura)
+    try:
+        with Image.open(caminho) as img:
+            if larguras:
+                img.draft('RGB', (larguras[-1], larguras[-1]))
+            versoes = gerar_versoes(img.convert('RGB'), larguras, ("jpg",))
+    except Exception as e:
+        print(f"Versões não geradas ({caminho}): {e}")
+        return ""
+    for l, conteudos in versoes.items():
+        gravar_arquivo(os.path.join(os.path.dirname(caminho), nome_derivada(arquivo, l)), conteudos["jpg"])
+    return ",".join(str(l) for l in larguras + (largura,))
 
-    # Filtrar apenas arquivos JPG do produto
-    for arquivo in arquivos:
-        if arquivo.startswith(codigo_produto) and arquivo.endswith('.jpg'):
-            fotos.append(f"/static/img/products/{codigo_produto}/{arquivo}")
 
-    # Ordenar por número sequencial
-    fotos.sort()
-    return fotos
+def gerar_formatos(produto_id: int, arquivo: str, largura: int, larguras: str) -> str:
+    """
+    Grava os FORMATOS_FOTO de uma foto já existente e de suas versões
+    reduzidas, a partir dos JPEGs; retorna o valor da coluna formatos
+    """
+    diretorio = obter_diretorio_produto(produto_id)
+    jpegs = [arquivo] + [nome_derivada(arquivo, int(l)) for l in larguras.split(",") if l and int(l) < largura]
+    try:
+        for jpeg in jpegs:
+            with Image.open(os.path.join(diretorio, jpeg)) as img:
+                img = img.convert('RGB')
+                for extensao in FORMATOS_FOTO:
+                    gravar_arquivo(os.path.join(diretorio, nome_formato(jpeg, extensao)), codificar(img, extensao))
+    except Exception as e:
+        print(f"Formatos não gerados ({arquivo}): {e}")
+        return ""
+    return ",".join(FORMATOS_FOTO)
 
 
-def obter_proximo_numero(produto_id: int) -> int:
-    """Retorna o próximo número sequencial disponível para uma nova foto"""
-    codigo_produto = f"{produto_id:06d}"
-    diretorio = obter_diretorio_produto(produto_id)
+def obter_foto_principal(produto_id: int) -> Optional[str]:
+    """Retorna a URL da foto principal do produto ou None se não existir"""
+    foto = produto_foto_repo.obter_por_ordem(produto_id, 1)
+    return foto.url if foto else None
 
-    if not os.path.exists(diretorio):
-        return 1
 
-    numeros = []
-    arquivos = os.listdir(diretorio)
+def obter_fotos_principais(produto_ids: List[int]) -> Dict[int, Optional[str]]:
+    """
+    Retorna {produto_id: URL da foto principal ou None} para vários produtos
+    com uma única consulta ao manifesto, sem acessar o disco
+    """
+    principais = {foto.produto_id: foto.url for foto in produto_foto_repo.obter_principais(produto_ids)}
+    return {produto_id: principais.get(produto_id) for produto_id in produto_ids}
 
-    for arquivo in arquivos:
-        if arquivo.startswith(codigo_produto) and arquivo.endswith('.jpg'):
-            # Extrair número do arquivo (XXXXXX-NNN.jpg)
-            try:
-                numero_str = arquivo.split('-')[1].split('.')[0]
-                numeros.append(int(numero_str))
-            except:
-                continue
 
-    if not numeros:
-        return 1
+def obter_fotos(produto_id: int) -> List[ProdutoFoto]:
+    """Retorna o manifesto das fotos do produto, em ordem"""
+    return produto_foto_repo.obter_por_produto(produto_id)
 
-    return max(numeros) + 1
 
+def obter_todas_fotos(produto_id: int) -> List[str]:
+    """Retorna lista de URLs de todas as fotos do produto ordenadas"""
+    return [foto.url for foto in obter_fotos(produto_id)]
 
-def excluir_foto(produto_id: int, numero: int) -> bool:
-    """Remove uma foto específica e reordena as restantes"""
-    codigo_produto = f"{produto_id:06d}"
-    diretorio = obter_diretorio_produto(produto_id)
 
-    # Remover o arquivo específico
-    caminho_foto = f"{diretorio}/{codigo_produto}-{numero:03d}.jpg"
+def obter_proximo_numero(produto_id: int) -> int:
+    """Retorna o próximo número sequencial disponível para uma nova foto"""
+    return produto_foto_repo.obter_proxima_ordem(produto_id)
 
-    if os.path.exists(caminho_foto):
-        try:
-            os.remove(caminho_foto)
-        except:
-            return False
 
-    # Reordenar fotos restantes
-    return reordenar_fotos_automatico(produto_id)
+@altera_fotos
+def excluir_foto(produto_id: int, numero: int) -> bool:
+    """
+    Remove uma foto específica e reordena as restantes. Bloqueante (abre a
+    transação e publica o catálogo): nas rotas use excluir_foto_async
+    """
+    foto = produto_foto_repo.obter_por_ordem(produto_id, numero)
+    if foto is None:
+        return False
+    produto_foto_repo.excluir(foto.id)
+    produto_foto_repo.deslocar(produto_id, numero + 1, -1)
+    # O arquivo só é removido depois que a exclusão estiver confirmada
+    apos_confirmar(functools.partial(_remover_arquivos, produto_id, foto.arquivos))
+    return True
 
 
+@altera_fotos
 def reordenar_fotos_automatico(produto_id: int) -> bool:
     """Reordena automaticamente as fotos para não ter gaps na numeração"""
-    codigo_produto = f"{produto_id:06d}"
-    diretorio = obter_diretorio_produto(produto_id)
-
-    if not os.path.exists(diretorio):
-        return True
-
-    # Obter todas as fotos ordenadas
-    arquivos = []
-    for arquivo in os.listdir(diretorio):
-        if arquivo.startswith(codigo_produto) and arquivo.endswith('.jpg'):
-            arquivos.append(arquivo)
-
-    arquivos.sort()
-
-    # Renomear temporariamente para evitar conflitos
-    temp_files = []
-    for i, arquivo in enumerate(arquivos):
-        caminho_original = f"{diretorio}/{arquivo}"
-        caminho_temp = f"{diretorio}/temp_{i:03d}.jpg"
-        try:
-            os.rename(caminho_original, caminho_temp)
-            temp_files.append(caminho_temp)
-        except:
-            return False
-
-    # Renomear para a sequência final
-    for i, caminho_temp in enumerate(temp_files):
-        novo_numero = i + 1
-        caminho_final = f"{diretorio}/{codigo_produto}-{novo_numero:03d}.jpg"
-        try:
-            os.rename(caminho_temp, caminho_final)
-        except:
-            return False
-
+    fotos = produto_foto_repo.obter_por_produto(produto_id)
+    produto_foto_repo.alterar_ordens([(i + 1, foto.id) for i, foto in enumerate(fotos)])
     return True
 
 
+@altera_fotos
 def reordenar_fotos(produto_id: int, nova_ordem: List[int]) -> bool:
-    """Reordena as fotos conforme a nova ordem especificada"""
-    codigo_produto = f"{produto_id:06d}"
-    diretorio = obter_diretorio_produto(produto_id)
-
-    if not os.path.exists(diretorio):
-        return False
-
-    # Mapear arquivos existentes
-    arquivos_existentes = {}
-    for arquivo in os.listdir(diretorio):
-        if arquivo.startswith(codigo_produto) and arquivo.endswith('.jpg'):
-            try:
-                numero_str = arquivo.split('-')[1].split('.')[0]
-                numero = int(numero_str)
-                arquivos_existentes[numero] = arquivo
-            except:
-                continue
+    """
+    Reordena as fotos conforme a nova ordem especificada (só o manifesto
+    muda). Bloqueante: nas rotas use reordenar_fotos_async
+    """
+    fotos_por_numero = {foto.ordem: foto for foto in produto_foto_repo.obter_por_produto(produto_id)}
 
     # Validar nova ordem
-    if len(nova_ordem) != len(arquivos_existentes):
+    if len(nova_ordem) != len(fotos_por_numero) or set(nova_ordem) != set(fotos_por_numero):
         return False
 
-    # Renomear temporariamente
-    temp_files = {}
-    for i, numero_original in enumerate(nova_ordem):
-        if numero_original not in arquivos_existentes:
-            return False
+    produto_foto_repo.alterar_ordens([
+        (i + 1, fotos_por_numero[numero].id) for i, numero in enumerate(nova_ordem)])
+    return True
 
-        arquivo_original = arquivos_existentes[numero_original]
-        caminho_original = f"{diretorio}/{arquivo_original}"
-        caminho_temp = f"{diretorio}/temp_{i:03d}.jpg"
 
-        try:
-            os.rename(caminho_original, caminho_temp)
-            temp_files[i] = caminho_temp
-        except:
-            return False
+def salvar_nova_foto(produto_id: int, arquivo, como_principal: bool = False) -> bool:
+    """Salva uma nova foto do produto"""
+    versoes = processar_imagem(arquivo)
+    if versoes is None:
+        return False
+    return gravar_nova_foto(produto_id, versoes, como_principal)
 
-    # Renomear para a sequência final
-    for i in range(len(nova_ordem)):
-        novo_numero = i + 1
-        caminho_temp = temp_files[i]
-        caminho_final = f"{diretorio}/{codigo_produto}-{novo_numero:03d}.jpg"
 
-        try:
-            os.rename(caminho_temp, caminho_final)
-        except:
-            return False
+def gravar_nova_foto(produto_id: int, versoes: Dict[int, Dict[str, bytes]], como_principal: bool = False) -> bool:
+    """Grava os arquivos de uma foto já processada (processar_imagem) e a registra no manifesto"""
+    largura = max(versoes)
+    conteudo = versoes[largura]["jpg"]
+    hash = hashlib.sha256(conteudo).hexdigest()
+    nome_arquivo = f"{produto_id:06d}-{hash[:16]}.jpg"
+    foto = ProdutoFoto(0, produto_id, 0, nome_arquivo, largura, largura, len(conteudo), hash,
+                       ",".join(str(l) for l in sorted(versoes)), ",".join(FORMATOS_FOTO))
 
+    # A mesma imagem enviada de novo reaproveita os arquivos e o registro
+    existente = produto_foto_repo.obter_por_hash(produto_id, hash)
+    if existente is None:
+        diretorio = obter_diretorio_produto(produto_id)
+        for l, conteudos in versoes.items():
+            nome = nome_arquivo if l == largura else nome_derivada(nome_arquivo, l)
+            for extensao, conteudo_versao in conteudos.items():
+                gravar_arquivo(os.path.join(diretorio, nome_formato(nome, extensao)), conteudo_versao)
+    try:
+        _registrar_foto(produto_id, foto, como_principal)
+    except Exception:
+        if existente is None:
+            _remover_arquivos(produto_id, foto.arquivos)
+        raise
     return True
 
 
-def salvar_nova_foto(produto_id: int, arquivo, como_principal: bool = False) -> bool:
-    """Salva uma nova foto do produto"""
-    criar_diretorio_produto(produto_id)
-    codigo_produto = f"{produto_id:06d}"
-
+@altera_fotos
+def _registrar_foto(produto_id: int, foto: ProdutoFoto, como_principal: bool) -> None:
+    existente = produto_foto_repo.obter_por_hash(produto_id, foto.hash)
+    if existente is not None:
+        if como_principal and existente.ordem != 1:
+            # Já está na galeria: passa a ser a principal
+            produto_foto_repo.deslocar(produto_id, 1, 1)
+            produto_foto_repo.alterar_ordens([(1, existente.id)])
+            produto_foto_repo.deslocar(produto_id, existente.ordem + 2, -1)
+        return
     if como_principal:
-        # Salvar como foto principal (001)
-        numero = 1
-        # Se já existe foto principal, mover as outras
-        if obter_foto_principal(produto_id):
-            _mover_fotos_para_frente(produto_id)
+        # Salvar como foto principal, movendo as outras uma posição para frente
+        produto_foto_repo.deslocar(produto_id, 1, 1)
+        foto.ordem = 1
     else:
         # Adicionar como próxima foto
-        numero = obter_proximo_numero(produto_id)
+        foto.ordem = produto_foto_repo.obter_proxima_ordem(produto_id)
+    produto_foto_repo.inserir(foto)
+
+
+def listar_fotos_legadas() -> Dict[int, List[ProdutoFoto]]:
+    """
+    Lê do disco as fotos gravadas antes do manifesto (<código>-NNN.jpg),
+    agrupadas por produto e na ordem da numeração. Usada pelo preenchimento
+    da tabela produto_foto (preenchimento_util).
+    """
+    base_dir = os.path.dirname(obter_diretorio_produto(0))
+    if not os.path.isdir(base_dir):
+        return {}
+    fotos: Dict[int, List[ProdutoFoto]] = {}
+    for codigo in sorted(os.listdir(base_dir)):
+        if not codigo.isdigit():
+            continue
+        produto_id = int(codigo)
+        diretorio = os.path.join(base_dir, codigo)
+        arquivos = sorted(a for a in os.listdir(diretorio)
+                          if (m := PADRAO_FOTO_LEGADA.match(a)) and m.group(1) == codigo)
+        for ordem, arquivo in enumerate(arquivos, start=1):
+            caminho = os.path.join(diretorio, arquivo)
+            with open(caminho, "rb") as f:
+                conteudo = f.read()
+            try:
+                with Image.open(io.BytesIO(conteudo)) as img:
+                    largura, altura = img.size
+            except Exception as e:
+                print(f"Foto ignorada ({caminho}): {e}")
+                continue
+            fotos.setdefault(produto_id, []).append(ProdutoFoto(
+                0, produto_id, ordem, arquivo, largura, altura,
+                len(conteudo), hashlib.sha256(conteudo).hexdigest()))
+    return fotos
 
-    caminho_destino = f"{obter_diretorio_produto(produto_id)}/{codigo_produto}-{numero:03d}.jpg"
-    return processar_imagem(arquivo, caminho_destino)
 
+@altera_fotos
+def registrar_fotos_legadas(produto_id: int, fotos: List[ProdutoFoto]) -> int:
+    """
+    Acrescenta ao manifesto, depois das fotos já registradas, as fotos
+    legadas do produto (listar_fotos_legadas) que ainda não estão nele
+    """
+    registradas = {foto.arquivo for foto in produto_foto_repo.obter_por_produto(produto_id)}
+    ordem = produto_foto_repo.obter_proxima_ordem(produto_id)
+    novas = [foto for foto in fotos if foto.arquivo not in registradas]
+    for foto in novas:
+        foto.ordem = ordem
+        produto_foto_repo.inserir(foto)
+        ordem += 1
+    return len(novas)
 
-def _mover_fotos_para_frente(produto_id: int):
-    """Move todas as fotos existentes uma posição para frente"""
-    codigo_produto = f"{produto_id:06d}"
-    diretorio = obter_diretorio_produto(produto_id)
 
-    arquivos = []
-    for arquivo in os.listdir(diretorio):
-        if arquivo.startswith(codigo_produto) and arquivo.endswith('.jpg'):
-            arquivos.append(arquivo)
+def completar_versoes(foto: ProdutoFoto) -> bool:
+    """
+    Grava as versões reduzidas e os formatos que faltam a uma foto registrada
+    antes deles. A codificação acontece fora da transação, que só registra
+    o resultado; retorna False se nada pôde ser gerado.
+    """
+    larguras = foto.larguras or gerar_derivadas(foto.produto_id, foto.arquivo, foto.largura)
+    formatos = foto.formatos or (gerar_formatos(foto.produto_id, foto.arquivo, foto.largura, larguras)
+                                 if larguras else "")
+    if (larguras, formatos) == (foto.larguras, foto.formatos):
+        return False
+    _registrar_versoes(foto.produto_id, foto.id, larguras, formatos)
+    return True
 
-    # Ordenar em ordem reversa para não sobrescrever
-    arquivos.sort(reverse=True)
 
-    for arquivo in arquivos:
-        try:
-            numero_str = arquivo.split('-')[1].split('.')[0]
-            numero_atual = int(numero_str)
-            novo_numero = numero_atual + 1
+@altera_fotos
+def _registrar_versoes(produto_id: int, foto_id: int, larguras: str, formatos: str) -> None:
+    produto_foto_repo.alterar_versoes(foto_id, larguras, formatos)
 
-            caminho_atual = f"{diretorio}/{arquivo}"
-            novo_arquivo = f"{codigo_produto}-{novo_numero:03d}.jpg"
-            caminho_novo = f"{diretorio}/{novo_arquivo}"
 
-            os.rename(caminho_atual, caminho_novo)
-        except:
-            continue
\ No newline at end of file
+# Versões assíncronas para uso nas rotas, executadas fora do event loop
+obter_foto_principal_async = leitura_async(obter_foto_principal)
+obter_fotos_async = leitura_async(obter_fotos)
+excluir_foto_async = escrita_async(excluir_foto)
+reordenar_fotos_async = escrita_async(reordenar_fotos)
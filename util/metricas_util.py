@@ -0,0 +1,36 @@
+"""
+Registro central das métricas de desempenho da aplicação
+
+Cada componente (pool de conexões, consultas, caches...) registra uma
+função que devolve um dicionário com o seu estado atual. A rota
+/admin/metricas e o relatório de encerramento leem tudo por aqui.
+"""
+import json
+import os
+from typing import Callable, Optional
+
+
+# Arquivo onde o relatório é gravado no encerramento (vazio desativa)
+ARQUIVO_RELATORIO = os.getenv("METRICAS_ARQUIVO", "")
+
+_coletores: dict[str, Callable[[], object]] = {}
+
+
+def registrar_metricas(nome: str, coletor: Callable[[], object]) -> None:
+    """Registra (ou substitui) o coletor de métricas de um componente"""
+    _coletores[nome] = coletor
+
+
+def coletar_metricas() -> dict:
+    """Executa todos os coletores registrados e agrupa o resultado por nome"""
+    return {nome: coletor() for nome, coletor in _coletores.items()}
+
+
+def salvar_metricas(caminho: Optional[str] = None) -> Optional[str]:
+    """Grava as métricas atuais em JSON; retorna o caminho do arquivo gravado"""
+    caminho = caminho or ARQUIVO_RELATORIO
+    if not caminho:
+        return None
+    with open(caminho, "w", encoding="utf-8") as arquivo:
+        json.dump(coletar_metricas(), arquivo, ensure_ascii=False, indent=2, default=str)
+    return caminho
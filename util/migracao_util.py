@@ -0,0 +1,171 @@
+"""
+Migrações versionadas do esquema do banco
+
+Cada migração tem um número e uma lista de passos (comandos SQL ou funções
+que recebem a conexão). A tabela schema_version guarda a última versão
+aplicada; na inicialização, as migrações pendentes são aplicadas em ordem,
+todas em uma única transação. Com o esquema em dia, o custo é uma leitura
+de MAX(versao) pela chave primária.
+
+As migrações 4 e 8 a 10 preenchem os dados dentro da transação e ficam
+como foram publicadas. As novas só alteram o esquema, sem importar o
+código da aplicação: o que precisa dele ou dos arquivos em disco para
+preencher os dados é feito depois, fora da transação, por uma etapa de
+preenchimento_util.
+
+Para alterar o esquema, acrescente uma nova Migracao ao final de MIGRACOES;
+nunca edite uma migração que já foi aplicada em produção.
+"""
+import sqlite3
+from dataclasses import dataclass
+from typing import Callable, Union
+
+from sql import (
+    admin_sql, categoria_sql, cliente_sql, forma_pagamento_sql, lease_sql,
+    preenchimento_sql, produto_foto_sql, produto_sql, usuario_sql, versao_sql
+)
+from sql.migracao_sql import CRIAR_TABELA, INSERIR, OBTER_VERSAO_ATUAL
+from repo.produto_repo import gerar_resumo
+from util.db_util import get_connection
+from util.foto_util import gerar_derivadas, gerar_formatos, listar_fotos_legadas
+
+
+Passo = Union[str, Callable[[sqlite3.Connection], None]]
+
+
+@dataclass
+class Migracao:
+    versao: int
+    descricao: str
+    passos: tuple[Passo, ...]
+
+
+def _adicionar_categoria_produto(conn: sqlite3.Connection) -> None:
+    """Bancos anteriores à categoria de produto não têm a coluna categoria_id"""
+    colunas = [col[1] for col in conn.execute("PRAGMA table_info(produto)")]
+    if "categoria_id" not in colunas:
+        conn.execute(produto_sql.ALTERAR_TABELA_ADD_CATEGORIA)
+
+
+def _preencher_resumo_produto(conn: sqlite3.Connection) -> None:
+    """Calcula o resumo dos produtos gravados antes da coluna existir"""
+    produtos = conn.execute(produto_sql.SELECIONAR_SEM_RESUMO).fetchall()
+    conn.executemany(produto_sql.ATUALIZAR_RESUMO, [
+        (gerar_resumo(descricao), id) for id, descricao in produtos])
+
+
+def _preencher_produto_foto(conn: sqlite3.Connection) -> None:
+    """Registra no manifesto as fotos gravadas em disco antes da tabela existir"""
+    ids = {id for (id,) in conn.execute(produto_sql.SELECIONAR_IDS)}
+    conn.executemany(produto_foto_sql.INSERIR_LEGADA, [
+        (f.produto_id, f.ordem, f.arquivo, f.largura, f.altura, f.tamanho, f.hash)
+        for produto_id, fotos in listar_fotos_legadas().items() if produto_id in ids
+        for f in fotos])
+
+
+def _gerar_versoes_fotos(conn: sqlite3.Connection) -> None:
+    """Grava as versões reduzidas das fotos registradas antes da coluna larguras"""
+    fotos = conn.execute(produto_foto_sql.SELECIONAR_SEM_LARGURAS).fetchall()
+    conn.executemany(produto_foto_sql.ALTERAR_LARGURAS, [
+        (gerar_derivadas(produto_id, arquivo, largura), id)
+        for id, produto_id, arquivo, largura in fotos])
+
+
+def _gerar_formatos_fotos(conn: sqlite3.Connection) -> None:
+    """Grava as fotos registradas antes da coluna formatos também em WebP/AVIF"""
+    fotos = conn.execute(produto_foto_sql.SELECIONAR_SEM_FORMATOS).fetchall()
+    conn.executemany(produto_foto_sql.ALTERAR_FORMATOS, [
+        (gerar_formatos(produto_id, arquivo, largura, larguras), id)
+        for id, produto_id, arquivo, largura, larguras in fotos])
+
+
+MIGRACOES: list[Migracao] = [
+    Migracao(1, "Tabelas iniciais", (
+        usuario_sql.CRIAR_TABELA,
+        admin_sql.CRIAR_TABELA,
+        cliente_sql.CRIAR_TABELA,
+        categoria_sql.CRIAR_TABELA,
+        produto_sql.CRIAR_TABELA,
+        forma_pagamento_sql.CRIAR_TABELA,
+    )),
+    Migracao(2, "Coluna categoria_id em bancos antigos de produto", (
+        _adicionar_categoria_produto,
+    )),
+    Migracao(3, "Índices das consultas de listagem e busca", (
+        *usuario_sql.INDICES,
+        *categoria_sql.INDICES,
+        *produto_sql.INDICES,
+        *forma_pagamento_sql.INDICES,
+    )),
+    Migracao(4, "Resumo da descrição para a listagem de produtos", (
+        produto_sql.ALTERAR_TABELA_ADD_RESUMO,
+        _preencher_resumo_produto,
+    )),
+    Migracao(5, "Versões compartilhadas dos caches entre workers", (
+        versao_sql.CRIAR_TABELA,
+    )),
+    Migracao(6, "Data de atualização dos produtos", (
+        produto_sql.ALTERAR_TABELA_ADD_ATUALIZADO_EM,
+        produto_sql.PREENCHER_ATUALIZADO_EM,
+    )),
+    Migracao(7, "Leases de reconstrução dos caches entre workers", (
+        lease_sql.CRIAR_TABELA,
+    )),
+    Migracao(8, "Manifesto das fotos de produto", (
+        produto_foto_sql.CRIAR_TABELA,
+        *produto_foto_sql.INDICES,
+        _preencher_produto_foto,
+    )),
+    Migracao(9, "Versões reduzidas das fotos de produto", (
+        produto_foto_sql.ALTERAR_TABELA_ADD_LARGURAS,
+        _gerar_versoes_fotos,
+    )),
+    Migracao(10, "Fotos de produto em WebP e AVIF", (
+        produto_foto_sql.ALTERAR_TABELA_ADD_FORMATOS,
+        _gerar_formatos_fotos,
+    )),
+    Migracao(11, "Etapas de preenchimento de dados concluídas", (
+        preenchimento_sql.CRIAR_TABELA,
+    )),
+]
+
+
+def _obter_versao_atual(conn: sqlite3.Connection) -> int:
+    try:
+        return conn.execute(OBTER_VERSAO_ATUAL).fetchone()[0] or 0
+    except sqlite3.OperationalError:
+        # Banco novo ou anterior ao controle de versões
+        return 0
+
+
+def aplicar_migracoes() -> int:
+    """
+    Aplica as migrações pendentes e retorna a versão final do esquema.
+
+    A transação é aberta com BEGIN IMMEDIATE para que, com vários workers
+    subindo ao mesmo tempo, apenas um aplique as migrações; os demais
+    esperam o lock e, ao reler a versão, não encontram nada pendente.
+    """
+    ultima = MIGRACOES[-1].versao
+    with get_connection() as conn:
+        if _obter_versao_atual(conn) >= ultima:
+            return ultima
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(CRIAR_TABELA)
+            versao = _obter_versao_atual(conn)
+            for migracao in MIGRACOES:
+                if migracao.versao <= versao:
+                    continue
+                for passo in migracao.passos:
+                    if callable(passo):
+                        passo(conn)
+                    else:
+                        conn.execute(passo)
+                conn.execute(INSERIR, (migracao.versao, migracao.descricao))
+                print(f"Migração {migracao.versao} aplicada: {migracao.descricao}")
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+    return ultima
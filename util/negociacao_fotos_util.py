@@ -0,0 +1,96 @@
+"""
+Negociação do formato das fotos de produto pelo cabeçalho Accept
+
+As páginas sempre referenciam o JPEG (<arquivo>.jpg). Ao servir a foto,
+FotosNegociadas procura, ao lado dele, as variantes nos formatos que o
+navegador declarou aceitar no Accept (image/avif, image/webp) e entrega a
+menor delas, com Vary: Accept para que caches intermediários guardem uma
+cópia por formato. Curingas (image/*, */*) não contam como suporte, pois
+navegadores sem WebP também os enviam. Fotos sem variantes (ou pedidos sem
+esses tipos) recebem o próprio JPEG.
+"""
+import os
+import stat
+import threading
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+from util.metricas_util import registrar_metricas
+
+
+# Extensão -> tipo MIME dos formatos que podem substituir o JPEG
+TIPOS_ALTERNATIVOS = {"avif": "image/avif", "webp": "image/webp"}
+TIPO_JPEG = "image/jpeg"
+
+_lock = threading.Lock()
+_servidos: dict[str, dict[str, int]] = {}
+
+
+def tipos_aceitos(accept: str) -> set[str]:
+    """Tipos MIME listados no Accept com q maior que zero"""
+    tipos = set()
+    for item in accept.split(","):
+        tipo, *parametros = [parte.strip() for parte in item.split(";")]
+        q = 1.0
+        for parametro in parametros:
+            nome, _, valor = parametro.partition("=")
+            if nome.strip() == "q":
+                try:
+                    q = float(valor)
+                except ValueError:
+                    q = 0.0
+        if tipo and q > 0:
+            tipos.add(tipo.lower())
+    return tipos
+
+
+def _contar(extensao: str, tamanho: int) -> None:
+    with _lock:
+        contagem = _servidos.setdefault(extensao, {"respostas": 0, "bytes": 0})
+        contagem["respostas"] += 1
+        contagem["bytes"] += tamanho
+
+
+def obter_metricas_negociacao() -> dict:
+    with _lock:
+        return {extensao: dict(contagem) for extensao, contagem in _servidos.items()}
+
+
+class FotosNegociadas(StaticFiles):
+    """StaticFiles das fotos de produto que escolhe o formato pelo Accept"""
+
+    def _menor_variante(self, path: str, extensoes: list[str]) -> tuple:
+        """(caminho, stat, extensão) do menor arquivo entre o JPEG e as variantes existentes"""
+        escolhido = (None, None, "jpg")
+        base = path[:-len(".jpg")]
+        for extensao in ["jpg"] + extensoes:
+            caminho, resultado = self.lookup_path(f"{base}.{extensao}")
+            if resultado is None or not stat.S_ISREG(resultado.st_mode):
+                continue
+            if escolhido[1] is None or resultado.st_size < escolhido[1].st_size:
+                escolhido = (caminho, resultado, extensao)
+        return escolhido
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if scope["method"] not in ("GET", "HEAD") or not path.endswith(".jpg"):
+            return await super().get_response(path, scope)
+        cabecalhos = Headers(scope=scope)
+        aceitos = tipos_aceitos(cabecalhos.get("accept", ""))
+        extensoes = [extensao for extensao, tipo in TIPOS_ALTERNATIVOS.items() if tipo in aceitos]
+        caminho, resultado, extensao = await anyio.to_thread.run_sync(self._menor_variante, path, extensoes)
+        if resultado is None:
+            return await super().get_response(path, scope)
+        response = FileResponse(caminho, stat_result=resultado,
+                                media_type=TIPOS_ALTERNATIVOS.get(extensao, TIPO_JPEG))
+        response.headers["Vary"] = "Accept"
+        if self.is_not_modified(response.headers, cabecalhos):
+            return NotModifiedResponse(response.headers)
+        _contar(extensao, resultado.st_size)
+        return response
+
+
+registrar_metricas("fotos_negociadas", obter_metricas_negociacao)
@@ -0,0 +1,72 @@
+"""
+Paginação por cursor (keyset) para as listagens
+
+Em vez de OFFSET, cada página é buscada a partir da chave de ordenação do
+último item visto, por exemplo `WHERE (nome, id) > (?, ?) LIMIT ?`. Assim o
+custo de qualquer página é o mesmo, independentemente do tamanho da tabela.
+O cursor trafega na URL como um token opaco (JSON em base64).
+"""
+import base64
+import json
+from typing import Any, Callable, Optional, Sequence, TypeVar
+
+from model.pagina_model import Pagina
+
+
+T = TypeVar("T")
+
+# Chave inicial: vem antes de qualquer (nome, id) válido
+CHAVE_INICIAL = ("", 0)
+
+
+def codificar_cursor(chave: Sequence[Any]) -> str:
+    """Converte uma chave de ordenação em token seguro para URL"""
+    dados = json.dumps(list(chave), separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(dados).decode("ascii").rstrip("=")
+
+
+def decodificar_cursor(token: Optional[str]) -> Optional[tuple]:
+    """Converte o token de volta na chave; tokens inválidos são ignorados"""
+    if not token:
+        return None
+    try:
+        preenchimento = "=" * (-len(token) % 4)
+        chave = json.loads(base64.urlsafe_b64decode(token + preenchimento))
+        if isinstance(chave, list) and len(chave) == 2 and isinstance(chave[1], int):
+            return (str(chave[0]), chave[1])
+    except (ValueError, TypeError):
+        pass
+    return None
+
+
+def montar_pagina(
+    itens: list[T],
+    limite: int,
+    chave: Callable[[T], Sequence[Any]],
+    apos: Optional[tuple] = None,
+    antes: Optional[tuple] = None
+) -> Pagina[T]:
+    """
+    Monta a página a partir de uma consulta que buscou `limite + 1` linhas.
+
+    A linha excedente indica que existe outra página na direção consultada.
+    Quando a navegação é para trás (`antes`), os itens chegam em ordem
+    inversa e são reordenados aqui.
+
+    Args:
+        itens: Linhas retornadas pela consulta (até limite + 1)
+        limite: Tamanho da página
+        chave: Função que extrai a chave de ordenação (nome, id) de um item
+        apos: Cursor usado para avançar, se houver
+        antes: Cursor usado para voltar, se houver
+    """
+    ha_mais = len(itens) > limite
+    itens = itens[:limite]
+    if antes is not None:
+        itens.reverse()
+        anterior = codificar_cursor(chave(itens[0])) if ha_mais and itens else None
+        proximo = codificar_cursor(chave(itens[-1])) if itens else None
+    else:
+        anterior = codificar_cursor(chave(itens[0])) if apos is not None and itens else None
+        proximo = codificar_cursor(chave(itens[-1])) if ha_mais else None
+    return Pagina(itens=itens, anterior=anterior, proximo=proximo)
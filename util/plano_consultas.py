@@ -0,0 +1,77 @@
+"""
+Verificação dos planos de execução das consultas de leitura
+
+Roda EXPLAIN QUERY PLAN em todas as constantes OBTER* de sql/*.py contra um
+banco criado do zero e aponta as consultas que caem em varredura completa
+de tabela (SCAN sem índice) ou que precisam ordenar em uma B-tree temporária.
+Varreduras ordenadas por índice (SCAN ... USING INDEX) são aceitas, pois
+são o caminho esperado das listagens completas.
+
+Uso:
+    python -m util.plano_consultas
+"""
+import importlib
+import os
+import pkgutil
+import re
+import sqlite3
+import sys
+import tempfile
+from typing import Iterator
+
+
+PADRAO_SCAN = re.compile(r"^SCAN (\w+)$")
+PADRAO_TEMP = re.compile(r"USE TEMP B-TREE")
+
+
+def listar_consultas() -> Iterator[tuple[str, str]]:
+    """Retorna (nome qualificado, sql) de cada consulta OBTER* em sql/*.py"""
+    import sql
+    for modulo_info in pkgutil.iter_modules(sql.__path__):
+        modulo = importlib.import_module(f"sql.{modulo_info.name}")
+        for nome, valor in vars(modulo).items():
+            if nome.startswith("OBTER") and isinstance(valor, str):
+                yield f"{modulo_info.name}.{nome}", valor
+
+
+def criar_esquema(caminho: str) -> None:
+    """Cria todas as tabelas e índices da aplicação no banco indicado"""
+    from util import db_util
+    from util.migracao_util import aplicar_migracoes
+    db_util.configurar_banco(caminho)
+    aplicar_migracoes()
+    db_util.fechar_pool()
+
+
+def verificar_planos(conn: sqlite3.Connection) -> list[tuple[str, list[str]]]:
+    """
+    Retorna a lista de consultas com plano ruim e os passos problemáticos.
+
+    Os parâmetros das consultas são preenchidos com NULL, o que não altera
+    a escolha de índices pelo planejador.
+    """
+    falhas = []
+    for nome, consulta in listar_consultas():
+        parametros = (None,) * consulta.count("?")
+        passos = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {consulta}", parametros)]
+        ruins = [p for p in passos if PADRAO_SCAN.match(p) or PADRAO_TEMP.search(p)]
+        if ruins:
+            falhas.append((nome, ruins))
+    return falhas
+
+
+def main() -> int:
+    caminho = os.path.join(tempfile.mkdtemp(), "plano.db")
+    criar_esquema(caminho)
+    conn = sqlite3.connect(caminho)
+    falhas = verificar_planos(conn)
+    conn.close()
+    for nome, passos in falhas:
+        print(f"FALHA {nome}: {'; '.join(passos)}")
+    total = sum(1 for _ in listar_consultas())
+    print(f"{total - len(falhas)}/{total} consultas usam índices")
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""
+Preenchimento dos dados que as migrações não calculam
+
+As migrações novas (migracao_util) só alteram o esquema, com SQL, dentro
+da transação BEGIN IMMEDIATE. O que depende do código da aplicação ou dos
+arquivos em disco fica para as etapas deste módulo, executadas depois das
+migrações, fora daquela transação e em uma thread própria:
+
+- resumos: resumo da descrição dos produtos gravados antes da coluna;
+- fotos_legadas: registro no manifesto produto_foto das fotos gravadas em
+  disco antes da tabela (<código>-NNN.jpg);
+- versoes_fotos: versões reduzidas e formatos WebP/AVIF das fotos
+  registradas antes deles.
+
+Cada etapa procura só o que ainda falta, e cada produto ou foto é gravado
+em uma transação curta própria (a codificação das imagens fica fora dela),
+junto com a versão do catálogo; interrompida, a etapa recomeça de onde
+parou. A tabela preenchimento guarda as etapas concluídas, e a lease
+"preenchimento" faz com que, com vários workers subindo juntos, só um
+deles execute.
+
+Uso avulso (executa as etapas pendentes e sai):
+    python -m util.preenchimento_util
+"""
+import os
+import threading
+import uuid
+from typing import Callable, Optional
+
+from repo import lease_repo, preenchimento_repo, produto_foto_repo, produto_repo
+from util.foto_util import completar_versoes, listar_fotos_legadas, registrar_fotos_legadas
+
+
+CHAVE_LEASE = "preenchimento"
+# Tempo da lease; se o dono cair, outro worker assume na próxima inicialização
+DURACAO_LEASE = float(os.getenv("PREENCHIMENTO_LEASE", "3600"))
+DONO = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+_parar = threading.Event()
+_thread: Optional[threading.Thread] = None
+
+
+def _preencher_resumos() -> int:
+    return produto_repo.preencher_resumos()
+
+
+def _registrar_fotos_legadas() -> int:
+    registradas = 0
+    for produto_id, fotos in listar_fotos_legadas().items():
+        if _parar.is_set():
+            break
+        if produto_repo.obter_por_id(produto_id) is None:
+            continue
+        registradas += registrar_fotos_legadas(produto_id, fotos)
+    return registradas
+
+
+def _completar_versoes_fotos() -> int:
+    completadas = 0
+    for foto in produto_foto_repo.obter_incompletas():
+        if _parar.is_set():
+            break
+        completadas += completar_versoes(foto)
+    return completadas
+
+
+# Em ordem: as fotos legadas registradas entram sem versões e são
+# completadas pela etapa seguinte
+ETAPAS: list[tuple[str, Callable[[], int]]] = [
+    ("resumos", _preencher_resumos),
+    ("fotos_legadas", _registrar_fotos_legadas),
+    ("versoes_fotos", _completar_versoes_fotos),
+]
+
+
+def preencher() -> dict[str, int]:
+    """
+    Executa as etapas pendentes e retorna quantos registros cada uma
+    alterou. Não faz nada se outro worker estiver preenchendo.
+    """
+    if not lease_repo.adquirir(CHAVE_LEASE, DONO, DURACAO_LEASE):
+        return {}
+    alterados = {}
+    try:
+        concluidas = preenchimento_repo.obter_concluidas()
+        for etapa, funcao in ETAPAS:
+            if etapa in concluidas:
+                continue
+            alterados[etapa] = funcao()
+            if _parar.is_set():
+                break
+            preenchimento_repo.inserir(etapa)
+            if alterados[etapa]:
+                print(f"Preenchimento {etapa}: {alterados[etapa]} registros")
+    finally:
+        lease_repo.liberar(CHAVE_LEASE, DONO)
+    return alterados
+
+
+def _executar() -> None:
+    try:
+        preencher()
+    except Exception as e:
+        print(f"Erro no preenchimento de dados: {e}")
+
+
+def iniciar_preenchimento() -> None:
+    """Executa as etapas pendentes em segundo plano (inicialização)"""
+    global _thread
+    if _thread is not None:
+        return
+    _parar.clear()
+    _thread = threading.Thread(target=_executar, name="preenchimento", daemon=True)
+    _thread.start()
+
+
+def parar_preenchimento() -> None:
+    """Interrompe o preenchimento entre um registro e outro; o restante fica para a próxima inicialização"""
+    global _thread
+    if _thread is None:
+        return
+    _parar.set()
+    _thread.join()
+    _thread = None
+
+
+if __name__ == "__main__":
+    from util.migracao_util import aplicar_migracoes
+    aplicar_migracoes()
+    print(preencher())
@@ -0,0 +1,204 @@
+"""
+Processamento das fotos enviadas fora do event loop
+
+Decodificar, cortar, reduzir e codificar uma foto (foto_util.processar_imagem)
+leva centenas de milissegundos de CPU para uma imagem de 12 MP. Feito dentro
+de uma rota async, isso congela todas as requisições do worker; em threads,
+o GIL ainda divide a CPU com o event loop. Por isso o processamento vai para
+um ProcessPoolExecutor próprio, com IMAGEM_PROCESSOS processos.
+
+A fila é limitada: com IMAGEM_FILA_MAXIMA imagens em processamento ou
+aguardando neste worker, um novo pedido levanta SobrecargaError na hora, e
+a rota responde 503 com Retry-After em vez de acumular uploads na memória.
+A vaga na fila é reservada antes de ler o arquivo enviado, e a leitura é
+limitada a IMAGEM_TAMANHO_MAXIMO bytes.
+
+Só o processamento vai para os processos. A gravação dos arquivos e do
+manifesto (foto_util.gravar_nova_foto) continua na thread escritora do
+banco (db_util.executar_async).
+"""
+import asyncio
+import contextlib
+import io
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterator, Optional
+
+from fastapi import UploadFile, status
+from fastapi.responses import PlainTextResponse
+
+from util.db_util import executar_async
+from util.exceptions import SobrecargaError
+from util.foto_util import gravar_nova_foto, processar_imagem
+from util.metricas_util import registrar_metricas
+
+
+PROCESSOS_IMAGEM = max(1, int(os.getenv("IMAGEM_PROCESSOS", str(min(2, os.cpu_count() or 1)))))
+# Imagens em processamento ou na fila, por worker, antes de recusar com 503
+FILA_MAXIMA_IMAGEM = int(os.getenv("IMAGEM_FILA_MAXIMA", "8"))
+# Segundos sugeridos ao cliente no Retry-After
+REPETIR_APOS_IMAGEM = int(os.getenv("IMAGEM_REPETIR_APOS", "5"))
+# Maior arquivo aceito no upload; acima disso a imagem é tratada como inválida
+TAMANHO_MAXIMO_IMAGEM = int(os.getenv("IMAGEM_TAMANHO_MAXIMO", str(20 * 2**20)))
+
+Versoes = Dict[int, Dict[str, bytes]]
+
+
+def _processar(conteudo: bytes) -> Optional[Versoes]:
+    """Executada nos processos do pool"""
+    return processar_imagem(io.BytesIO(conteudo))
+
+
+def _aquecer() -> int:
+    return os.getpid()
+
+
+class ProcessadorImagens:
+    """Pool de processos com fila limitada para o processamento das fotos"""
+
+    def __init__(self, processos: int, fila_maxima: int, repetir_apos: int):
+        self.processos = processos
+        self.fila_maxima = fila_maxima
+        self.repetir_apos = repetir_apos
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pendentes = 0
+        # Métricas
+        self.processadas = 0
+        self.recusadas = 0
+        self.falhas = 0
+        self.recriacoes = 0
+        self.maximo_pendentes = 0
+        self.tempo_total = 0.0
+
+    def _obter_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Pool criado depois da inicialização (sem iniciar() ou após um
+            # processo morrer): o processo já tem as threads do banco e dos
+            # monitores, e um fork herdaria os locks que elas estiverem
+            # segurando. Por isso ele é sempre criado com spawn
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.processos, mp_context=multiprocessing.get_context("spawn"))
+            self.recriacoes += 1
+        return self._executor
+
+    def iniciar(self) -> None:
+        """Cria os processos antes do primeiro upload e das demais threads (inicialização)"""
+        if self._executor is None:
+            # Contexto padrão da plataforma: fork no Linux, spawn no Windows
+            # e no macOS. Com fork, os processos precisam ser criados aqui,
+            # antes das outras threads. Com spawn, cada processo importa
+            # este módulo e o módulo principal do processo (com
+            # `uvicorn main:app`, o do uvicorn, e não o main.py)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.processos, mp_context=multiprocessing.get_context())
+        for _ in range(self.processos):
+            self._executor.submit(_aquecer)
+
+    @contextlib.contextmanager
+    def reservar(self) -> Iterator[None]:
+        """
+        Reserva uma vaga na fila durante o bloco `with`. Levanta
+        SobrecargaError se a fila deste worker estiver cheia.
+        """
+        if self._pendentes >= self.fila_maxima:
+            self.recusadas += 1
+            raise SobrecargaError("Processamento de imagens sobrecarregado", self.repetir_apos)
+        self._pendentes += 1
+        self.maximo_pendentes = max(self.maximo_pendentes, self._pendentes)
+        try:
+            yield
+        finally:
+            self._pendentes -= 1
+
+    async def processar(self, conteudo: bytes) -> Optional[Versoes]:
+        """
+        Processa a imagem em um dos processos do pool e devolve as versões
+        (ver foto_util.processar_imagem), ou None se a imagem for inválida.
+        Levanta SobrecargaError se a fila deste worker estiver cheia.
+        """
+        with self.reservar():
+            return await self.executar(conteudo)
+
+    async def executar(self, conteudo: bytes) -> Optional[Versoes]:
+        """Como processar(), para quem já reservou a vaga (reservar())"""
+        inicio = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            versoes = await loop.run_in_executor(self._obter_executor(), _processar, conteudo)
+        except BrokenProcessPool:
+            # Um processo morreu (ex.: falta de memória); o pool não se
+            # recupera sozinho, então o próximo pedido cria outro (spawn)
+            self.falhas += 1
+            self._executor = None
+            raise
+        except Exception:
+            self.falhas += 1
+            raise
+        # Só as imagens processadas entram no tempo médio; inválidas são falhas
+        if versoes is None:
+            self.falhas += 1
+        else:
+            self.processadas += 1
+            self.tempo_total += time.perf_counter() - inicio
+        return versoes
+
+    def encerrar(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def metricas(self) -> dict:
+        return {
+            "processos": self.processos,
+            "fila_maxima": self.fila_maxima,
+            "pendentes": self._pendentes,
+            "maximo_pendentes": self.maximo_pendentes,
+            "processadas": self.processadas,
+            "recusadas": self.recusadas,
+            "falhas": self.falhas,
+            "recriacoes": self.recriacoes,
+            "tempo_medio_ms": self.tempo_total / self.processadas * 1000 if self.processadas else None,
+        }
+
+
+processador_imagens = ProcessadorImagens(PROCESSOS_IMAGEM, FILA_MAXIMA_IMAGEM, REPETIR_APOS_IMAGEM)
+
+
+async def processar_upload(arquivo: UploadFile) -> Optional[Versoes]:
+    """
+    Lê o arquivo enviado e o processa no pool; None se a imagem for
+    inválida ou maior que TAMANHO_MAXIMO_IMAGEM. A vaga é reservada antes
+    da leitura, então um pedido recusado não chega a carregar o arquivo.
+    """
+    with processador_imagens.reservar():
+        conteudo = await arquivo.read(TAMANHO_MAXIMO_IMAGEM + 1)
+        if len(conteudo) > TAMANHO_MAXIMO_IMAGEM:
+            processador_imagens.falhas += 1
+            return None
+        return await processador_imagens.executar(conteudo)
+
+
+async def gravar_nova_foto_async(produto_id: int, versoes: Versoes, como_principal: bool = False) -> bool:
+    """Grava a foto processada na thread escritora do banco"""
+    return await executar_async("escrita", gravar_nova_foto, produto_id, versoes, como_principal)
+
+
+def resposta_sobrecarga(erro: SobrecargaError) -> PlainTextResponse:
+    """503 com Retry-After para o cliente reenviar o upload mais tarde"""
+    return PlainTextResponse(
+        erro.mensagem, status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": str(erro.repetir_apos)})
+
+
+def iniciar_processamento_imagem() -> None:
+    processador_imagens.iniciar()
+
+
+def encerrar_processamento_imagem() -> None:
+    processador_imagens.encerrar()
+
+
+registrar_metricas("processamento_imagem", processador_imagens.metricas)
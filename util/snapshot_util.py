@@ -0,0 +1,304 @@
+"""
+Snapshot do catálogo publicado na escrita
+
+Depois de cada escrita do catálogo (produto, categoria ou foto, ver
+versao_util.altera_catalogo), o worker que escreveu publica um arquivo
+com a projeção da listagem de todos os produtos, já com a URL da foto
+principal resolvida. O arquivo é gravado em um temporário e renomeado
+(os.replace), então nunca é visto pela metade.
+
+A publicação relê o catálogo inteiro, então não é feita no commit: a
+escrita só a agenda, e uma thread própria (PublicadorSnapshot) publica
+quando as escritas param por ESPERA_PUBLICACAO segundos, ou no máximo
+ESPERA_MAXIMA_PUBLICACAO depois da primeira. Uma edição em lote gera uma
+única publicação, com a versão mais recente.
+
+Cada arquivo leva a versão compartilhada do catálogo no nome
+(catalogo-<versao>.json). Os workers mapeiam em memória (mmap) o arquivo
+da versão que conhecem, de modo que a vitrine é montada sem consultar o
+SQLite nem verificar as fotos no disco. Enquanto o arquivo da versão atual
+não existir, obter_pagina() devolve None e a rota consulta o banco.
+
+Formato (JSON por linha): cabeçalho com a versão, o total e a posição do
+índice; uma linha por produto, na ordem (nome, id) das páginas; e por
+último o índice [[nome, id, início], ...], usado na busca binária.
+"""
+import bisect
+import json
+import mmap
+import os
+import tempfile
+import threading
+import time
+from typing import Optional
+
+from model.pagina_model import Pagina
+from model.produto_resumo_model import ProdutoResumo
+from repo import produto_repo, versao_repo
+from util import db_util
+from util.metricas_util import registrar_metricas
+from util.paginacao_util import CHAVE_INICIAL, montar_pagina
+from util.versao_util import DOMINIO_CATALOGO, ao_alterar_catalogo, obter_versao_compartilhada
+
+
+# Diretório dos snapshots; vazio usa "catalogo_snapshot" ao lado do banco
+DIRETORIO_SNAPSHOT = os.getenv("CATALOGO_SNAPSHOT_DIR", "")
+# Quantos snapshots anteriores manter para workers que ainda não viram a versão nova
+SNAPSHOTS_MANTIDOS = 2
+# Intervalo mínimo (em segundos) entre tentativas de abrir um snapshot ausente
+INTERVALO_NOVA_TENTATIVA = 0.5
+TAMANHO_CABECALHO = 128
+# Escritas com menos de ESPERA_PUBLICACAO segundos entre si geram uma só publicação
+ESPERA_PUBLICACAO = float(os.getenv("CATALOGO_SNAPSHOT_ESPERA", "0.2"))
+# Atraso máximo da publicação quando as escritas não param
+ESPERA_MAXIMA_PUBLICACAO = float(os.getenv("CATALOGO_SNAPSHOT_ESPERA_MAXIMA", "2.0"))
+
+_lock = threading.Lock()
+_publicacoes = 0
+_leituras = 0
+_faltas = 0
+
+
+def obter_diretorio() -> str:
+    if DIRETORIO_SNAPSHOT:
+        return DIRETORIO_SNAPSHOT
+    return os.path.join(os.path.dirname(os.path.abspath(db_util.CAMINHO_BANCO)), "catalogo_snapshot")
+
+
+def caminho_snapshot(versao: int) -> str:
+    return os.path.join(obter_diretorio(), f"catalogo-{versao}.json")
+
+
+def _linha(valor: object) -> bytes:
+    return json.dumps(valor, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def publicar_snapshot() -> int:
+    """Grava o snapshot da versão atual do catálogo; retorna a versão publicada"""
+    global _publicacoes
+    # Versão e produtos lidos na mesma transação, para que o arquivo de
+    # uma versão nunca contenha dados de outra
+    with db_util.transacao() as conn:
+        conn.execute("BEGIN")
+        versao = versao_repo.obter_todas().get(DOMINIO_CATALOGO, 0)
+        produtos = produto_repo.obter_catalogo()
+
+    # As linhas dos produtos começam logo após o cabeçalho, que tem
+    # tamanho fixo para que as posições sejam conhecidas de antemão
+    linhas = []
+    indice = []
+    posicao = TAMANHO_CABECALHO
+    for p in produtos:
+        linha = _linha([p.id, p.nome, p.preco, p.quantidade, p.categoria_id, p.categoria_nome,
+                        p.resumo, p.atualizado_em, p.foto_principal, p.foto_larguras])
+        indice.append([p.nome, p.id, posicao])
+        linhas.append(linha)
+        posicao += len(linha)
+    cabecalho = json.dumps({"versao": versao, "total": len(produtos), "indice": posicao})
+    cabecalho_bytes = cabecalho.encode("utf-8").ljust(TAMANHO_CABECALHO - 1) + b"\n"
+
+    diretorio = obter_diretorio()
+    os.makedirs(diretorio, exist_ok=True)
+    descritor, temporario = tempfile.mkstemp(prefix=".catalogo-", dir=diretorio)
+    try:
+        with os.fdopen(descritor, "wb") as arquivo:
+            arquivo.write(cabecalho_bytes)
+            arquivo.writelines(linhas)
+            arquivo.write(_linha(indice))
+        os.replace(temporario, caminho_snapshot(versao))
+    except BaseException:
+        os.unlink(temporario)
+        raise
+    _remover_antigos(versao)
+    with _lock:
+        _publicacoes += 1
+    return versao
+
+
+def _remover_antigos(versao: int) -> None:
+    diretorio = obter_diretorio()
+    for nome in os.listdir(diretorio):
+        if not (nome.startswith("catalogo-") and nome.endswith(".json")):
+            continue
+        try:
+            versao_arquivo = int(nome[len("catalogo-"):-len(".json")])
+        except ValueError:
+            continue
+        if versao_arquivo <= versao - SNAPSHOTS_MANTIDOS:
+            # No Windows um arquivo ainda mapeado por outro worker não pode
+            # ser removido (PermissionError); ele fica para a próxima publicação
+            try:
+                os.unlink(os.path.join(diretorio, nome))
+            except OSError:
+                pass
+
+
+class PublicadorSnapshot:
+    """Thread que publica o snapshot agrupando as escritas próximas"""
+
+    def __init__(self, espera: float, espera_maxima: float):
+        self.espera = espera
+        self.espera_maxima = espera_maxima
+        self.agendamentos = 0
+        self._condicao = threading.Condition()
+        # Primeira e última escrita ainda não publicadas
+        self._pendente_desde: Optional[float] = None
+        self._ultima: float = 0.0
+        self._parar = False
+        self._thread: Optional[threading.Thread] = None
+
+    def agendar(self) -> None:
+        """Chamada após o commit de cada escrita do catálogo; não bloqueia"""
+        with self._condicao:
+            agora = time.monotonic()
+            if self._pendente_desde is None:
+                self._pendente_desde = agora
+            self._ultima = agora
+            self.agendamentos += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._executar, name="snapshot-catalogo", daemon=True)
+                self._thread.start()
+            self._condicao.notify()
+
+    def _aguardar(self) -> bool:
+        """Espera o momento da próxima publicação; False se for para parar"""
+        with self._condicao:
+            while not self._parar:
+                if self._pendente_desde is None:
+                    self._condicao.wait()
+                    continue
+                prazo = min(self._ultima + self.espera, self._pendente_desde + self.espera_maxima)
+                restante = prazo - time.monotonic()
+                if restante <= 0:
+                    # Escritas que chegarem durante a publicação agendam a próxima
+                    self._pendente_desde = None
+                    return True
+                self._condicao.wait(restante)
+            return False
+
+    def _executar(self) -> None:
+        while self._aguardar():
+            try:
+                publicar_snapshot()
+            except Exception as e:
+                print(f"Erro ao publicar o snapshot do catálogo: {e}")
+
+    def parar(self) -> None:
+        """Encerra a thread e publica o que estiver pendente (encerramento)"""
+        with self._condicao:
+            self._parar = True
+            self._condicao.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join()
+        with self._condicao:
+            pendente = self._pendente_desde is not None
+            self._pendente_desde = None
+            self._parar = False
+            self._thread = None
+        if pendente:
+            publicar_snapshot()
+
+
+publicador_snapshot = PublicadorSnapshot(ESPERA_PUBLICACAO, ESPERA_MAXIMA_PUBLICACAO)
+
+
+class SnapshotCatalogo:
+    """Snapshot mapeado em memória; só o índice é decodificado na abertura"""
+
+    def __init__(self, caminho: str):
+        with open(caminho, "rb") as arquivo:
+            self._mm = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        cabecalho = json.loads(self._mm.readline())
+        self.versao: int = cabecalho["versao"]
+        self.total: int = cabecalho["total"]
+        self._fim_produtos: int = cabecalho["indice"]
+        indice = json.loads(self._mm[self._fim_produtos:])
+        self._chaves = [(nome, id) for nome, id, _ in indice]
+        self._inicios = [inicio for _, _, inicio in indice]
+
+    def _produto(self, posicao: int) -> ProdutoResumo:
+        inicio = self._inicios[posicao]
+        fim = self._inicios[posicao + 1] if posicao + 1 < self.total else self._fim_produtos
+        return ProdutoResumo(*json.loads(self._mm[inicio:fim]))
+
+    def pagina(self, limite: int, apos: Optional[tuple] = None,
+               antes: Optional[tuple] = None) -> Pagina[ProdutoResumo]:
+        """Mesmo resultado de produto_repo.obter_pagina, lido do snapshot"""
+        if antes is not None:
+            fim = bisect.bisect_left(self._chaves, tuple(antes))
+            posicoes = range(fim - 1, max(0, fim - limite - 1) - 1, -1)
+        else:
+            inicio = bisect.bisect_right(self._chaves, tuple(apos or CHAVE_INICIAL))
+            posicoes = range(inicio, min(self.total, inicio + limite + 1))
+        produtos = [self._produto(posicao) for posicao in posicoes]
+        return montar_pagina(produtos, limite, lambda p: (p.nome, p.id), apos, antes)
+
+
+_atual: Optional[SnapshotCatalogo] = None
+# Versão ausente e quando ela foi procurada pela última vez
+_ausente: tuple[int, float] = (-1, 0.0)
+
+
+def obter_snapshot() -> Optional[SnapshotCatalogo]:
+    """Snapshot da versão compartilhada atual do catálogo, se já publicado"""
+    global _atual, _ausente
+    versao = obter_versao_compartilhada(DOMINIO_CATALOGO)
+    atual = _atual
+    if atual is not None and atual.versao == versao:
+        return atual
+    with _lock:
+        if _atual is not None and _atual.versao == versao:
+            return _atual
+        if _ausente[0] == versao and time.monotonic() - _ausente[1] < INTERVALO_NOVA_TENTATIVA:
+            return None
+        try:
+            novo = SnapshotCatalogo(caminho_snapshot(versao))
+        except (FileNotFoundError, ValueError):
+            _ausente = (versao, time.monotonic())
+            return None
+        # O mmap anterior não é fechado aqui: uma requisição ainda pode
+        # estar lendo dele, e ele é liberado quando deixar de ser usado
+        _atual = novo
+        return novo
+
+
+def obter_pagina(limite: int, apos: Optional[tuple] = None,
+                 antes: Optional[tuple] = None) -> Optional[Pagina[ProdutoResumo]]:
+    """Página da vitrine lida do snapshot, ou None se ele ainda não existir"""
+    global _leituras, _faltas
+    snapshot = obter_snapshot()
+    with _lock:
+        if snapshot is None:
+            _faltas += 1
+        else:
+            _leituras += 1
+    if snapshot is None:
+        return None
+    return snapshot.pagina(limite, apos, antes)
+
+
+def iniciar_snapshot() -> None:
+    """Publica o snapshot da versão atual, se ele ainda não existir (inicialização)"""
+    if not os.path.exists(caminho_snapshot(obter_versao_compartilhada(DOMINIO_CATALOGO))):
+        publicar_snapshot()
+
+
+def parar_snapshot() -> None:
+    publicador_snapshot.parar()
+
+
+def obter_metricas_snapshot() -> dict:
+    atual = _atual
+    return {
+        "versao": atual.versao if atual is not None else None,
+        "produtos": atual.total if atual is not None else None,
+        "publicacoes": _publicacoes,
+        "publicacoes_agendadas": publicador_snapshot.agendamentos,
+        "leituras": _leituras,
+        "faltas": _faltas,
+    }
+
+
+ao_alterar_catalogo(publicador_snapshot.agendar)
+registrar_metricas("snapshot_catalogo", obter_metricas_snapshot)
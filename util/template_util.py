@@ -1,14 +1,132 @@
+"""
+Ambiente Jinja2 único da aplicação
+
+Todos os routers (e os handlers de erro) compartilham um só
+jinja2.Environment: base.html e os componentes são compilados uma vez por
+processo, e não uma vez por router. O bytecode compilado é gravado em disco
+(FileSystemBytecodeCache), de modo que um worker novo não precisa compilar
+de novo os templates que outro já compilou.
+
+Em produção (AMBIENTE=producao) o auto_reload fica desligado, evitando um
+stat do arquivo a cada renderização, e os templates são pré-compilados na
+inicialização (precompilar_templates, chamada pelo main.py).
+
+Trechos repetidos por item (cartões e linhas de produto) podem ser
+guardados já renderizados com a tag {% cache %}:
+
+    {% cache "card_produto", p.id, p.atualizado_em %} ... {% endcache %}
+
+O HTML do trecho é reaproveitado enquanto a chave não mudar, então ela deve
+incluir tudo o que o trecho exibe e que pode mudar sem alterar
+atualizado_em (ex.: o nome da categoria). O nome e o conteúdo do template
+entram na chave automaticamente.
+"""
+import hashlib
+import os
 from typing import List, Optional, Union
-from jinja2 import FileSystemLoader
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template, nodes
+from jinja2.ext import Extension
 from fastapi.templating import Jinja2Templates
 from starlette.requests import Request
 
+from util.cache_util import criar_cache_lru
+from util.metricas_util import registrar_metricas
+
+
+DIRETORIO_TEMPLATES = "templates"
+PRODUCAO = os.getenv("AMBIENTE", "desenvolvimento") == "producao"
+# Diretório do bytecode compilado; vazio usa o diretório temporário do sistema
+DIRETORIO_BYTECODE = os.getenv("TEMPLATES_BYTECODE_DIR", "")
+PRECOMPILAR = os.getenv("TEMPLATES_PRECOMPILAR", "1" if PRODUCAO else "0") == "1"
+
+# Trechos renderizados guardados pela tag {% cache %} (taxa de acerto nas
+# métricas, em cache_lru.fragmentos)
+cache_fragmentos = criar_cache_lru(
+    "fragmentos",
+    max_entradas=int(os.getenv("FRAGMENTOS_TAMANHO", "2048")),
+    ttl=float(os.getenv("FRAGMENTOS_TTL", "3600")),
+)
+
+_ambiente: Optional[Environment] = None
+_precompilados = 0
+_versao_templates: Optional[str] = None
+
+
+class CacheFragmentos(Extension):
+    """Tag {% cache chave, ... %}...{% endcache %} sobre cache_fragmentos"""
+
+    tags = {"cache"}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        # O template (nome, hash do conteúdo e linha) abre a chave: trechos de
+        # templates diferentes não colidem, e um template recarregado com
+        # outro conteúdo não reaproveita o HTML renderizado pela versão antiga
+        partes = [nodes.Const(parser.name), nodes.Const(self._versao_fonte(parser.name)),
+                  nodes.Const(lineno), parser.parse_expression()]
+        while parser.stream.skip_if("comma"):
+            partes.append(parser.parse_expression())
+        corpo = parser.parse_statements(("name:endcache",), drop_needle=True)
+        chamada = self.call_method("_renderizar", [nodes.List(partes)])
+        return nodes.CallBlock(chamada, [], [], corpo).set_lineno(lineno)
+
+    def _versao_fonte(self, nome: Optional[str]) -> Optional[str]:
+        if nome is None or self.environment.loader is None:
+            return None
+        fonte, _, _ = self.environment.loader.get_source(self.environment, nome)
+        return hashlib.sha1(fonte.encode()).hexdigest()[:12]
+
+    def _renderizar(self, partes: list, caller) -> str:
+        return cache_fragmentos.obter(tuple(partes), caller)
+
+
+def obter_ambiente() -> Environment:
+    """Ambiente Jinja2 compartilhado, criado no primeiro uso"""
+    global _ambiente
+    if _ambiente is None:
+        if DIRETORIO_BYTECODE:
+            os.makedirs(DIRETORIO_BYTECODE, exist_ok=True)
+        _ambiente = Environment(
+            loader=FileSystemLoader(DIRETORIO_TEMPLATES),
+            autoescape=True,
+            auto_reload=not PRODUCAO,
+            bytecode_cache=FileSystemBytecodeCache(DIRETORIO_BYTECODE or None),
+            extensions=[CacheFragmentos],
+        )
+        _ambiente.globals['get_toasts'] = _get_toasts_for_template
+    return _ambiente
+
+
+class TemplatesDiretorio(Jinja2Templates):
+    """
+    Jinja2Templates sobre o ambiente compartilhado que procura cada template
+    primeiro nos diretórios do router e depois na raiz de templates.
+    """
+
+    def __init__(self, diretorios: List[str]):
+        super().__init__(env=obter_ambiente())
+        self.prefixos = [_relativo(d) for d in diretorios]
+        self._nomes: dict[str, str] = {}
+
+    def get_template(self, name: str) -> Template:
+        nome = self._nomes.get(name)
+        if nome is not None:
+            return self.env.get_template(nome)
+        template = self.env.select_template([f"{prefixo}/{name}" for prefixo in self.prefixos] + [name])
+        self._nomes[name] = template.name
+        return template
+
+
+def _relativo(diretorio: str) -> str:
+    return os.path.relpath(diretorio, DIRETORIO_TEMPLATES).replace(os.sep, "/")
+
 
 def criar_templates(diretorio_especifico: Optional[Union[str, List[str]]] = None) -> Jinja2Templates:
     """
-    Cria um objeto Jinja2Templates configurado com múltiplos diretórios.
+    Cria um objeto Jinja2Templates para um router, sobre o ambiente
+    compartilhado da aplicação.
     
-    O diretório raiz "templates" é sempre incluído automaticamente para garantir
+    O diretório raiz "templates" é sempre consultado por último, para garantir
     acesso aos templates base como base.html.
     
     Args:
@@ -18,7 +136,7 @@ def criar_templates(diretorio_especifico: Optional[Union[str, List[str]]] = None
                                      ["templates/admin", "templates/public"]
     
     Returns:
-        Objeto Jinja2Templates configurado com os diretórios especificados
+        Objeto Jinja2Templates que procura nos diretórios especificados
     
     Exemplo de uso:
         # Para um diretório específico
@@ -30,30 +148,64 @@ def criar_templates(diretorio_especifico: Optional[Union[str, List[str]]] = None
         # Apenas com o diretório raiz
         templates = criar_templates()
     """
-    # Sempre incluir o diretório raiz onde estão os templates base
-    diretorios = ["templates"]
-    
-    # Adicionar diretórios específicos se fornecidos
+    diretorios = []
     if diretorio_especifico:
         if isinstance(diretorio_especifico, str):
-            # Se for uma string única, adiciona à lista
             diretorios.append(diretorio_especifico)
         elif isinstance(diretorio_especifico, list):
-            # Se for uma lista, estende a lista de diretórios
             diretorios.extend(diretorio_especifico)
-    
-    # Criar o objeto Jinja2Templates com diretório base como "."
-    # Isso é necessário para que o FileSystemLoader funcione corretamente
-    templates = Jinja2Templates(directory=".")
-    
-    # Configurar o loader com múltiplos diretórios
-    # O FileSystemLoader tentará encontrar templates em ordem nos diretórios listados
-    templates.env.loader = FileSystemLoader(diretorios)
+    return TemplatesDiretorio(diretorios)
+
+
+def precompilar_templates(forcar: bool = False) -> int:
+    """
+    Compila todos os templates no ambiente compartilhado (e no cache de
+    bytecode). Só age quando TEMPLATES_PRECOMPILAR está ativo, a menos que
+    `forcar` seja informado. Retorna quantos templates foram compilados.
+    """
+    global _precompilados
+    if not (PRECOMPILAR or forcar):
+        return 0
+    ambiente = obter_ambiente()
+    nomes = ambiente.list_templates(extensions=["html"])
+    for nome in nomes:
+        ambiente.get_template(nome)
+    _precompilados = len(nomes)
+    _calcular_versao_templates()
+    return _precompilados
+
+
+def _calcular_versao_templates() -> str:
+    global _versao_templates
+    resumo = hashlib.sha1()
+    for nome in obter_ambiente().list_templates():
+        with open(os.path.join(DIRETORIO_TEMPLATES, nome), "rb") as arquivo:
+            resumo.update(nome.encode() + b"\0" + arquivo.read() + b"\0")
+    _versao_templates = resumo.hexdigest()[:12]
+    return _versao_templates
+
+
+def obter_versao_templates() -> str:
+    """
+    Versão dos templates em disco (hash dos nomes e do conteúdo), para
+    compor o ETag das páginas renderizadas: um deploy que só altere
+    templates muda a versão, e servidores com os mesmos arquivos chegam à
+    mesma. Com auto_reload desligado é calculada uma vez por processo; em
+    desenvolvimento, a cada chamada.
+    """
+    if _versao_templates is None or obter_ambiente().auto_reload:
+        return _calcular_versao_templates()
+    return _versao_templates
 
-    # Adicionar context processor para injetar toasts
-    templates.env.globals['get_toasts'] = _get_toasts_for_template
 
-    return templates
+def obter_metricas_templates() -> dict:
+    ambiente = obter_ambiente()
+    return {
+        "producao": PRODUCAO,
+        "auto_reload": ambiente.auto_reload,
+        "precompilados": _precompilados,
+        "em_memoria": len(ambiente.cache) if ambiente.cache is not None else None,
+    }
 
 
 def _get_toasts_for_template(request: Request):
@@ -61,4 +213,7 @@ def _get_toasts_for_template(request: Request):
     Context processor para injetar toasts no contexto do template
     """
     from util.toast_messages import get_toasts
-    return get_toasts(request)
\ No newline at end of file
+    return get_toasts(request)
+
+
+registrar_metricas("templates", obter_metricas_templates)
@@ -0,0 +1,106 @@
+"""
+Unidade de trabalho por requisição
+
+Uma rota que recebe a dependência obter_unidade_trabalho ganha:
+
+- mapa de identidade: uow.obter(função, *args) executa cada leitura do
+  repositório uma única vez por requisição; chamadas repetidas com os
+  mesmos argumentos devolvem o mesmo objeto, sem voltar ao banco;
+- escritas agrupadas: uow.registrar(função, *args) enfileira a escrita,
+  e todas as escritas da requisição são confirmadas juntas, em uma única
+  transação (db_util.transacao) executada na thread escritora, quando a
+  rota termina sem erro. Se a rota levantar exceção, nada é gravado.
+
+As escritas ficam para o final da requisição, e não abertas ao longo dela,
+porque manter uma transação de escrita do SQLite aberta entre awaits
+bloquearia a única thread escritora para todas as outras requisições.
+"""
+import threading
+from typing import AsyncIterator, Callable, TypeVar
+
+from util.db_util import executar_async, transacao
+from util.metricas_util import registrar_metricas
+
+
+T = TypeVar("T")
+
+_contadores = {"leituras": 0, "leituras_evitadas": 0, "escritas": 0, "transacoes": 0}
+_lock = threading.Lock()
+
+
+def _contar(nome: str, quantidade: int = 1) -> None:
+    with _lock:
+        _contadores[nome] += quantidade
+
+
+def obter_metricas_unidade_trabalho() -> dict:
+    with _lock:
+        return dict(_contadores)
+
+
+class UnidadeTrabalho:
+    """Mapa de identidade e fila de escritas de uma requisição"""
+
+    def __init__(self):
+        self._identidades: dict[tuple, object] = {}
+        self._escritas: list[tuple[Callable, tuple]] = []
+
+    async def obter(self, func: Callable[..., T], *args) -> T:
+        """Executa a leitura `func(*args)` no máximo uma vez por requisição"""
+        chave = (func, args)
+        if chave in self._identidades:
+            _contar("leituras_evitadas")
+            return self._identidades[chave]
+        resultado = await executar_async("leitura", func, *args)
+        self._identidades[chave] = resultado
+        _contar("leituras")
+        return resultado
+
+    def registrar(self, func: Callable, *args) -> None:
+        """
+        Enfileira a escrita `func(*args)` para o final da requisição. As
+        leituras já feitas são descartadas, para que uma nova chamada a
+        obter() não devolva um objeto anterior à escrita.
+        """
+        self._escritas.append((func, args))
+        self._identidades.clear()
+
+    @property
+    def pendentes(self) -> int:
+        return len(self._escritas)
+
+    def _executar_escritas(self, escritas: list[tuple[Callable, tuple]]) -> list:
+        with transacao():
+            return [func(*args) for func, args in escritas]
+
+    async def confirmar(self) -> list:
+        """Grava as escritas pendentes em uma única transação; retorna o resultado de cada uma"""
+        if not self._escritas:
+            return []
+        escritas, self._escritas = self._escritas, []
+        resultados = await executar_async("escrita", self._executar_escritas, escritas)
+        _contar("escritas", len(escritas))
+        _contar("transacoes")
+        return resultados
+
+    def descartar(self) -> None:
+        self._escritas.clear()
+        self._identidades.clear()
+
+
+async def obter_unidade_trabalho() -> AsyncIterator[UnidadeTrabalho]:
+    """
+    Dependência do FastAPI. O código após o yield roda depois da rota e
+    antes do envio da resposta, então uma falha no commit ainda vira erro
+    para o cliente em vez de um sucesso que não foi gravado.
+    """
+    uow = UnidadeTrabalho()
+    try:
+        yield uow
+    except Exception:
+        uow.descartar()
+        raise
+    await uow.confirmar()
+
+
+registrar_metricas("unidade_trabalho", obter_metricas_unidade_trabalho)
@@ -0,0 +1,136 @@
+"""
+Versões dos dados mantidos em cache
+
+Os caches em processo comparam a versão com que foram montados com dois
+sinais de alteração:
+
+- local: contador incrementado depois de cada escrita do catálogo feita
+  neste processo (@altera_catalogo), para que o worker que escreveu veja o
+  resultado já na requisição seguinte; o decorador também relê as versões
+  compartilhadas na hora, sem esperar o monitor;
+- compartilhado: tabela cache_version do próprio banco, com uma versão por
+  domínio, incrementada na mesma transação da escrita
+  (versao_repo.incrementar). Cada worker relê a tabela em segundo plano a
+  cada INTERVALO_VERIFICACAO segundos, então uma escrita feita em outro
+  worker é percebida com esse atraso máximo, sem broker externo.
+"""
+import functools
+import os
+import sqlite3
+import threading
+from typing import Callable, Optional, TypeVar
+
+from repo import versao_repo
+from util.db_util import apos_confirmar
+
+
+T = TypeVar("T")
+
+# Domínios de cache com versão compartilhada
+DOMINIO_CATALOGO = "catalogo"
+DOMINIO_CATEGORIAS = "categorias"
+DOMINIO_FORMAS_PAGAMENTO = "formas_pagamento"
+
+# Atraso máximo (em segundos) para um worker perceber escritas de outro
+INTERVALO_VERIFICACAO = float(os.getenv("CACHE_VERSAO_INTERVALO", "1"))
+
+_versao_catalogo = 0
+_lock = threading.Lock()
+_versoes_compartilhadas: dict[str, int] = {}
+_ouvintes_catalogo: list[Callable[[], None]] = []
+
+
+def obter_versao_compartilhada(dominio: str) -> int:
+    """Última versão lida da tabela cache_version; não acessa o banco"""
+    return _versoes_compartilhadas.get(dominio, 0)
+
+
+def atualizar_versoes_compartilhadas() -> dict[str, int]:
+    """Relê a tabela cache_version"""
+    global _versoes_compartilhadas
+    _versoes_compartilhadas = versao_repo.obter_todas()
+    return _versoes_compartilhadas
+
+
+def obter_versao_catalogo() -> tuple[int, int]:
+    return (_versao_catalogo, obter_versao_compartilhada(DOMINIO_CATALOGO))
+
+
+def incrementar_versao_catalogo() -> int:
+    global _versao_catalogo
+    with _lock:
+        _versao_catalogo += 1
+        return _versao_catalogo
+
+
+def altera_catalogo(func: Callable[..., T]) -> Callable[..., T]:
+    """Decorador para as funções de escrita do catálogo: incrementa a versão local ao final de cada chamada bem-sucedida (após o commit)"""
+    @functools.wraps(func)
+    def envoltorio(*args, **kwargs):
+        resultado = func(*args, **kwargs)
+        apos_confirmar(_registrar_alteracao_catalogo)
+        return resultado
+    return envoltorio
+
+
+def ao_alterar_catalogo(callback: Callable[[], None]) -> None:
+    """Registra uma função chamada após cada escrita do catálogo feita neste processo"""
+    _ouvintes_catalogo.append(callback)
+
+
+def _registrar_alteracao_catalogo() -> None:
+    incrementar_versao_catalogo()
+    try:
+        atualizar_versoes_compartilhadas()
+    except sqlite3.Error as e:
+        print(f"Erro ao ler as versões dos caches: {e}")
+    for callback in _ouvintes_catalogo:
+        try:
+            callback()
+        except Exception as e:
+            print(f"Erro ao processar alteração do catálogo: {e}")
+
+
+class MonitorVersoes:
+    """Thread em segundo plano que relê as versões compartilhadas em intervalos fixos"""
+
+    def __init__(self, intervalo: float):
+        self.intervalo = intervalo
+        self.leituras = 0
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._executar, name="monitor-versoes", daemon=True)
+
+    def iniciar(self) -> None:
+        self._thread.start()
+
+    def parar(self) -> None:
+        self._parar.set()
+        self._thread.join(timeout=self.intervalo)
+
+    def _executar(self) -> None:
+        while not self._parar.wait(self.intervalo):
+            try:
+                atualizar_versoes_compartilhadas()
+                self.leituras += 1
+            except sqlite3.Error as e:
+                print(f"Erro ao ler as versões dos caches: {e}")
+
+
+_monitor: Optional[MonitorVersoes] = None
+
+
+def iniciar_monitor_versoes(intervalo: float = INTERVALO_VERIFICACAO) -> None:
+    """Lê as versões atuais e passa a acompanhá-las; intervalo 0 desativa o acompanhamento"""
+    global _monitor
+    atualizar_versoes_compartilhadas()
+    if intervalo <= 0 or _monitor is not None:
+        return
+    _monitor = MonitorVersoes(intervalo)
+    _monitor.iniciar()
+
+
+def parar_monitor_versoes() -> None:
+    global _monitor
+    if _monitor is not None:
+        _monitor.parar()
+        _monitor = None